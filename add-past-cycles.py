@@ -0,0 +1,23 @@
+from models.batch import BatchRunner
+
+# Fetch and clean past cycles - committees with spending, legislative candidates and (once their
+# CERS race codes are looked up) statewide and state district races. Stages run as in update-2024.py
+
+# Raw CERS responses are recorded here (see models/raw_store.py). REPLAY rebuilds from them with no network
+RAW_STORE = 'cache/raw'
+REPLAY = False
+
+# Re-run clean stages even if their inputs haven't changed
+FORCE = False
+
+FILTER_STATUSES = ['Active', 'Reopened', 'Amended', 'Closed']
+
+# TODO - look up race codes for past statewide and state district races, e.g. 'ag': '2'
+CYCLES = [
+    {'cycle': year, 'committees': True, 'legislative': True, 'races': {}, 'filterStatuses': FILTER_STATUSES}
+    for year in ['2022', '2020', '2018', '2016']
+]
+
+# Past cycles don't change, so this run's timings don't replace the live update's logs.json
+BatchRunner(CYCLES, incremental=False, rawStore=RAW_STORE, replay=REPLAY, force=FORCE, logPath=None).run()
+print("Done")
@@ -0,0 +1,57 @@
+# Times the row-wise apply key building from the original aggregate-contributions.py against
+# the vectorized models.aggregation.add_keys, and checks they produce the same keys and totals
+# Run from repo root: python3 benchmarks/aggregate-keys.py [year]
+#
+# The original script's fillna(inplace=True) on a column subset had no effect, so missing values
+# rendered as 'nan'/'<NA>' depending on pandas version. The legacy path below applies that fillna
+# for real, which is what the published contributor-totals.csv reflects.
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.aggregation import race_paths, load_contributions, add_keys, contributor_totals
+
+YEAR = sys.argv[1] if len(sys.argv) > 1 else '2024'
+
+KEY_COLUMNS = ['Committee', 'Candidate', 'Entity Name', 'First Name',
+               'Last Name', 'Addr Line1', 'City', 'State', 'Zip']
+
+
+def legacy_keys(df):
+    df = df.copy()
+    for col in KEY_COLUMNS:
+        if col not in df.columns:
+            df[col] = ''
+    cols = ['Committee', 'Candidate', 'Entity Name', 'First Name', 'Last Name', 'Addr Line1', 'City', 'State']
+    df[cols] = df[cols].astype(object).fillna('')
+    df['Zip'] = df['Zip'].astype(object).fillna('')
+    df['Recipient'] = df[['Committee', 'Candidate']].apply(lambda x : '{}{}'.format(x.iloc[0],x.iloc[1]).strip().upper(), axis=1)
+    df['Contributor'] = df[['Entity Name', 'First Name', 'Last Name']].apply(lambda x : '{}{} {}'.format(x.iloc[0],x.iloc[1],x.iloc[2]).strip().upper().replace('  ',' '), axis=1)
+    df['Address'] = df[['Addr Line1', 'City', 'State', 'Zip']].apply(lambda x : '{} {}, {} {}'.format(x.iloc[0],x.iloc[1],x.iloc[2],x.iloc[3]), axis=1)
+    return df
+
+
+paths = [path for path in race_paths(YEAR) if os.path.isfile(path)]
+df = load_contributions(paths)
+print(f'{len(df)} contributions from {len(paths)} files in cleaned/{YEAR}\n')
+
+start = time.perf_counter()
+legacy = legacy_keys(df)
+legacy_time = time.perf_counter() - start
+
+start = time.perf_counter()
+vectorized = add_keys(df)
+vectorized_time = time.perf_counter() - start
+
+for col in ['Recipient', 'Contributor', 'Address']:
+    mismatches = (legacy[col] != vectorized[col]).sum()
+    print(f'{col}: {mismatches} mismatches')
+pd.testing.assert_frame_equal(contributor_totals(legacy), contributor_totals(vectorized))
+print('Contributor totals match\n')
+
+print(f'row-wise apply: {legacy_time:.3f}s')
+print(f'vectorized:     {vectorized_time:.3f}s ({legacy_time / vectorized_time:.1f}x)')
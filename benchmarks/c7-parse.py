@@ -0,0 +1,123 @@
+# Compares building C7 contribution frames row by row (a dict per row and the original per-row address
+# parser, as the original Report._parse_c7_table did) against Report._parse_c7_table - column-wise with
+# models/normalize.py and models/addresses.py, or row by row below ROW_PARSE_LIMIT rows
+# Run from repo root: python3 benchmarks/c7-parse.py [rows] [small table rows]
+#
+# Uses synthetic financeRepDetailList rows, with repeat contributors like real C7 batches. Times one
+# large table, then many small ones - most real C7/C7E tables are a few dozen rows
+
+import os
+import sys
+import time
+import random
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.cers_report import Report, ROW_PARSE_LIMIT
+from models.addresses import parse_addresses
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+SMALL_ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+SMALL_TABLES = 500
+
+
+def detail_row(i):
+    cash = random.choice([0, 10.5, 100])
+    return {
+        'entityAddress': f'{random.randint(1, 2000)} Prospect Ave, {random.choice(["Helena", "Butte", "Great Falls"])}, MT 596{random.randint(0, 99):02}',
+        'datePaid': 1704067200000 + random.randint(0, 300) * 86400000,
+        'cashAmt': cash, 'inKindAmt': 0 if cash else 25, 'totalAmt': cash or 25,
+        'entityName': f'Contributor {i}', 'occupationDescr': 'Retired', 'employerDescr': None,
+        'lineItemCompositeDescr': 'Individual', 'purposeDescr': None,
+        'amountTypeDescr': random.choice(['Primary', 'General']),
+        'totalToDatePrimary': cash, 'totalToDateGeneral': 0, 'refundOrigTransDate': None,
+        'refundOrigTransTotalVal': None, 'refundOrigTransDesc': None,
+        'previousTransactionInd': random.choice(['Y', 'N']), 'fundraiserName': None, 'fundraiserLocation': None,
+        'fundraiserAttendees': None, 'fundraiserTicketsSold': None,
+    }
+
+
+def parse_address(raw):
+    if (raw == ''):
+        return '', '', '', ''
+    address = raw.replace('Washington, DC', 'Washington DC, DC').split(', ')
+    addressLn1 = (', ').join(address[0:len(address)-2])
+    city = address[-2].strip()
+    state_zip = address[-1].split(' ')
+    state = state_zip[0]
+    zip_code = state_zip[1] if len(state_zip) > 1 else ''
+    return addressLn1, city, state, zip_code
+
+
+def row_by_row(rows):
+    cleaned = []
+    for row in rows:
+        addressLn1, city, state, zip_code = parse_address(row['entityAddress'])
+        if (row['cashAmt'] > 0 and row['inKindAmt'] > 0):
+            amount_type = 'Mixed'
+        elif (row['cashAmt'] > 0):
+            amount_type = 'CA'
+        elif (row['inKindAmt'] > 0):
+            amount_type = 'IK'
+        cleaned.append({
+            'Date Paid': datetime.fromtimestamp(row['datePaid'] / 1000).strftime('%m/%d/%y'),
+            'Entity Name': row['entityName'], 'First Name': '', 'Middle Initial': '', 'Last Name': '',
+            'Addr Line1': addressLn1, 'City': city, 'State': state, 'Zip': zip_code, 'Zip4': '', 'Country': '',
+            'Occupation': row['occupationDescr'], 'Employer': row['employerDescr'],
+            'Contribution Type': row['lineItemCompositeDescr'], 'Amount': row['totalAmt'],
+            'Amount Type': amount_type, 'Purpose': row['purposeDescr'], 'Election Type': row['amountTypeDescr'],
+            'Total Primary': row['totalToDatePrimary'], 'Total General': row['totalToDateGeneral'],
+            'Refund Transaction Type': '', 'Refund Original Transaction Date': row['refundOrigTransDate'],
+            'Refund Original Transaction Total': row['refundOrigTransTotalVal'],
+            'Refund Original Transaction Descr': row['refundOrigTransDesc'],
+            'Previous Transaction (Y/N)': row['previousTransactionInd'],
+            'Fundraiser Name': row['fundraiserName'], 'Fundraiser Location': row['fundraiserLocation'],
+            'Fundraiser Attendees': row['fundraiserAttendees'], 'Fundraiser Tickets Sold': row['fundraiserTicketsSold'],
+        })
+    return pd.DataFrame(cleaned)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+random.seed(0)
+rows = [detail_row(i) for i in range(ROWS)]
+report = object.__new__(Report)  # only the parsing helpers are used
+
+
+
+def same_frames(old, new):
+    # Column-wise frames carry the declared schema (models/schema.py) - compare what gets written
+    return list(old.columns) == list(new.columns) and \
+        old.to_json(orient='records') == new.to_json(orient='records')
+
+
+def label(table_rows):
+    return 'column-wise:' if table_rows >= ROW_PARSE_LIMIT else 'row path:'
+
+
+old, old_time = timed(row_by_row, rows)
+new, new_time = timed(report._parse_c7_table, rows)
+assert same_frames(old, new), 'Frames differ'
+
+print(f'{ROWS} detail rows, frames match')
+print(f'row by row:   {old_time:.2f}s')
+print(f'{label(ROWS):13} {new_time:.2f}s')
+
+tables = [[detail_row(i) for i in range(SMALL_ROWS)] for _ in range(SMALL_TABLES)]
+assert same_frames(row_by_row(tables[0]), report._parse_c7_table(tables[0])), 'Small frames differ'
+old_time = sum(timed(row_by_row, table)[1] for table in tables) / SMALL_TABLES
+new_time = sum(timed(report._parse_c7_table, table)[1] for table in tables) / SMALL_TABLES
+print(f'\n{SMALL_TABLES} tables of {SMALL_ROWS} rows, per table')
+print(f'row by row:   {old_time * 1000:.2f}ms')
+print(f'{label(SMALL_ROWS):13} {new_time * 1000:.2f}ms')
+
+columns = [pd.Series([row['entityAddress'] for row in table]) for table in tables]
+old_time = sum(timed(lambda column: [parse_address(raw) for raw in column], column)[1] for column in columns) / SMALL_TABLES
+new_time = sum(timed(parse_addresses, column)[1] for column in columns) / SMALL_TABLES
+print(f'addresses only - parse_address: {old_time * 1000:.2f}ms, parse_addresses: {new_time * 1000:.2f}ms')
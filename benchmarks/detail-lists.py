@@ -0,0 +1,113 @@
+# Per-report latency of fetching C7/C7E detail lists serially vs in parallel (cloned or re-primed sessions)
+# Run from repo root: python3 benchmarks/detail-lists.py [latency_ms] [reports]
+#
+# Runs against a local stand-in for CERS that sleeps `latency_ms` per request and, like CERS, serves
+# financeRepDetailList for whichever report the cookie's server session last opened. Every row carries
+# its report ID, so a list served for the wrong report fails the run.
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import threading
+import urllib.parse
+from statistics import mean
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import models.report_source as report_source
+from models.cers_client import CersClient, set_client
+from models.rate_limit import RateLimiter
+from models.report_source import CersReportSource, C7_DETAIL_LISTS, C7E_DETAIL_LISTS, DETAIL_SESSION_MODES
+
+LATENCY = (int(sys.argv[1]) if len(sys.argv) > 1 else 80) / 1000
+REPORTS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+open_reports = {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        time.sleep(LATENCY)
+        form = dict(urllib.parse.parse_qsl(self.rfile.read(int(self.headers['Content-Length'])).decode()))
+        cookie = self.headers.get('Cookie', '')
+        sid = cookie.split('=', 1)[1] if cookie.startswith('JSESSIONID=') else uuid.uuid4().hex
+        if self.path.endswith('retrieveReport'):
+            open_reports[sid] = form['reportId']
+            body = '<html></html>'
+        else:
+            body = json.dumps([{'reportId': open_reports.get(sid), 'listName': form['listName']}])
+        data = body.encode()
+        self.send_response(200)
+        if not cookie:
+            self.send_header('Set-Cookie', f'JSESSIONID={sid}; Path=/')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeReport:
+    def __init__(self, reportId):
+        self.data = {'candidateId': 1, 'reportId': str(reportId), 'amendedDate': None}
+
+
+def check(lists, reportId):
+    for name, rows in lists.items():
+        assert rows == [{'reportId': str(reportId), 'listName': name}], f'{name} served for the wrong report: {rows}'
+
+
+def run_sync(mode, listNames):
+    source = CersReportSource(detailSessions=mode)
+    times = []
+    for i in range(REPORTS):
+        start = time.perf_counter()
+        lists = source.detail_lists(FakeReport(i), listNames)
+        times.append(time.perf_counter() - start)
+        check(lists, i)
+    return mean(times)
+
+
+def run_async(mode, listNames):
+    from models.cers_async import AsyncCersClient
+
+    async def main():
+        times = []
+        async with AsyncCersClient(detailSessions=mode) as client:
+            for i in range(REPORTS):
+                start = time.perf_counter()
+                lists = await client._fetch_detail_lists({'candidateId': 1, 'reportId': str(i), 'amendedDate': None}, listNames)
+                times.append(time.perf_counter() - start)
+                check(lists, i)
+        return mean(times)
+    return asyncio.run(main())
+
+
+if __name__ == '__main__':
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}/CampaignTracker/public/viewFinanceReport'
+    report_source.RETRIEVE_REPORT_URL = f'{base}/retrieveReport'
+    report_source.DETAIL_LIST_URL = f'{base}/financeRepDetailList'
+    # Budget out of the way - this measures round-trips, not the rate limit
+    set_client(CersClient(limiter=RateLimiter(rps=1000, concurrency=16)))
+
+    try:
+        import aiohttp  # noqa: F401
+        runners = [('blocking', run_sync), ('async', run_async)]
+    except ImportError:
+        runners = [('blocking', run_sync)]
+        print('aiohttp not installed - skipping the async client')
+
+    print(f'{LATENCY * 1000:.0f}ms per request, {REPORTS} reports per run, mean seconds per report')
+    for form, listNames in [('C7', C7_DETAIL_LISTS), ('C7E', C7E_DETAIL_LISTS)]:
+        for client, runner in runners:
+            results = [f'{mode} {runner(mode, listNames):.3f}s' for mode in DETAIL_SESSION_MODES]
+            print(f'{form} ({len(listNames)} lists), {client}: ' + ', '.join(results))
+    server.shutdown()
@@ -0,0 +1,104 @@
+# End-to-end fetch throughput against a local CERS stand-in (models/mock_cers.py): runs
+# Interface.get_legislative_candidates and get_committees_with_spending and reports wall time and requests/sec
+# Run from repo root: python3 benchmarks/end-to-end.py [--latency 50] [--failures 0.02] [--workers 8] [--async]
+#   [--summary-only]
+# (--help for the rest)
+#
+# Serves generated fixtures by default; --fixtures cache/raw serves responses recorded by an update
+# script instead (see models/raw_store.py - the recipes' searches must have been recorded for --cycle).
+# Caches and exports go to a temp folder, so the repo's cache/ isn't touched.
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.cers_client import CersClient, set_client
+from models.cers_interface import Interface, AsyncInterface
+from models.mock_cers import MockCers, SyntheticFixtures, RecordedFixtures
+from models.raw_store import RawStore
+from models.rate_limit import RateLimiter
+from models.request_policy import RequestPolicy
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--latency', type=float, default=50, help='ms added to every response (default 50)')
+parser.add_argument('--jitter', type=float, default=0, help='up to this many more ms at random')
+parser.add_argument('--failures', type=float, default=0, help='fraction of requests answered with --failure-status')
+parser.add_argument('--failure-status', type=int, default=500,
+                    help='500 (default) is retried; 429/503 are also read as throttling and slow the client down')
+parser.add_argument('--workers', type=int, default=8)
+parser.add_argument('--rps', type=float, default=1000, help='client request budget (default high enough to measure the fetch code)')
+parser.add_argument('--in-flight', type=int, default=16)
+parser.add_argument('--async', dest='use_async', action='store_true', help='use AsyncInterface')
+parser.add_argument('--summary-only', action='store_true', help='fetch report summaries and totals only (summaryOnly=True)')
+parser.add_argument('--fixtures', help='raw store folder to serve instead of generated data')
+parser.add_argument('--cycle', default='2024')
+parser.add_argument('--candidates', type=int, default=40)
+parser.add_argument('--committees', type=int, default=20)
+parser.add_argument('--reports', type=int, default=4, help='reports per candidate/committee')
+parser.add_argument('--rows', type=int, default=50, help='itemized rows per schedule/detail list')
+args = parser.parse_args()
+
+if args.fixtures:
+    fixtures = RecordedFixtures(RawStore(os.path.abspath(args.fixtures)))
+else:
+    fixtures = SyntheticFixtures(candidates=args.candidates, committees=args.committees,
+                                 reports=args.reports, rows=args.rows)
+
+RECIPES = [
+    ('get_legislative_candidates', lambda cers: cers.get_legislative_candidates(cycle=args.cycle, summaryOnly=args.summary_only)),
+    ('get_committees_with_spending', lambda cers: cers.get_committees_with_spending(cycle=args.cycle, summaryOnly=args.summary_only)),
+]
+
+
+def run(server, cers, recipe, loop=None):
+    server.reset_stats()
+    start = time.perf_counter()
+    results = recipe(cers)
+    if loop is not None:
+        results = loop.run_until_complete(results)
+    return results, time.perf_counter() - start
+
+
+server = MockCers(fixtures, latency=args.latency / 1000, jitter=args.jitter / 1000, failureRate=args.failures,
+                  failureStatus=args.failure_status).start()
+# Short backoff so injected failures measure retry overhead, not the production backoff schedule
+set_client(CersClient(poolSize=max(args.workers, 16), baseUrl=server.url,
+                      policy=RequestPolicy(backoff=0.05, maxBackoff=1),
+                      limiter=RateLimiter(rps=args.rps, concurrency=args.in_flight)))
+
+tmp = tempfile.mkdtemp()
+cwd = os.getcwd()
+os.chdir(tmp)
+try:
+    options = dict(workers=args.workers, requestsPerSecond=args.rps, maxInFlight=args.in_flight)
+    loop = asyncio.new_event_loop() if args.use_async else None
+    cers = AsyncInterface(**options) if args.use_async else Interface(**options)
+
+    lines = []
+    for name, recipe in RECIPES:
+        results, elapsed = run(server, cers, recipe, loop)
+        stats = server.stats()
+        if args.summary_only:
+            found = f'{len(results.totals)} totals, {results.totals["receipts"].sum():.2f} receipts'
+        else:
+            found = f'{len(results.contributions)} contributions, {len(results.expenditures)} expenditures'
+        lines.append(f'{name}: {elapsed:.2f}s wall, {stats["requests"]} requests ({stats["requests"] / elapsed:.1f}/s), '
+                     f'{stats["failures"]} failures injected, {stats["bytes"] / 1e6:.1f} MB, {found}')
+    if loop is not None:
+        loop.run_until_complete(cers.close())
+        loop.close()
+finally:
+    os.chdir(cwd)
+    shutil.rmtree(tmp)
+    server.stop()
+
+print()
+print(f'{"async" if args.use_async else "blocking"} client{", summary only" if args.summary_only else ""}, {args.workers} workers, {args.latency:.0f}ms latency, '
+      f'{args.failures:.0%} failures ({args.failure_status}), {"recorded" if args.fixtures else "generated"} fixtures')
+for line in lines:
+    print(line)
@@ -0,0 +1,50 @@
+# Compares repeated pd.concat against FrameAccumulator as the number of reports grows
+# Uses cleaned 2024 legislative contributions split back into per-report frames
+# Run from repo root: python3 benchmarks/frame-assembly.py
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.frames import FrameAccumulator
+
+SOURCE = 'cleaned/2024/leg/contributions.csv'
+REPORT_COUNTS = [50, 200, 800, 3200]
+
+
+def loop_concat(parts):
+    df = pd.DataFrame()
+    for dfi in parts:
+        df = pd.concat([df, dfi])
+    return df
+
+
+def accumulate(parts):
+    frames = FrameAccumulator()
+    for dfi in parts:
+        frames.add(dfi)
+    return frames.result()
+
+
+def timed(func, parts):
+    start = time.perf_counter()
+    result = func(parts)
+    return time.perf_counter() - start, result
+
+
+source = pd.read_csv(SOURCE, low_memory=False)
+reports = [dfi for _, dfi in source.groupby(['Candidate', 'Reporting Period', 'Report Type'])]
+print(f'{len(source)} rows in {len(reports)} report frames from {SOURCE}\n')
+
+print(f"{'reports':>8} {'rows':>8} {'loop concat':>12} {'accumulator':>12} {'speedup':>8}")
+for count in REPORT_COUNTS:
+    # Cycle through the real report frames to reach larger counts
+    parts = [reports[i % len(reports)] for i in range(count)]
+    loop_time, expected = timed(loop_concat, parts)
+    acc_time, result = timed(accumulate, parts)
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True), result.reset_index(drop=True))
+    print(f'{count:>8} {len(result):>8} {loop_time:>11.3f}s {acc_time:>11.3f}s {loop_time / acc_time:>7.1f}x')
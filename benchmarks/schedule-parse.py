@@ -0,0 +1,67 @@
+# Compares peak memory and time for parsing a big schedule download held in memory as text
+# (the original r.text -> StringIO -> read_csv path) against models.downloads.read_schedule on a file
+# Run from repo root: python3 benchmarks/schedule-parse.py [copies]
+#
+# Uses the Busse Q1 2024 Schedule A download (manual/), repeated `copies` times to stand in for
+# a statewide-race-sized schedule
+
+import os
+import sys
+import csv
+import time
+import tempfile
+import tracemalloc
+from io import StringIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.downloads import read_schedule
+
+SAMPLE = 'manual/Busse-Ryan-66995-q1-2024-contributions.csv'
+COPIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+
+def in_memory(raw):
+    text = raw.decode('utf-8')
+    return pd.read_csv(StringIO(text), sep='|', on_bad_lines='warn', index_col=False, quoting=csv.QUOTE_NONE)
+
+
+def measure(func, *args):
+    # Timed and traced in separate runs - tracemalloc slows down allocation-heavy code a lot
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+with open(SAMPLE, 'rb') as f:
+    header, _, rows = f.read().partition(b'\n')
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'schedule.txt')
+    with open(path, 'wb') as f:
+        f.write(header + b'\n')
+        for i in range(COPIES):
+            f.write(rows)
+    print(f'{os.path.getsize(path) / 1e6:.1f} MB schedule, {COPIES} copies of {SAMPLE}\n')
+
+    def old_path():
+        # r.text of a non-streamed response: body bytes plus decoded text
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return in_memory(raw)
+
+    old, old_time, old_peak = measure(old_path)
+    new, new_time, new_peak = measure(read_schedule, path)
+
+assert old.shape == new.shape
+for col in ['Amount', 'Total Primary', 'Total General']:
+    assert (old[col].fillna(0) == new[col].fillna(0)).all()
+print(f'{len(new)} rows parsed, amounts match\n')
+
+print(f'text + StringIO:  {old_time:.2f}s, peak {old_peak / 1e6:.0f} MB')
+print(f'chunked file:     {new_time:.2f}s, peak {new_peak / 1e6:.0f} MB')
@@ -0,0 +1,36 @@
+# Compares parsing report summary tables from the whole page with BeautifulSoup's html.parser (the
+# original path) against models.report_summary.summary_rows (summary fragment only, lxml)
+# Run from repo root: python3 benchmarks/summary-parse.py [repeats]
+#
+# Uses saved report pages listed in manual/config.py (MANUAL_SUMMARY_CACHES)
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.report_summary import summary_rows, summary_fragment, _rows_soup, SUMMARY_LABELS
+from manual.config import MANUAL_SUMMARY_CACHES
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        result = func(*args)
+    return result, (time.perf_counter() - start) / REPEATS
+
+
+for id, path in MANUAL_SUMMARY_CACHES.items():
+    with open(path, 'r') as f:
+        text = f.read()
+    fragment = summary_fragment(text)
+    print(f'{path}: {len(text) / 1e6:.2f} MB page, {len(fragment) / 1e3:.1f} KB summary table')
+
+    old, old_time = timed(_rows_soup, text, SUMMARY_LABELS)
+    new, new_time = timed(summary_rows, text, SUMMARY_LABELS)
+    assert old == new, f'Summary rows differ for report {id}'
+
+    print(f'  html.parser, whole page:  {old_time * 1000:.1f} ms')
+    print(f'  lxml, summary fragment:   {new_time * 1000:.1f} ms ({old_time / new_time:.0f}x), rows match')
@@ -0,0 +1,68 @@
+# Compares itemized contributions and expenditures as plain object columns (what the scrape built
+# before models/schema.py) against the declared schema: memory use, and the time to total amounts
+# by candidate, reporting period and report type. Checks the typed frames write the same JSON
+# Run from repo root: python3 benchmarks/typed-schema.py [year] [race]
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.schema import apply_schema, paid_dates, MONEY_COLUMNS
+
+YEAR = sys.argv[1] if len(sys.argv) > 1 else '2024'
+RACE = sys.argv[2] if len(sys.argv) > 2 else 'leg'
+
+GROUP_COLUMNS = ['Candidate', 'Reporting Period', 'Report Type']
+REPEATS = 20
+
+
+def load(table):
+    # Everything but the amounts as text, as the schedule and detail list parsers produce it
+    path = os.path.join('cleaned', YEAR, RACE, f'{table}.csv')
+    header = pd.read_csv(path, nrows=0).columns
+    return pd.read_csv(path, dtype={col: 'float64' if col in MONEY_COLUMNS else object for col in header})
+
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def time_totals(df, **kwargs):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        totals = df.groupby(GROUP_COLUMNS, **kwargs)['Amount'].sum()
+    return (time.perf_counter() - start) / REPEATS, totals
+
+
+for table in ['contributions', 'expenditures']:
+    plain = load(table)
+    start = time.perf_counter()
+    typed = apply_schema(plain)
+    schema_time = time.perf_counter() - start
+    print(f'{table}: {len(plain)} rows from cleaned/{YEAR}/{RACE}, schema applied in {schema_time:.3f}s')
+
+    assert typed.to_json(orient='records') == plain.to_json(orient='records')
+    print('  JSON output matches')
+
+    plain_mb, typed_mb = megabytes(plain), megabytes(typed)
+    print(f'  memory - object columns: {plain_mb:.1f} MB, schema: {typed_mb:.1f} MB ({plain_mb / typed_mb:.1f}x smaller)')
+
+    plain_time, plain_totals = time_totals(plain)
+    typed_time, typed_totals = time_totals(typed, observed=True)
+    assert plain_totals.to_dict() == typed_totals.to_dict()
+    print(f'  groupby({", ".join(GROUP_COLUMNS)}).sum - object columns: {plain_time * 1000:.1f}ms, '
+          f'schema: {typed_time * 1000:.1f}ms ({plain_time / typed_time:.1f}x)')
+
+    start = time.perf_counter()
+    dates = pd.to_datetime(plain['Date Paid'], format='mixed', errors='coerce')
+    # Mistyped years past datetime64[ns]'s range (2410) are NaT in paid_dates, and on pandas < 3 here
+    dates = dates.where((dates >= pd.Timestamp.min) & (dates <= pd.Timestamp.max))
+    plain_time = time.perf_counter() - start
+    start = time.perf_counter()
+    typed_dates = paid_dates(typed)
+    typed_time = time.perf_counter() - start
+    print(f'  Date Paid to datetime64 - object column: {plain_time * 1000:.1f}ms, '
+          f'paid_dates: {typed_time * 1000:.1f}ms ({(dates.fillna(0) != typed_dates.fillna(0)).sum()} differences)\n')
@@ -0,0 +1,13 @@
+# Loads cached reports for each cycle into the SQLite warehouse (see models/warehouse.py)
+# Run from repo root after an update script: python3 build-warehouse.py
+# Re-running only reads reports that are new or amended since the last load.
+
+from models.warehouse import Warehouse, DEFAULT_WAREHOUSE_PATH
+
+# Cycles with report caches in cache/{year}
+YEARS = ['2022', '2024']
+
+with Warehouse(DEFAULT_WAREHOUSE_PATH) as warehouse:
+    for year in YEARS:
+        warehouse.load_cache(f'cache/{year}', year)
+    print(warehouse.query('SELECT cycle, COUNT(*) AS reports FROM reports GROUP BY cycle').to_string(index=False))
@@ -0,0 +1,56 @@
+# Checks contributor name matching (models/contributors.py): spelling variants link, while different
+# people who share a ZIP - spouses, siblings, parent and child - keep separate contributor IDs
+# Run from repo root: python3 checks/contributor-matching.py
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.contributors import ContributorIndex, normalize_names, names_match
+
+SAME = [
+    ('John Smith', 'Smith, John'),
+    ('John Smith', 'John Q. Smith'),
+    ('John Smith', 'John Smyth'),
+    ('John Smith Jr.', 'Smith, Jr, John'),
+    ('Mrs. Jane Doe', 'Jane Doe'),
+    ('Montana Education Assn', 'Montana Education Association'),
+]
+
+DIFFERENT = [
+    ('Francis Smith', 'Frances Smith'),
+    ('Eric Jones', 'Erica Jones'),
+    ('Louis Doe', 'Louise Doe'),
+    ('Daniel Roe', 'Danielle Roe'),
+    ('John Smith', 'John Smith Jr'),
+    ('John Smith Jr', 'John Smith Sr'),
+    ('John Smith II', 'John Smith III'),
+    ('Jane Smith', 'John Smith'),
+    ('John Robinson', 'John Bronson'),
+    ('Mark Allen', 'Mary Allen'),
+]
+
+failures = []
+for expected, pairs in [(True, SAME), (False, DIFFERENT)]:
+    for a, b in pairs:
+        key_a, key_b = normalize_names([a, b])
+        if names_match(key_a, key_b) != expected:
+            failures.append(f'{a!r} / {b!r} ({key_a!r} / {key_b!r}) should {"" if expected else "not "}match')
+
+# Through the index, where linked keys are chained - 'Francis' and 'Frances' mustn't meet via a third spelling
+names = ['Francis Smith', 'Frances Smith', 'Francis Smyth', 'John Smith', 'John Smith Jr', 'Smith, John']
+with tempfile.TemporaryDirectory() as tmp:
+    ids = ContributorIndex(os.path.join(tmp, 'ids.csv')).resolve(pd.Series(names), pd.Series(['59601'] * len(names)))
+ids = dict(zip(names, ids))
+for a, b, expected in [('Francis Smith', 'Francis Smyth', True), ('Francis Smith', 'Frances Smith', False),
+                       ('John Smith', 'Smith, John', True), ('John Smith', 'John Smith Jr', False)]:
+    if (ids[a] == ids[b]) != expected:
+        failures.append(f'{a!r} / {b!r} should {"" if expected else "not "}share an ID ({ids})')
+
+for failure in failures:
+    print('!!', failure)
+assert len(failures) == 0
+print(f'{len(SAME) + len(DIFFERENT)} name pairs and index IDs as expected')
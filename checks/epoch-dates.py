@@ -0,0 +1,63 @@
+# Checks parse_epoch_dates and epoch_date against the row-wise conversion it replaced
+# (datetime.fromtimestamp(ms / 1000).strftime('%m/%d/%y')) on C7/C7E paid dates in cleaned/, turned
+# back into CERS epoch milliseconds (Montana midnight plus a time of day), and on timestamps around
+# daylight saving changes
+# Run from repo root: python3 checks/epoch-dates.py [year]
+
+import os
+import sys
+import glob
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Both conversions use the local timezone - pin it to the one CERS dates are in
+os.environ['TZ'] = 'America/Denver'
+time.tzset()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.normalize import parse_epoch_dates, epoch_date, DATE_FORMAT
+
+YEAR = sys.argv[1] if len(sys.argv) > 1 else '2024'
+
+# Seconds after local midnight - CERS sends midnight, but anything up to the end of the day is the same date
+TIMES_OF_DAY = [0, 1, 12 * 3600, 23 * 3600 + 59 * 60]
+
+
+def row_by_row(values):
+    return [None if pd.isna(ms) else datetime.fromtimestamp(ms / 1000).strftime(DATE_FORMAT) for ms in values]
+
+
+def epoch_ms(local):
+    return int(time.mktime(local.timetuple()) * 1000)
+
+
+paid = []
+for path in sorted(glob.glob(os.path.join('cleaned', YEAR, '*', '*.csv'))):
+    df = pd.read_csv(path, dtype=str, usecols=lambda col: col in ('Report Type', 'Date Paid'))
+    if 'Report Type' in df.columns:
+        paid += df.loc[df['Report Type'].isin(['C7', 'C7E']), 'Date Paid'].dropna().tolist()
+if len(paid) == 0:
+    sys.exit(f'No C7/C7E paid dates in cleaned/{YEAR}')
+
+days = [datetime.strptime(date, DATE_FORMAT) for date in sorted(set(paid))]
+values = [epoch_ms(day + timedelta(seconds=seconds)) for day in days for seconds in TIMES_OF_DAY]
+# Every hour across the spring and fall clock changes
+for change in [datetime(int(YEAR), 3, 9), datetime(int(YEAR), 11, 2)]:
+    values += [epoch_ms(change + timedelta(hours=hour)) for hour in range(48)]
+values += [None, np.nan]
+
+expected = row_by_row(values)
+actual = parse_epoch_dates(values).tolist()
+for name, got_dates in [('column-wise', actual), ('epoch_date', [epoch_date(ms) for ms in values])]:
+    wrong = [(ms, want, got) for ms, want, got in zip(values, expected, got_dates)
+             if not (want is None and pd.isna(got)) and want != got]
+    for ms, want, got in wrong[:10]:
+        print(f'  {ms}: {want} row by row, {got} {name}')
+    assert len(wrong) == 0, f'{len(wrong)} of {len(values)} {name} dates differ'
+# Midnight values give back the cleaned dates they came from
+assert set(actual[0:len(days) * len(TIMES_OF_DAY):len(TIMES_OF_DAY)]) == set(paid)
+
+print(f'{len(values)} epoch values ({len(days)} C7/C7E paid dates from cleaned/{YEAR}) match row by row, pandas {pd.__version__}')
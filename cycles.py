@@ -0,0 +1,29 @@
+# Cycles and races for the live update scripts, in the format BatchRunner takes (see expand_cycles in
+# models/batch.py). update-2024.py fetches and cleans them, update-totals.py fetches their report summaries
+
+STATEWIDE_RACE_CODES = {
+    # Manually from CERS
+    'gov': '81',
+    'sos': '193',
+    'ag': '2',
+    'opi': '245',
+    'auditor': '244',
+    'supcoClerk': '10',
+}
+
+STATE_DISTRICT_RACE_CODES = {
+    'supcoChief': '246',
+    'supco3': '249',
+    'psc2': '188',
+    'psc3': '189',
+    'psc4': '190',
+}
+
+CYCLES = [
+    {
+        'cycle': '2024',
+        'committees': True,  # PACS
+        'legislative': True,
+        'races': {**STATEWIDE_RACE_CODES, **STATE_DISTRICT_RACE_CODES},
+    },
+]
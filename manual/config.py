@@ -1,17 +1,5 @@
-# Alternative reports for places where CERS is choking on large downloads
-# id: filename: filePath (.csv downloaded from CERS on a good day)
-MANUAL_CONTRIBUTION_CACHES = {
-    66995: 'manual/Busse-Ryan-66995-q1-2024-contributions.csv'
-    # 46348: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-46348-cooney-q42019-contributions.csv',
-    # 45786: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-45786-cooney-q32019-contributions.csv',
-    # 46959: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-46959-cooney-q12020-contributions.csv',
-    # 47635: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-47635-cooney-apr2020-contributions.csv',
-    # 48320: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-48320-cooney-may2020-contributions.csv',
-    # 48513: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-48513-cooney-june2020-contribututions.csv',
-    # 50070: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-50070-cooney-aug2020-contribututions.csv',
-    # 50595: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-50595-cooney-sept2020-contribututions.csv',
-    # 51325: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-51325-cooney-oct2020-contribututions.csv',
-}
+# Alternative report summaries for places where CERS is choking on large pages
+# id: filePath (.html saved from CERS on a good day)
 MANUAL_SUMMARY_CACHES = {
     66995: 'manual/Busse-Ryan-66995-q1-2024-summary.html'
     # 48513: 'scrapers/state-finance-reports/raw/Cooney-Mike--R/manual-48513-cooney-june2020-summary.html',
@@ -0,0 +1,54 @@
+# Converts cached Report files between cache formats (see models/report_cache.py)
+# e.g. python3 migrate-cache.py cache/2024 --to parquet
+#      python3 migrate-cache.py cache --from parquet --to json --delete
+
+import os
+import re
+import argparse
+
+from models.report_cache import get_cache_backend, CACHE_BACKENDS
+
+REPORT_FILES = {
+    'json': re.compile(r'^([A-Z][A-Z0-9]*)-(\d+)\.json$'),
+    'parquet': re.compile(r'^([A-Z][A-Z0-9]*)-(\d+)\.meta\.json$'),
+    'arrow': re.compile(r'^([A-Z][A-Z0-9]*)-(\d+)\.meta\.json$'),
+}
+
+parser = argparse.ArgumentParser(description='Convert Report cache folders between formats')
+parser.add_argument('root', help='cache folder to convert, e.g. cache/2024')
+parser.add_argument('--from', dest='source', default='json', choices=list(CACHE_BACKENDS))
+parser.add_argument('--to', dest='target', required=True, choices=list(CACHE_BACKENDS))
+parser.add_argument('--delete', action='store_true', help='remove source-format files once converted')
+args = parser.parse_args()
+if args.source == args.target:
+    parser.error('--from and --to formats are the same')
+
+source = get_cache_backend(args.source)
+target = get_cache_backend(args.target)
+pattern = REPORT_FILES[args.source]
+
+converted = 0
+skipped = 0
+for directory, _, files in os.walk(args.root):
+    for file in sorted(files):
+        match = pattern.match(file)
+        if match is None:
+            continue
+        form, id = match.group(1), int(match.group(2))
+        if not source.exists(directory, form, id):
+            # e.g. a .meta.json belonging to the other columnar format
+            skipped += 1
+            continue
+        meta = source.read_meta(directory, form, id)
+        if 'data' not in meta:
+            print('Skipping malformed cache', os.path.join(directory, file))
+            skipped += 1
+            continue
+        contributions, expenditures = source.read_frames(directory, form, id, meta)
+        target.write(directory, form, id, meta, contributions, expenditures)
+        if args.delete:
+            for path in source.paths(directory, form, id):
+                os.remove(path)
+        converted += 1
+
+print(f'Converted {converted} cached reports from {args.source} to {args.target} ({skipped} skipped)')
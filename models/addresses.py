@@ -0,0 +1,190 @@
+"""
+Column-wise parsing of one-line CERS addresses
+
+Components
+- parse_addresses - Splits '1008 Prospect Ave, Helena, MT 59601-1234' strings into address columns,
+  returning the parsed columns plus a table of addresses that didn't parse cleanly
+- address_rows - The same for a list, returning tuples instead of an address frame
+- ADDRESS_COLUMNS / ANOMALY_COLUMNS - Columns of those two frames
+
+Addresses are parsed with one vectorized regex (pyarrow's if installed, else pandas str.extract)
+over the distinct values in a column - or, when only a few distinct values aren't memoized yet (most
+C7/C7E tables are a few dozen rows), with a compiled re one by one, which costs less than setting up
+the arrays. Parsed addresses are memoized across calls, since the same contributors turn up report after report. Anything the regex
+can't handle falls back to splitting on commas (the original Report._parse_address rules) and is listed
+in the anomaly table instead of printed.
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+ADDRESS_COLUMNS = ['Addr Line1', 'City', 'State', 'Zip', 'Zip4']
+ANOMALY_COLUMNS = ['Address', 'Problem', 'Rows'] + ADDRESS_COLUMNS
+
+# '{line 1}, {city}, {state} {zip}[-{zip4}]' - line 1 may itself contain commas, and may be missing
+ADDRESS_PATTERN = (r'^\s*(?:(?P<line1>.*?)\s*,\s*)?(?P<city>[^,]*?)\s*,\s*'
+                   r'(?P<state>[A-Za-z]{2})\.?(?:\s+(?P<zip>\d{5})(?:\s*-?\s*(?P<zip4>\d{4}))?)?\s*$')
+
+# Same pattern for one address at a time. ASCII, so \d and \s mean what they do in pyarrow's RE2
+ADDRESS_RE = re.compile(ADDRESS_PATTERN, re.ASCII)
+
+# Fewer distinct unparsed addresses than this are parsed one by one rather than vectorized
+SMALL_TABLE = 2000
+
+# Building an empty frame from column names takes longer than parsing a small table - copy this one
+_NO_ANOMALIES = pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+# Memo of parsed addresses - {raw: (Addr Line1, City, State, Zip, Zip4, Problem)}
+MEMO_SIZE = 200000
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _split_fallback(raw):
+    # Original comma-split rules, for addresses the pattern doesn't match
+    address = raw.split(', ')
+    if len(address) < 2:
+        return raw.strip(), '', '', '', ''
+    addressLn1 = ', '.join(address[0:len(address) - 2])
+    city = address[-2].strip()
+    state_zip = address[-1].split(' ')
+    state = state_zip[0]
+    zip_code = state_zip[1] if len(state_zip) > 1 else ''
+    return addressLn1, city, state, zip_code, ''
+
+
+def _extract(values):
+    """Regex groups for each value as a DataFrame of strings (state upper-cased), plus a mask of values that matched
+    Uses pyarrow's vectorized regex engine if installed, otherwise pandas str.extract
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        parts = pd.Series(values, dtype=object).str.extract(ADDRESS_PATTERN)
+        # city always takes part in a match, even if empty
+        matched = parts['city'].notna().to_numpy()
+        parts = parts.fillna('')
+        parts['state'] = parts['state'].str.upper()
+        return parts, matched
+    groups = pc.extract_regex(pa.array(values, type=pa.string()), ADDRESS_PATTERN)
+    fields = {name: groups.field(name).fill_null('') for name in ['line1', 'city', 'state', 'zip', 'zip4']}
+    fields['state'] = pc.utf8_upper(fields['state'])
+    parts = pd.DataFrame({name: field.to_numpy(zero_copy_only=False) for name, field in fields.items()})
+    return parts, groups.is_valid().to_numpy(zero_copy_only=False)
+
+
+def _problem(line1, city, zip_code):
+    if city == '':
+        return 'missing city'
+    if zip_code == '':
+        return 'missing zip'
+    if line1 == '':
+        return 'missing street'
+    return None
+
+
+def _parse_one(value):
+    """(Addr Line1, City, State, Zip, Zip4, Problem) for one raw address - same results as _parse_unique"""
+    match = ADDRESS_RE.match(value)
+    if match is None:
+        # Blank addresses never match
+        if value.strip() == '':
+            return '', '', '', '', '', None
+        return (*_split_fallback(value), 'unparsed')
+    line1, city, state, zip_code, zip4 = (group or '' for group in match.groups())
+    return line1, city, state.upper(), zip_code, zip4, _problem(line1, city, zip_code)
+
+
+def _parse_unique(values):
+    """Parses distinct raw address strings, returns a DataFrame of ADDRESS_COLUMNS plus Problem"""
+    parts, matched = _extract(values)
+    table = pd.DataFrame({
+        'Addr Line1': parts['line1'],
+        'City': parts['city'],
+        'State': parts['state'],
+        'Zip': parts['zip'],
+        'Zip4': parts['zip4'],
+    })
+    table['Problem'] = np.select(
+        [table['City'] == '', table['Zip'] == '', table['Addr Line1'] == ''],
+        ['missing city', 'missing zip', 'missing street'], default=None)
+    # Few enough to handle one by one - blank addresses never match
+    for i in np.flatnonzero(~matched):
+        if values[i].strip() == '':
+            table.iloc[i] = ['', '', '', '', '', None]
+        else:
+            table.iloc[i] = [*_split_fallback(values[i]), 'unparsed']
+    return table
+
+
+def _parsed_uniques(uniques):
+    # (Addr Line1, City, State, Zip, Zip4, Problem) for each distinct raw address, from the memo where possible
+    with _memo_lock:
+        rows = [_memo.get(value) for value in uniques]
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if len(missing) > 0:
+        values = [uniques[i] for i in missing]
+        if len(values) < SMALL_TABLE:
+            parsed = [_parse_one(value) for value in values]
+        else:
+            parsed = list(_parse_unique(values).itertuples(index=False, name=None))
+        with _memo_lock:
+            if len(_memo) + len(parsed) > MEMO_SIZE:
+                _memo.clear()
+            _memo.update(zip(values, parsed))
+        for i, row in zip(missing, parsed):
+            rows[i] = row
+    return rows
+
+
+def _anomalies(uniques, rows, codes):
+    anomalous = [i for i, row in enumerate(rows) if row[-1] is not None]
+    if len(anomalous) == 0:
+        return _NO_ANOMALIES.copy()
+    counts = np.bincount(codes, minlength=len(uniques))
+    return pd.DataFrame([(uniques[i], rows[i][-1], counts[i], *rows[i][:-1]) for i in anomalous],
+                        columns=ANOMALY_COLUMNS)
+
+
+def _small_codes(values):
+    # Python lists beat factorize's array setup for a few dozen rows
+    keys = {}
+    codes = [keys.setdefault('' if pd.isna(value) else str(value), len(keys)) for value in values]
+    return codes, list(keys)
+
+
+def address_rows(values):
+    """parse_addresses for a list of raw addresses, for tables built row by row
+    Returns (rows, anomalies) - rows is a list of ADDRESS_COLUMNS tuples
+    """
+    codes, uniques = _small_codes(values)
+    rows = _parsed_uniques(uniques)
+    return [rows[code][:-1] for code in codes], _anomalies(uniques, rows, codes)
+
+
+def parse_addresses(raw):
+    """Parses a column of one-line addresses
+    Returns (addresses, anomalies):
+    - addresses - DataFrame of ADDRESS_COLUMNS, aligned with raw. Missing/blank addresses give blank columns
+    - anomalies - DataFrame of ANOMALY_COLUMNS, one row per distinct address that didn't parse cleanly.
+      Problem is 'unparsed' (split on commas instead), 'missing city', 'missing zip' or 'missing street'
+    """
+    raw = pd.Series(raw, dtype=object)
+    if len(raw) < SMALL_TABLE:
+        codes, uniques = _small_codes(raw.tolist())
+    else:
+        codes, uniques = pd.factorize(raw.fillna('').astype(str))
+        uniques = uniques.to_numpy()
+    rows = _parsed_uniques(uniques)
+
+    # Row lookups by code into one object block rather than a frame per step - most C7 tables are only
+    # a few dozen rows, where building the frame costs more than parsing
+    values = np.empty((len(codes), len(ADDRESS_COLUMNS)), dtype=object)
+    if len(codes) > 0:
+        values[:] = [rows[code][:-1] for code in codes]
+    addresses = pd.DataFrame(values, index=raw.index, columns=ADDRESS_COLUMNS, copy=False)
+    return addresses, _anomalies(uniques, rows, codes)
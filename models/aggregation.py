@@ -0,0 +1,136 @@
+"""
+Cross-race contribution aggregation for a cycle's cleaned data
+
+Components
+- load_contributions - Reads cleaned/{year}/{race}/contributions.csv files into one frame
+- add_keys - Adds Recipient, Contributor and Address keys
+- contributor_totals - Total contributions by Contributor key
+- aggregate_cycle - Writes all-contributions.csv and contributor-totals.csv for a cycle
+- resolved_totals / aggregate_all - Totals by resolved contributor ID (see models/contributors.py)
+  across every cycle in cleaned/
+
+Keys are built with vectorized string operations. Missing name/address parts are treated as
+empty strings (rather than rendering as 'nan' or '<NA>').
+"""
+
+import os
+import glob
+
+import pandas as pd
+
+from models.frames import FrameAccumulator
+from models.contributors import ContributorIndex, DEFAULT_INDEX_PATH, zip5
+
+DTYPE = {
+    'Committee': 'string',
+    'Candidate': 'string',
+    'Entity Name': 'string',
+    'First Name': 'string',
+    'Last Name': 'string',
+    'Amount': float,
+}
+
+
+def race_paths(year, races=None, cleaned_dir='cleaned'):
+    """Returns contributions.csv paths for a cycle; every race folder with contributions if races is None"""
+    if races is None:
+        return sorted(glob.glob(os.path.join(cleaned_dir, str(year), '*', 'contributions.csv')))
+    return [os.path.join(cleaned_dir, str(year), race, 'contributions.csv') for race in races]
+
+
+def load_contributions(paths):
+    frames = FrameAccumulator()
+    for path in paths:
+        frames.add(pd.read_csv(path, dtype=DTYPE))
+    return frames.result()
+
+
+def _text(df, col):
+    # Column as plain strings with missing values (or a missing column) as ''
+    if col not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[col].astype(object).where(df[col].notna(), '').astype(str)
+
+
+def add_keys(df):
+    """Adds uppercased Recipient ('{Committee}{Candidate}'), Contributor ('{Entity Name}{First Name} {Last Name}')
+    and Address ('{Addr Line1} {City}, {State} {Zip}') columns
+    """
+    df = df.copy()
+    df['Recipient'] = (_text(df, 'Committee') + _text(df, 'Candidate'))\
+        .str.strip().str.upper()
+    df['Contributor'] = (_text(df, 'Entity Name') + _text(df, 'First Name') + ' ' + _text(df, 'Last Name'))\
+        .str.strip().str.upper().str.replace('  ', ' ', regex=False)
+    df['Address'] = _text(df, 'Addr Line1') + ' ' + _text(df, 'City') + ', ' \
+        + _text(df, 'State') + ' ' + _text(df, 'Zip')
+    return df
+
+
+def contributor_totals(df):
+    return df.groupby('Contributor').agg({
+        'Amount': 'sum',
+    })\
+        .sort_values('Amount', ascending=False)
+
+
+def aggregate_cycle(year, races=None, cleaned_dir='cleaned'):
+    """Writes {cleaned_dir}/{year}/all-contributions.csv and contributor-totals.csv
+    - races - race folders to include, e.g. ['leg', 'gov']. Defaults to every race folder with contributions
+    """
+    df = add_keys(load_contributions(race_paths(year, races, cleaned_dir)))
+    df.to_csv(os.path.join(cleaned_dir, str(year), 'all-contributions.csv'), index=False)
+
+    print(len(df), 'contributions')
+    print('$', df['Amount'].sum(), 'total')
+
+    contributors = contributor_totals(df)
+    contributors.to_csv(os.path.join(cleaned_dir, str(year), 'contributor-totals.csv'))
+    return df, contributors
+
+
+def all_cycle_paths(cleaned_dir='cleaned'):
+    """Returns every cleaned/{year}/{race}/contributions.csv path"""
+    return sorted(glob.glob(os.path.join(cleaned_dir, '*', '*', 'contributions.csv')))
+
+
+def _most_common(df, column):
+    # Most frequent value of column for each Contributor ID
+    counts = df.groupby(['Contributor ID', column]).size().reset_index(name='n')
+    return counts.sort_values('n', ascending=False).drop_duplicates('Contributor ID').set_index('Contributor ID')[column]
+
+
+def resolved_totals(df):
+    """Total contributions by Contributor ID, with each contributor's most common spelling and ZIP,
+    number of contributions, number of recipients and the cycles they gave in
+    """
+    df = df[df['Contributor ID'].notna()]
+    totals = df.groupby('Contributor ID').agg(
+        Amount=('Amount', 'sum'),
+        Contributions=('Amount', 'size'),
+        Recipients=('Recipient', 'nunique'),
+        Cycles=('Cycle', lambda cycles: ';'.join(sorted(set(cycles)))),
+    )
+    totals.insert(0, 'Contributor', _most_common(df, 'Contributor'))
+    totals.insert(1, 'Zip', _most_common(df.assign(Zip=zip5(df['Zip']).to_numpy()), 'Zip'))
+    return totals.sort_values('Amount', ascending=False)
+
+
+def aggregate_all(cleaned_dir='cleaned', indexPath=DEFAULT_INDEX_PATH):
+    """Writes {cleaned_dir}/contributor-totals.csv - totals by contributor across every cycle, with spelling
+    variants linked through the contributor index at indexPath (which is updated with any new names)
+    """
+    frames = FrameAccumulator()
+    for path in all_cycle_paths(cleaned_dir):
+        cycle = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        frames.add(pd.read_csv(path, dtype=DTYPE).assign(Cycle=cycle))
+    df = add_keys(frames.result())
+
+    index = ContributorIndex(indexPath)
+    df['Contributor ID'] = index.resolve(df['Contributor'], df['Zip'])
+    index.save()
+
+    totals = resolved_totals(df)
+    totals.to_csv(os.path.join(cleaned_dir, 'contributor-totals.csv'))
+    print(f'{len(totals)} contributors across {df["Cycle"].nunique()} cycles, '
+          f'from {df["Contributor"].nunique()} distinct names')
+    return df, totals
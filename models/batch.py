@@ -0,0 +1,346 @@
+"""
+Declarative batch runs across cycles and races
+
+Components
+- Race - One race to fetch and clean: committees with spending, legislative candidates or a race code
+- expand_cycles - Turns a cycle config (see update-2024.py) into Races
+- Stage - One step of a run: fetch (CERS -> raw export), clean (raw -> cleaned) or warehouse (cache -> SQLite),
+  or for summary-only runs summary (CERS report summaries -> totals table) and totals (-> cleaned CSVs)
+- build_stages - The dependency graph for a list of Races
+- BatchRunner - Runs stages as their dependencies finish, skipping those whose inputs haven't changed,
+  and writes per-stage timings to logs.json
+
+Fetch stages run on a thread pool (they wait on CERS, and share one request budget), clean stages on
+a process pool (see models/clean_runner.py), so one race can be cleaning while others are still
+fetching. Fetch stages always run - on incremental runs unchanged candidates/committees are skipped
+inside the fetch. Clean and warehouse stages record a content hash of their inputs in a state file and
+are skipped when it matches the last successful run and their outputs are still there.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from models.cers_interface import Interface, AsyncInterface, ACTIVE_STATUSES
+from models.clean_runner import CleanJob, run_clean_job, _pool_context
+from models.rate_limit import DEFAULT_RPS, DEFAULT_CONCURRENCY
+from models.warehouse import Warehouse
+
+DEFAULT_STATE_PATH = 'cache/batch-state.json'
+DEFAULT_LOG_PATH = 'logs.json'
+
+Race = namedtuple('Race', ['cycle', 'key', 'recipe', 'code', 'filterStatuses'])
+
+Stage = namedtuple('Stage', ['name', 'kind', 'deps', 'inputs', 'outputs', 'job'])
+
+
+def expand_cycles(cycles):
+    """Races for a list of cycle configs:
+    {'cycle': '2024', 'committees': True, 'legislative': True, 'races': {'gov': '81', ...},
+     'filterStatuses': [...]}
+    - committees / legislative - include committees with spending / legislative candidates (default False)
+    - races - {key: CERS office code} for statewide and state district races
+    - filterStatuses - candidate statuses to keep (default ACTIVE_STATUSES)
+    """
+    races = []
+    for config in cycles:
+        cycle = str(config['cycle'])
+        statuses = config.get('filterStatuses', ACTIVE_STATUSES)
+        if config.get('committees', False):
+            races.append(Race(cycle, 'committees', 'committees', None, None))
+        if config.get('legislative', False):
+            races.append(Race(cycle, 'leg', 'legislative', None, statuses))
+        for key, code in config.get('races', {}).items():
+            races.append(Race(cycle, key, 'race', code, statuses))
+    return races
+
+
+def raw_directory(race):
+    return f'raw/{race.cycle}/{race.key}'
+
+
+def cleaned_directory(race):
+    return f'cleaned/{race.cycle}/{race.key}'
+
+
+def totals_paths(cycle):
+    return [f'cleaned/{cycle}/candidate-totals.csv', f'cleaned/{cycle}/committee-totals.csv']
+
+
+def build_stages(races, warehouse=None, summaryOnly=False):
+    """Stages in dependency order: fetch and clean for each race, then (if warehouse is a database path)
+    a warehouse load for each cycle once all of its races are fetched
+    - summaryOnly - a summary stage for each race instead, then a totals stage for each cycle
+    """
+    stages = []
+    if summaryOnly:
+        for cycle in sorted({race.cycle for race in races}):
+            cycle_races = [race for race in races if race.cycle == cycle]
+            for race in cycle_races:
+                stages.append(Stage(f'summary:{cycle}/{race.key}', 'summary', [], None, [], race))
+            stages.append(Stage(f'totals:{cycle}', 'totals', [f'summary:{cycle}/{race.key}' for race in cycle_races],
+                                None, totals_paths(cycle), cycle))
+        return stages
+    for race in races:
+        fetch = f'fetch:{race.cycle}/{race.key}'
+        stages.append(Stage(fetch, 'fetch', [], None, [raw_directory(race)], race))
+        kind = 'committee' if race.recipe == 'committees' else 'candidate'
+        stages.append(Stage(f'clean:{race.cycle}/{race.key}', 'clean', [fetch],
+                            [raw_directory(race)],
+                            [os.path.join(cleaned_directory(race), 'summary.json')],
+                            CleanJob(raw_directory(race), cleaned_directory(race), kind)))
+    if warehouse is not None:
+        for cycle in sorted({race.cycle for race in races}):
+            cycle_races = [race for race in races if race.cycle == cycle]
+            # Raw exports are rebuilt exactly when their cached reports change, and are much smaller
+            stages.append(Stage(f'warehouse:{cycle}', 'warehouse',
+                                [f'fetch:{cycle}/{race.key}' for race in cycle_races],
+                                [raw_directory(race) for race in cycle_races],
+                                [warehouse], cycle))
+    return stages
+
+
+def fingerprint(paths):
+    """md5 over the names and contents of every file under paths (files or folders). Missing paths count as empty"""
+    digest = hashlib.md5()
+    for path in paths:
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(directory, file) for directory, _, names in os.walk(path) for file in names)
+        for file in files:
+            digest.update(os.path.relpath(file, path).encode('utf-8') + b'\0')
+            with open(file, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class BatchRunner:
+    """Runs fetch, clean and warehouse stages for a list of cycle configs (see expand_cycles)
+    - raceWorkers - races fetched at once. Requests across all of them share the global budget below
+    - workers, incremental, cacheFormat, requestsPerSecond, maxInFlight, rawStore, replay - as on Interface
+    - asyncFetch - fetch on one asyncio event loop with AsyncInterface (needs aiohttp) instead of threads
+    - cleanWorkers - processes for clean stages. None uses every CPU
+    - warehouse - SQLite database fetched cycles are loaded into (see models/warehouse.py). None skips it
+    - summaryOnly - fetch just report summaries and write each cycle's candidate-totals.csv and
+      committee-totals.csv to cleaned/{cycle} - no raw exports, cleaning or warehouse
+    - statePath - where input hashes of finished stages are kept between runs
+    - logPath - stage timings are written here (with lastUpdateTime). None only prints them
+    - force - run every stage, even if its inputs haven't changed
+    """
+
+    def __init__(self, cycles, raceWorkers=4, workers=8, incremental=True, cacheFormat=None,
+                 requestsPerSecond=DEFAULT_RPS, maxInFlight=DEFAULT_CONCURRENCY,
+                 rawStore=None, replay=False, asyncFetch=False, cleanWorkers=None,
+                 warehouse=None, summaryOnly=False, statePath=DEFAULT_STATE_PATH, logPath=DEFAULT_LOG_PATH, force=False):
+        self.races = expand_cycles(cycles)
+        self.stages = build_stages(self.races, warehouse, summaryOnly)
+        self.raceWorkers = raceWorkers
+        self.interfaceOptions = {
+            'workers': workers, 'incremental': incremental, 'cacheFormat': cacheFormat,
+            'requestsPerSecond': requestsPerSecond, 'maxInFlight': maxInFlight,
+            'rawStore': rawStore, 'replay': replay,
+        }
+        self.asyncFetch = asyncFetch
+        self.cleanWorkers = cleanWorkers or os.cpu_count() or 1
+        self.warehouse = warehouse
+        self.statePath = statePath
+        self.logPath = logPath
+        self.force = force
+        # {(cycle, race key): totals table} from summary stages
+        self.totals = {}
+        self.state = {}
+        if os.path.isfile(statePath):
+            with open(statePath) as f:
+                self.state = json.load(f)
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.statePath) or '.', exist_ok=True)
+        # Write-then-rename so an interrupted run can't leave a half-written state file
+        tmp_path = self.statePath + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(tmp_path, self.statePath)
+
+    # Fetch
+
+    def _fetch(self, cers, race, summaryOnly=False):
+        if race.recipe == 'committees':
+            return cers.get_committees_with_spending(cycle=race.cycle, summaryOnly=summaryOnly)
+        if race.recipe == 'legislative':
+            return cers.get_legislative_candidates(cycle=race.cycle, filterStatuses=race.filterStatuses,
+                                                   summaryOnly=summaryOnly)
+        return cers.get_candidates_by_race(race.cycle, race.code, filterStatuses=race.filterStatuses,
+                                           summaryOnly=summaryOnly)
+
+    def _fetch_stage(self, race):
+        start = time.perf_counter()
+        results = self._fetch(self.cers, race)
+        results.export(raw_directory(race))
+        return {'seconds': time.perf_counter() - start, 'changed': results.changed}
+
+    async def _fetch_stage_async(self, race):
+        start = time.perf_counter()
+        results = await self._fetch(self.cers, race)
+        # Writing the export is file and CSV work - off the loop, so other races keep fetching meanwhile
+        await asyncio.to_thread(results.export, raw_directory(race))
+        return {'seconds': time.perf_counter() - start, 'changed': results.changed}
+
+    def _summary_stage(self, race):
+        start = time.perf_counter()
+        self.totals[(race.cycle, race.key)] = self._fetch(self.cers, race, summaryOnly=True).totals
+        return {'seconds': time.perf_counter() - start, 'rows': len(self.totals[(race.cycle, race.key)])}
+
+    async def _summary_stage_async(self, race):
+        start = time.perf_counter()
+        self.totals[(race.cycle, race.key)] = (await self._fetch(self.cers, race, summaryOnly=True)).totals
+        return {'seconds': time.perf_counter() - start, 'rows': len(self.totals[(race.cycle, race.key)])}
+
+    async def _open_async(self):
+        return AsyncInterface(**self.interfaceOptions)
+
+    def _start_fetching(self):
+        if self.asyncFetch:
+            # Fetch coroutines run on a loop in its own thread, so they can be awaited alongside clean stages
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(target=self.loop.run_forever, daemon=True).start()
+            self.cers = asyncio.run_coroutine_threadsafe(self._open_async(), self.loop).result()
+        else:
+            self.cers = Interface(**self.interfaceOptions)
+            self.fetchPool = ThreadPoolExecutor(max_workers=self.raceWorkers)
+
+    def _stop_fetching(self):
+        self.cers.print_client_stats()
+        if self.asyncFetch:
+            asyncio.run_coroutine_threadsafe(self.cers.close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        else:
+            self.fetchPool.shutdown()
+
+    # Clean, warehouse and totals
+
+    def _warehouse_stage(self, cycle):
+        start = time.perf_counter()
+        with Warehouse(self.warehouse) as warehouse:
+            loaded, skipped = warehouse.load_cache(f'cache/{cycle}', cycle)
+        return {'seconds': time.perf_counter() - start, 'loaded': loaded, 'unchanged': skipped}
+
+    def _totals_stage(self, cycle):
+        start = time.perf_counter()
+        candidate_path, committee_path = totals_paths(cycle)
+        # In config order, whichever finished first
+        races = [(race.key, self.totals[(cycle, race.key)]) for race in self.races if race.cycle == cycle]
+        os.makedirs(os.path.dirname(candidate_path), exist_ok=True)
+        candidates = [totals.assign(race=key) for key, totals in races if key != 'committees']
+        if len(candidates) > 0:
+            pd.concat(candidates, ignore_index=True).to_csv(candidate_path, index=False)
+        committees = dict(races).get('committees')
+        if committees is not None:
+            committees.to_csv(committee_path, index=False)
+        candidate_count = sum(len(totals) for totals in candidates)
+        committee_count = 0 if committees is None else len(committees)
+        print(f'{candidate_count} candidate and {committee_count} committee totals written to cleaned/{cycle}')
+        return {'seconds': time.perf_counter() - start, 'candidates': candidate_count, 'committees': committee_count}
+
+    def _submit(self, stage):
+        if stage.kind in ('fetch', 'summary'):
+            if self.asyncFetch:
+                job = self._fetch_stage_async if stage.kind == 'fetch' else self._summary_stage_async
+                return asyncio.run_coroutine_threadsafe(job(stage.job), self.loop)
+            return self.fetchPool.submit(self._fetch_stage if stage.kind == 'fetch' else self._summary_stage, stage.job)
+        if stage.kind == 'clean':
+            return self.cleanPool.submit(run_clean_job, stage.job)
+        if stage.kind == 'totals':
+            return self.writePool.submit(self._totals_stage, stage.job)
+        return self.writePool.submit(self._warehouse_stage, stage.job)
+
+    def _is_current(self, stage, inputs):
+        if self.force or stage.inputs is None:
+            return False
+        return self.state.get(stage.name) == inputs and all(os.path.exists(path) for path in stage.outputs)
+
+    def run(self):
+        """Runs every stage, returns their log records in the order they finished"""
+        start = time.perf_counter()
+        records = []
+        status = {}
+        pending = list(self.stages)
+        running = {}
+
+        self.cleanPool = None
+        if any(stage.kind == 'clean' for stage in self.stages):
+            self.cleanPool = ProcessPoolExecutor(max_workers=self.cleanWorkers, mp_context=_pool_context())
+            # Forked pools start every worker on the first submit - do that before fetch threads are running
+            self.cleanPool.submit(os.getpid).result()
+        self._start_fetching()
+        # One warehouse load or totals write at a time - loads write to the same database
+        self.writePool = ThreadPoolExecutor(max_workers=1)
+        try:
+            while len(pending) > 0 or len(running) > 0:
+                for stage in [s for s in pending if all(dep in status for dep in s.deps)]:
+                    pending.remove(stage)
+                    record = {'stage': stage.name, 'kind': stage.kind,
+                              'start': round(time.perf_counter() - start, 3)}
+                    if any(status[dep] in ('failed', 'blocked') for dep in stage.deps):
+                        status[stage.name] = 'blocked'
+                        records.append({**record, 'status': 'blocked', 'seconds': 0})
+                        print(f'-- {stage.name} not run - an earlier stage failed')
+                        continue
+                    inputs = fingerprint(stage.inputs) if stage.inputs is not None else None
+                    if self._is_current(stage, inputs):
+                        status[stage.name] = 'skipped'
+                        records.append({**record, 'status': 'skipped', 'seconds': 0})
+                        print(f'-- {stage.name} skipped - inputs unchanged')
+                        continue
+                    running[self._submit(stage)] = (stage, record, inputs)
+                if len(running) == 0:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, record, inputs = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        status[stage.name] = 'failed'
+                        records.append({**record, 'status': 'failed', 'error': repr(e),
+                                        'seconds': round(time.perf_counter() - start - record['start'], 3)})
+                        print(f'!! {stage.name} failed: {e!r}')
+                        continue
+                    status[stage.name] = 'ran'
+                    details = {key: value for key, value in result.items()
+                               if key not in ('seconds', 'raw_directory', 'out_path', 'cleaner')}
+                    records.append({**record, 'status': 'ran', 'seconds': round(result['seconds'], 3), **details})
+                    if inputs is not None:
+                        self.state[stage.name] = inputs
+                        self._save_state()
+        finally:
+            self._stop_fetching()
+            if self.cleanPool is not None:
+                self.cleanPool.shutdown()
+            self.writePool.shutdown()
+
+        elapsed = time.perf_counter() - start
+        self._report(records, elapsed)
+        return records
+
+    def _report(self, records, elapsed):
+        for record in records:
+            print(f"{record['stage']:<32} {record['status']:<8} {record['seconds']:>8.1f}s")
+        counts = {s: sum(r['status'] == s for r in records) for s in ('ran', 'skipped', 'failed', 'blocked')}
+        print(f"{len(records)} stages in {elapsed:.1f}s - " + ', '.join(f'{n} {s}' for s, n in counts.items()))
+        if self.logPath is not None:
+            with open(self.logPath, 'w') as f:
+                json.dump({
+                    'lastUpdateTime': str(datetime.now()),
+                    'seconds': round(elapsed, 3),
+                    'stages': records,
+                }, f, indent=4)
@@ -0,0 +1,421 @@
+"""
+Asyncio client and list builders for CERS
+
+Components
+- AsyncCersClient - aiohttp client with per-flow cookie jars on one shared connection pool
+- AsyncCersClient.candidate_list / committee_list - async equivalents of CandidateList / CommitteeList
+
+Needs aiohttp installed.
+
+Same flows as the blocking models: search post then paged list gets, report list post then gets,
+retrieveReport then financeRepDetailList posts for C7/C7E, prepare-then-download for schedules.
+Each stateful flow gets its own aiohttp session (cookie jar) so concurrent flows can't clobber
+each other's server-side state. Requests go through the same RequestPolicy and RateLimiter as
+the blocking client, so both share one budget.
+
+Only the network waits run on the event loop. Responses for each report are fetched up front and
+handed to the usual Report class (parsing, caching) in a worker thread via PrefetchedReportSource,
+so cache and export files are the same as the blocking path. Responses are recorded to the raw store
+like the blocking path's, and replaying one skips the network here too (see models/raw_store.py).
+"""
+
+import os
+import json
+import asyncio
+import tempfile
+
+import pandas as pd
+import requests
+
+from models.cers_client import get_client, rebase, DEFAULT_POOL_SIZE, SLOW_FRACTION
+from models.cers_candidate import CandidateList, Candidate
+from models.cers_committee import CommitteeList, Committee
+from models.concurrency import (DEFAULT_WORKERS, skip_unchanged, load_fetched_reports, try_build_report,
+                                load_summaries, try_build_summary)
+from models.downloads import DOWNLOAD_CHUNK_SIZE, read_schedule
+from models.manifest import get_manifest
+from models.pagination import DEFAULT_PAGE_SIZE
+from models.report_cache import find_cached
+from models.raw_store import get_raw_store, record, record_file
+from models.report_source import (PrefetchedReportSource, ReplayReportSource, report_requests, report_payload, schedule_payload,
+                                  summary_request, schedule_request, detail_request, detail_rows,
+                                  DETAIL_SESSION_MODES, RETRIEVE_REPORT_URL, DETAIL_LIST_URL, PREPARE_DOWNLOAD_URL, DOWNLOAD_URL)
+
+from manual.config import MANUAL_SUMMARY_CACHES
+
+
+class AsyncResponse:
+    """Body-read response, so connections go back to the pool right away"""
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+    def release(self):
+        # Body's already read
+        pass
+
+
+class AsyncStream:
+    """Response with its body left to stream, like requests' stream=True - release() once done with content"""
+
+    def __init__(self, response):
+        self.status_code = response.status
+        self.headers = response.headers
+        self.content = response.content
+        self._response = response
+
+    def release(self):
+        self._response.release()
+
+
+class AsyncCersClient:
+    """Async client for CERS
+    - poolSize - max connections held open to CERS
+    - workers - max reports being fetched/built at once (bounds memory, not request concurrency -
+      that's up to the shared RateLimiter)
+    - policy, limiter - default to the blocking client's, so both share timeouts, breaker and budget
+    - baseUrl - host to send CERS requests to instead of cers-ext.mt.gov. Defaults to the blocking client's
+    - detailSessions - how C7/C7E detail lists are fetched, one of DETAIL_SESSION_MODES (models/report_source.py)
+    """
+
+    def __init__(self, poolSize=DEFAULT_POOL_SIZE, workers=DEFAULT_WORKERS, policy=None, limiter=None,
+                 detailSessions='clone', baseUrl=None):
+        if detailSessions not in DETAIL_SESSION_MODES:
+            raise ValueError(f'detailSessions must be one of {DETAIL_SESSION_MODES}')
+        import aiohttp
+        self.aiohttp = aiohttp
+        self.poolSize = poolSize
+        self.workers = workers
+        self.detailSessions = detailSessions
+        self.policy = policy or get_client().policy
+        self.limiter = limiter or get_client().limiter
+        self.baseUrl = baseUrl or get_client().baseUrl
+        self.sessions_issued = 0
+        self._connector = None
+        self._reports = None
+
+    def session(self):
+        """Returns an aiohttp.ClientSession with its own cookie jar on the shared connector
+        Closing it leaves the shared connector open
+        """
+        if self._connector is None:
+            self._connector = self.aiohttp.TCPConnector(limit=self.poolSize)
+        self.sessions_issued += 1
+        return self.aiohttp.ClientSession(connector=self._connector, connector_owner=False,
+                                          cookie_jar=self.aiohttp.CookieJar(unsafe=True))
+
+    async def close(self):
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # Requests
+
+    async def request(self, session, method, url, data=None, params=None, headers=None, stream=False):
+        """Sends a request through the shared RequestPolicy and RateLimiter, returns AsyncResponse
+        - stream - return an AsyncStream for successful replies instead, with the rate-limiter slot
+          freed once the headers are in (as the blocking client does for stream=True)
+        """
+        url = rebase(url.strip(), self.baseUrl)
+        slowAfter = self.policy.timeout_for(url)[1] * SLOW_FRACTION
+
+        async def limited(method, url, **kwargs):
+            return await self.limiter.call_async(self._send, method, url, slowAfter=slowAfter, session=session, **kwargs)
+        return await self.policy.send_async(limited, method, url, data=data, params=params, headers=headers, stream=stream)
+
+    async def _send(self, method, url, session, timeout, data=None, params=None, headers=None, stream=False):
+        connect, read = timeout
+        try:
+            r = await session.request(method, url, data=data, params=params, headers=headers,
+                                      timeout=self.aiohttp.ClientTimeout(sock_connect=connect, sock_read=read))
+            if stream and r.status < 400:
+                return AsyncStream(r)
+            try:
+                text = await r.text(errors='replace')
+            finally:
+                r.release()
+            return AsyncResponse(r.status, r.headers, text)
+        except asyncio.TimeoutError as e:
+            # Translated so RequestPolicy treats these like the blocking client's failures
+            raise requests.Timeout(f'{url} timed out') from e
+        except self.aiohttp.ClientError as e:
+            raise requests.ConnectionError(repr(e)) from e
+
+    async def post(self, session, url, data=None):
+        return await self.request(session, 'POST', url, data=data)
+
+    async def get(self, session, url, params=None, headers=None, stream=False):
+        return await self.request(session, 'GET', url, params=params, headers=headers, stream=stream)
+
+    async def fetch_rows(self, session, list_url, pageSize=DEFAULT_PAGE_SIZE):
+        """Async fetch_rows() (see models/pagination.py) - returns every row, pages after the first fetched at once"""
+        first = (await self.get(session, list_url.format(start=0, length=pageSize))).json()
+        rows = list(first['aaData'])
+        total = first.get('iTotalDisplayRecords', first.get('iTotalRecords'))
+        if total is None:
+            start = pageSize
+            page = first['aaData']
+            while len(page) == pageSize:
+                page = (await self.get(session, list_url.format(start=start, length=pageSize))).json()['aaData']
+                rows += page
+                start += pageSize
+            return rows
+
+        pages = await asyncio.gather(*(self.get(session, list_url.format(start=start, length=pageSize))
+                                       for start in range(pageSize, int(total), pageSize)))
+        for page in pages:
+            rows += page.json()['aaData']
+        return rows
+
+    async def download(self, session, url, path, params=None, retries=3):
+        """Async download_file() (see models/downloads.py) - streams to disk, resuming with Range requests
+        Each GET goes through request(), so failed replies are retried and count toward the breaker
+        """
+        part = path + '.part'
+        attempt = 0
+        while True:
+            offset = os.path.getsize(part) if os.path.exists(part) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+            r = await self.get(session, url, params=params, headers=headers, stream=True)
+            try:
+                if offset > 0 and r.status_code == 416:
+                    # Nothing left to fetch
+                    break
+                if r.status_code >= 400:
+                    raise requests.HTTPError(f'{r.status_code} from {url}', response=r)
+                if r.status_code != 206:
+                    offset = 0
+                # File calls go through worker threads so a slow disk doesn't hold up the loop
+                f = await asyncio.to_thread(open, part, 'ab' if offset > 0 else 'wb')
+                try:
+                    async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+                break
+            except (asyncio.TimeoutError, self.aiohttp.ClientPayloadError, self.aiohttp.ClientConnectionError) as e:
+                if attempt >= retries:
+                    raise requests.ConnectionError(repr(e)) from e
+                attempt += 1
+                print(f'--- Download interrupted after {os.path.getsize(part) if os.path.exists(part) else 0} bytes ({e!r}), resuming ({attempt}/{retries})')
+            finally:
+                r.release()
+        os.replace(part, path)
+        return path
+
+    # Report responses
+
+    async def fetch_report_responses(self, raw, fetchFullReports=True):
+        """Fetches every response a Report needs (keys from report_source.report_requests)"""
+        needed = report_requests(raw, fetchFullReports,
+                                 skipSummary=raw['reportId'] in MANUAL_SUMMARY_CACHES)
+        results = await asyncio.gather(*(self._fetch_response(raw, key) for key in needed))
+        return dict(zip(needed, results))
+
+    async def _fetch_response(self, raw, key):
+        if key[0] == 'summary':
+            async with self.session() as session:
+                text = (await self.post(session, RETRIEVE_REPORT_URL, report_payload(raw))).text
+                await asyncio.to_thread(record, summary_request(raw), text, raw['amendedDate'])
+                return text
+        if key[0] == 'schedule':
+            return await self._fetch_schedule(raw, key[1])
+        return await self._fetch_detail_lists(raw, key[1])
+
+    async def _fetch_schedule(self, raw, schedule):
+        async with self.session() as session:
+            p = await self.post(session, PREPARE_DOWNLOAD_URL, schedule_payload(raw, schedule))
+            if 'fileName' not in p.json():
+                print(
+                    f"No file for schedule {schedule}, {raw['fromDateStr']}-{raw['toDateStr']}. Report ID:", raw['reportId'])
+                await asyncio.to_thread(record, schedule_request(raw, schedule), None, raw['amendedDate'])
+                return pd.DataFrame()
+            with tempfile.TemporaryDirectory() as tmp:
+                path = await self.download(session, DOWNLOAD_URL, os.path.join(
+                    tmp, f"{raw['formTypeCode']}-{raw['reportId']}-{schedule}.txt"), params=p.json())
+                await asyncio.to_thread(record_file, schedule_request(raw, schedule), path, raw['amendedDate'])
+                if os.path.getsize(path) == 0:
+                    print('Empty file. Report ID:', raw['reportId'])
+                return await asyncio.to_thread(read_schedule, path)
+
+    async def _fetch_detail_lists(self, raw, listNames):
+        # Detail lists are served for whichever report the session last opened
+        payload = report_payload(raw)
+
+        async def open_report(session):
+            r = await self.post(session, RETRIEVE_REPORT_URL, payload)
+            await asyncio.to_thread(record, summary_request(raw), r.text, raw['amendedDate'])
+
+        if self.detailSessions == 'reprime':
+            async def fetch(name):
+                async with self.session() as session:
+                    await open_report(session)
+                    r = await self.post(session, DETAIL_LIST_URL, {'listName': name})
+                    await asyncio.to_thread(record, detail_request(raw, name), r.text, raw['amendedDate'])
+                    return detail_rows(r.text, r.json)
+            rows = await asyncio.gather(*(fetch(name) for name in listNames))
+            return dict(zip(listNames, rows))
+
+        async with self.session() as session:
+            await open_report(session)
+            if self.detailSessions == 'serial':
+                responses = [await self.post(session, DETAIL_LIST_URL, {'listName': name}) for name in listNames]
+            else:
+                # One aiohttp session can carry concurrent requests, so 'clone' shares it directly
+                responses = await asyncio.gather(*(self.post(session, DETAIL_LIST_URL, {'listName': name})
+                                                   for name in listNames))
+            await asyncio.to_thread(lambda: [record(detail_request(raw, name), r.text, raw['amendedDate'])
+                                             for name, r in zip(listNames, responses)])
+            return {name: detail_rows(r.text, r.json) for name, r in zip(listNames, responses)}
+
+    async def _cache_is_current(self, entity, raw):
+        if not entity.checkCache:
+            return False
+        backend = find_cached(entity.cachePath, raw['formTypeCode'], raw['reportId'])
+        if backend is None:
+            return False
+        meta = await asyncio.to_thread(backend.read_meta, entity.cachePath, raw['formTypeCode'], raw['reportId'])
+        return 'data' in meta and meta['data']['amendedDate'] == raw['amendedDate']
+
+    async def build_report(self, job, summaryOnly=False):
+        """Async try_build_report() - fetches responses on the event loop, parses/caches in a thread
+        - summaryOnly - fetch just what the summary needs and return a lazy Report (see try_build_summary)
+        """
+        entity, raw = job
+        async with self._reports:
+            try:
+                source = None
+                store = get_raw_store()
+                if store is not None and store.replay:
+                    source = ReplayReportSource(store)
+                elif not await self._cache_is_current(entity, raw):
+                    source = PrefetchedReportSource(
+                        await self.fetch_report_responses(raw, fetchFullReports=not summaryOnly))
+            except Exception as e:
+                print(f"!! Failed to fetch {raw['formTypeCode']} report {raw['reportId']} for {entity.name}: {e!r}")
+                return None
+            return await asyncio.to_thread(try_build_summary if summaryOnly else try_build_report, job, source)
+
+    async def fetch_finance_reports(self, entities, manifest=None, summaryOnly=False):
+        """Async fetch_finance_reports() (see models/concurrency.py), with the same retry queue
+        - summaryOnly - load just report summaries into lazy entities instead (see models/concurrency.py prefetch_reports)
+        """
+        if self._reports is None:
+            self._reports = asyncio.Semaphore(self.workers)
+        entities = skip_unchanged(entities, manifest)
+        jobs = [(entity, raw) for entity in entities for raw in entity.raw_reports]
+        reports = await asyncio.gather(*(self.build_report(job, summaryOnly) for job in jobs))
+
+        retry_queue = [i for i, report in enumerate(reports) if report is None]
+        if len(retry_queue) > 0:
+            print(f'## Retrying {len(retry_queue)} failed finance reports')
+            await asyncio.to_thread(self.policy.breaker.wait)
+            retried = await asyncio.gather(*(self.build_report(jobs[i], summaryOnly) for i in retry_queue))
+            for i, report in zip(retry_queue, retried):
+                reports[i] = report
+
+        if summaryOnly:
+            load_summaries(entities, reports)
+            return
+        # Compiling and exporting writes files - keep it off the event loop
+        await asyncio.to_thread(load_fetched_reports, entities, reports, manifest)
+
+    # Lists
+
+    async def _recorded_rows(self, request, fetch):
+        # Async raw_store.recorded_rows()
+        store = get_raw_store()
+        if store is None:
+            return await fetch()
+        if store.replay:
+            return await asyncio.to_thread(store.get_json, request)
+        rows = await fetch()
+        await asyncio.to_thread(store.put_json, request, rows)
+        return rows
+
+    async def _load_report_list(self, entity):
+        post_url, post_payload, get_url = entity._report_list_request()
+
+        async def fetch():
+            async with self.session() as session:
+                await self.post(session, post_url, post_payload)
+                return await self.fetch_rows(session, get_url)
+        entity.raw_reports = entity._clean_report_list(
+            await self._recorded_rows({'url': post_url, 'data': post_payload}, fetch))
+
+    async def _search(self, list_class, search, pageSize):
+        async def fetch():
+            async with self.session() as session:
+                await self.post(session, list_class.SEARCH_URL, search)
+                return await self.fetch_rows(session, list_class.LIST_URL, pageSize=pageSize)
+        return await self._recorded_rows({'url': list_class.SEARCH_URL, 'data': search}, fetch)
+
+    async def _build_entities(self, entities, cachePath, fetchReports, fetchFullReports, incremental, summaryOnly=False):
+        if summaryOnly:
+            if incremental:
+                raise ValueError('lazy lists load reports on demand, so they can\'t skip unchanged ones incrementally')
+            await asyncio.gather(*(self._load_report_list(e) for e in entities))
+            await self.fetch_finance_reports(entities, summaryOnly=True)
+            return
+        if fetchReports:
+            await asyncio.gather(*(self._load_report_list(e) for e in entities))
+        if fetchReports and fetchFullReports:
+            manifest = get_manifest(cachePath) if incremental else None
+            await self.fetch_finance_reports(entities, manifest)
+            if manifest is not None:
+                manifest.save()
+
+    async def candidate_list(self, search,
+                             fetchReports=True, fetchFullReports=True,
+                             filterStatuses=False,
+                             filterFunction=None,
+                             excludeCandidates=[],
+                             cachePath='cache/candidates',
+                             checkCache=True, writeCache=True,
+                             pageSize=DEFAULT_PAGE_SIZE,
+                             incremental=False,
+                             summaryOnly=False,
+                             **kwargs):
+        """Async CandidateList(...) - same arguments, returns a CandidateList"""
+        rows = await self._search(CandidateList, search, pageSize)
+        data = CandidateList._filter_list(map(CandidateList._clean_candidate_row, rows),
+                                          filterFunction, filterStatuses, excludeCandidates)
+        candidates = [Candidate(d, cachePath=cachePath, fetchReports=False,
+                                checkCache=checkCache, writeCache=writeCache, lazy=summaryOnly) for d in data]
+        await self._build_entities(candidates, cachePath, fetchReports, fetchFullReports, incremental, summaryOnly)
+        return CandidateList.from_candidates(candidates, compile=fetchReports and fetchFullReports, summaryOnly=summaryOnly)
+
+    async def committee_list(self, search,
+                             fetchReports=True, fetchFullReports=True,
+                             filterStatuses=False,
+                             filterFunction=None,
+                             excludeCommittees=[],
+                             cachePath='cache/committees',
+                             checkCache=True, writeCache=True,
+                             pageSize=DEFAULT_PAGE_SIZE,
+                             incremental=False,
+                             summaryOnly=False,
+                             **kwargs):
+        """Async CommitteeList(...) - same arguments, returns a CommitteeList"""
+        rows = await self._search(CommitteeList, search, pageSize)
+        data = CommitteeList._filter_list(map(CommitteeList._clean_committee_row, rows),
+                                          filterFunction, filterStatuses, excludeCommittees)
+        committees = [Committee(d, cachePath=cachePath, fetchReports=False,
+                                checkCache=checkCache, writeCache=writeCache, lazy=summaryOnly) for d in data]
+        await self._build_entities(committees, cachePath, fetchReports, fetchFullReports, incremental, summaryOnly)
+        return CommitteeList.from_committees(committees, compile=fetchReports and fetchFullReports, summaryOnly=summaryOnly)
+
+    def print_stats(self):
+        print(f'Async CERS client: {self.sessions_issued} sessions')
+        self.limiter.print_stats()
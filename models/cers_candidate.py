@@ -8,6 +8,8 @@ Components
 
 Design philosophy: Front-load all slow API calls in object initialization.
 Should provide more flexibility with avoiding duplicate scraping.
+With lazy=True, nothing is fetched until it's read (or prefetch() is called) - e.g. summary-only
+runs skip schedule downloads.
 
 Ref: https://blog.hartleybrody.com/web-scraping-cheat-sheet/
 
@@ -26,20 +28,61 @@ from dateutil.parser import parse
 
 import os
 import json
+import shutil
+import threading
 
 import re
 from bs4 import BeautifulSoup
 
+from models.cers_client import get_client
+from models.pagination import fetch_rows, DEFAULT_PAGE_SIZE
+from models.raw_store import recorded_rows
 from models.cers_report import Report
+from models.concurrency import run_concurrently, fetch_finance_reports, prefetch_reports
+from models.frames import FrameAccumulator
+from models.schema import apply_schema, label_column
+from models.manifest import get_manifest
+from models.addresses import ANOMALY_COLUMNS
+
+# Address anomalies table, with the candidate and report each came from
+ADDRESS_ANOMALY_COLUMNS = ['Candidate', 'Report ID'] + ANOMALY_COLUMNS
+
+# Whole-cycle totals table, one row per candidate (see CandidateList.totals)
+TOTALS_COLUMNS = ['slug', 'candidateId', 'candidateName', 'officeTitle', 'partyDescr', 'electionYear',
+                  'periods', 'receipts', 'expenditures', 'balance', 'C5', 'C7', 'C7E']
+
+# Attributes a lazy Candidate compiles on first access, and the method that compiles each
+LAZY_ATTRIBUTES = {
+    'raw_reports': '_fetch_candidate_finance_reports',
+    'finance_reports': '_build_lazy_reports',
+    'summary': '_get_summary',
+    'contributions': '_get_contributions',
+    'expenditures': '_get_expenditures',
+    'summarized_reports': '_summarize_reports',
+    'address_anomalies': '_get_address_anomalies',
+}
 
 
 class CandidateList:
     """List of candidates from specific search
     - fetchReports - flag to run costly scrape of individual financial reports
     - filterStatuses - if non-false, filter to candidates with statuses in array
+    - workers - number of concurrent CERS requests. 1 (default) fetches serially
+    - pageSize - rows per request when paging through the candidate search results
+    - incremental - only rebuild candidates with new, amended or removed reports since the last run.
+      Unchanged candidates keep their cached exports and aren't included in list-level contributions/expenditures
+    - lazy - only run the search. Reports are fetched when a candidate's summary, contributions, etc. are first read,
+      or in bulk with prefetch(). Can't be combined with incremental
+    - summaryOnly - lazy, then fetch just the report summaries (no schedule downloads, see Report.load_summary)
+      and compile the totals table. Contributions/expenditures are still fetched if read
 
     """
 
+    SEARCH_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/searchResults/searchCandidates'
+    LIST_URL = """
+    https://cers-ext.mt.gov/CampaignTracker/public/searchResults/listCandidateResults?sEcho=1&iColumns=9&sColumns=&iDisplayStart={start}&iDisplayLength={length}&mDataProp_0=checked&mDataProp_1=candidateName&mDataProp_2=electionYear&mDataProp_3=candidateStatusDescr&mDataProp_4=c3FiledInd&mDataProp_5=candidateAddress&mDataProp_6=candidateTypeDescr&mDataProp_7=officeTitle&mDataProp_8=resCountyDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&sSearch_6=&bRegex_6=false&bSearchable_6=true&sSearch_7=&bRegex_7=false&bSearchable_7=true&sSearch_8=&bRegex_8=false&bSearchable_8=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=false&bSortable_5=false&bSortable_6=true&bSortable_7=true&bSortable_8=true&_=1586980078555
+    """
+
     def __init__(self, search,
                  fetchReports=True, fetchFullReports=True,
                  filterStatuses=False,
@@ -47,45 +90,126 @@ class CandidateList:
                  excludeCandidates=[],
                  cachePath='cache/candidates',
                  checkCache=True, writeCache=True,
+                 workers=1,
+                 pageSize=DEFAULT_PAGE_SIZE,
+                 incremental=False,
+                 lazy=False,
+                 summaryOnly=False,
                  ):
-        candidate_list = self._fetch_candidate_list(search)
-        if callable(filterFunction):
-            candidate_list = [c for c in candidate_list if filterFunction(c)]
-
-        if filterStatuses:
-            candidate_list = [
-                c for c in candidate_list if c['candidateStatusDescr'] in filterStatuses]
-        if len(excludeCandidates) > 0:
-            candidate_list = [
-                c for c in candidate_list if c['candidateId'] not in excludeCandidates]
-        self.candidates = [Candidate(c,
-                                     fetchReports=fetchReports,
-                                     fetchFullReports=fetchFullReports,
-                                     cachePath=cachePath,
-                                     checkCache=checkCache,
-                                     writeCache=writeCache
-                                     ) for c in candidate_list]
-        if fetchReports and fetchFullReports:
-            self.contributions = self._get_contributions()
-            self.expenditures = self._get_expenditures()
-            print(f'{len(self.candidates)} candidates compiled with {len(self.contributions)} contributions and {len(self.expenditures)} expenditures')
-
-    def _fetch_candidate_list(self, search, raw=False, filterStatuses=False):
-        session = requests.Session()
-        candidate_search_url = 'https://cers-ext.mt.gov/CampaignTracker/public/searchResults/searchCandidates'
-        max_candidates = 1000
-        candidate_list_url = f"""
-        https://cers-ext.mt.gov/CampaignTracker/public/searchResults/listCandidateResults?sEcho=1&iColumns=9&sColumns=&iDisplayStart=0&iDisplayLength={max_candidates}&mDataProp_0=checked&mDataProp_1=candidateName&mDataProp_2=electionYear&mDataProp_3=candidateStatusDescr&mDataProp_4=c3FiledInd&mDataProp_5=candidateAddress&mDataProp_6=candidateTypeDescr&mDataProp_7=officeTitle&mDataProp_8=resCountyDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&sSearch_6=&bRegex_6=false&bSearchable_6=true&sSearch_7=&bRegex_7=false&bSearchable_7=true&sSearch_8=&bRegex_8=false&bSearchable_8=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=false&bSortable_5=false&bSortable_6=true&bSortable_7=true&bSortable_8=true&_=1586980078555
+        lazy = lazy or summaryOnly
+        if lazy and incremental:
+            raise ValueError('lazy lists load reports on demand, so they can\'t skip unchanged ones incrementally')
+        self.workers = workers
+        self.lazy = lazy
+        # Streamed page by page, so filtering and Candidate construction start before the last page arrives
+        candidate_list = self._filter_list(self._fetch_candidate_list(
+            search, pageSize=pageSize, workers=workers), filterFunction, filterStatuses, excludeCandidates)
+        # With multiple workers, full reports for every candidate are pulled through one shared pool
+        deferFullReports = workers > 1
+        manifest = get_manifest(cachePath) if incremental else None
+        self.candidates = run_concurrently(lambda c: Candidate(c,
+                                                               fetchReports=fetchReports,
+                                                               fetchFullReports=fetchFullReports,
+                                                               cachePath=cachePath,
+                                                               checkCache=checkCache,
+                                                               writeCache=writeCache,
+                                                               deferFullReports=deferFullReports,
+                                                               manifest=manifest,
+                                                               lazy=lazy
+                                                               ), candidate_list, workers=workers)
+        if summaryOnly:
+            self.prefetch(summaryOnly=True)
+            self._compile_totals()
+        if fetchReports and fetchFullReports and not lazy:
+            if deferFullReports:
+                fetch_finance_reports(
+                    self.candidates, workers=workers, manifest=manifest)
+            if manifest is not None:
+                manifest.save()
+            self._compile()
+
+    @classmethod
+    def from_candidates(cls, candidates, compile=True, summaryOnly=False):
+        """CandidateList from Candidate objects built elsewhere (e.g. by models/cers_async.py)
+        - compile - compile list-level contributions/expenditures (candidates have full reports loaded)
+        - summaryOnly - compile the totals table instead (candidates are lazy, with report summaries loaded)
         """
-
-        session.post(candidate_search_url, search)
-        r = session.get(candidate_list_url)
-        full = r.json()['aaData']
+        candidate_list = cls.__new__(cls)
+        candidate_list.candidates = candidates
+        candidate_list.workers = 1
+        candidate_list.lazy = summaryOnly
+        if summaryOnly:
+            candidate_list._compile_totals()
+        elif compile:
+            candidate_list._compile()
+        return candidate_list
+
+    def __getattr__(self, name):
+        # Lazy lists compile list-level contributions/expenditures/totals on first access
+        if self.__dict__.get('lazy') and name in ['contributions', 'expenditures', 'totals']:
+            value = getattr(self, '_get_' + name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def prefetch(self, summaryOnly=False):
+        """Loads every candidate's reports up front, through one pool of the list's workers
+        - summaryOnly - just the report summaries, skipping schedule downloads where possible
+          (see Report.load_summary)
+        """
+        prefetch_reports(self.candidates, workers=self.workers, summaryOnly=summaryOnly)
+        return self
+
+    def _compile_totals(self):
+        self.totals = self._get_totals()
+        print(f'{len(self.totals)} candidates totaled from {sum(self.totals["periods"])} report summaries')
+        failed = self.failed_reports
+        if len(failed) > 0:
+            print(f'!! {len(failed)} finance reports failed to fetch:', ', '.join(str(r["reportId"]) for r in failed))
+
+    def _get_totals(self):
+        # Candidates with reports that failed are left out, as in a full run
+        rows = [c.totals_row() for c in self.candidates if len(c.failed_reports) == 0]
+        return pd.DataFrame(rows, columns=TOTALS_COLUMNS)
+
+    def export_totals(self, path):
+        """Writes the totals table (one row per candidate) to a CSV file"""
+        folder = os.path.dirname(path)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        self.totals.to_csv(path, index=False)
+        print(f'{len(self.totals)} candidate totals written to', path)
+
+    def _compile(self):
+        self.contributions = self._get_contributions()
+        self.expenditures = self._get_expenditures()
+        print(f'{len(self.candidates)} candidates compiled with {len(self.contributions)} contributions and {len(self.expenditures)} expenditures')
+        failed = self.failed_reports
+        if len(failed) > 0:
+            print(f'!! {len(failed)} finance reports failed to fetch:', ', '.join(str(r["reportId"]) for r in failed))
+        anomalies = self.address_anomalies
+        if len(anomalies) > 0:
+            print(f'-- {len(anomalies)} addresses didn\'t parse cleanly - see address_anomalies')
+
+    def _fetch_candidate_list(self, search, raw=False, filterStatuses=False, pageSize=DEFAULT_PAGE_SIZE, workers=1):
+        """Returns generator of candidates matching search, fetched page by page"""
+        def fetch():
+            session = get_client().session()
+            session.post(self.SEARCH_URL, search)
+            return fetch_rows(session, self.LIST_URL,
+                              pageSize=pageSize, workers=workers)
+        # Recorded to/replayed from the raw store, if one is set (see models/raw_store.py)
+        full = recorded_rows({'url': self.SEARCH_URL, 'data': search}, fetch)
 
         if raw:
             return full
 
-        cleaned = list(map(lambda d: {
+        cleaned = map(self._clean_candidate_row, full)
+        return cleaned
+
+    @staticmethod
+    def _clean_candidate_row(d):
+        return {
             'candidateId': d['candidateId'],
             'candidateName': d['candidateName'],
             'candidateLastName': d['personDTO']['lastName'],
@@ -95,8 +219,20 @@ class CandidateList:
             'officeTitle': d['officeTitle'],
             'candidateStatusDescr': d['candidateStatusDescr'],
             # More available here - home address, phone, etc.
-        }, full))
-        return cleaned
+        }
+
+    @staticmethod
+    def _filter_list(candidate_list, filterFunction=None, filterStatuses=False, excludeCandidates=[]):
+        if callable(filterFunction):
+            candidate_list = (c for c in candidate_list if filterFunction(c))
+
+        if filterStatuses:
+            candidate_list = (
+                c for c in candidate_list if c['candidateStatusDescr'] in filterStatuses)
+        if len(excludeCandidates) > 0:
+            candidate_list = (
+                c for c in candidate_list if c['candidateId'] not in excludeCandidates)
+        return candidate_list
 
     def get_candidate(self, id):
         return [c for c in self.candidates if c.id == id][0]
@@ -112,6 +248,24 @@ class CandidateList:
     def list_candidates_with_reports(self):
         return [{**c.data, 'reports': c.list_reports()} for c in self.candidates]
 
+    @property
+    def changed(self):
+        """False if every candidate was skipped as unchanged on an incremental run"""
+        return any(not c.unchanged and len(c.failed_reports) == 0 for c in self.candidates)
+
+    @property
+    def failed_reports(self):
+        """Raw report records that couldn't be fetched, even after retrying"""
+        return [r for c in self.candidates for r in c.failed_reports]
+
+    @property
+    def address_anomalies(self):
+        """C7/C7E addresses that didn't parse cleanly, across every candidate (see models/addresses.py)"""
+        frames = FrameAccumulator(columns=ADDRESS_ANOMALY_COLUMNS)
+        for c in self.candidates:
+            frames.add(c.address_anomalies)
+        return frames.result()
+
     def export(self, base_dir):
         for candidate in self.candidates:
             candidate.export(base_dir)
@@ -121,20 +275,20 @@ class CandidateList:
             # print(f'No candidates on list')
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for candidate in self.candidates:
-            df = pd.concat([df, candidate.contributions])
-        return df
+            frames.add(candidate.contributions)
+        return apply_schema(frames.result())
 
     def _get_expenditures(self):
         if len(self.candidates) == 0:
             # print(f'No candidates on list')
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for candidate in self.candidates:
-            df = pd.concat([df, candidate.expenditures])
-        return df
+            frames.add(candidate.expenditures)
+        return apply_schema(frames.result())
 
 
 class Candidate:
@@ -142,50 +296,142 @@ class Candidate:
     Single candidate for given election cycle
     """
 
-    def __init__(self, data, cachePath, fetchSummary=True, fetchReports=True, fetchFullReports=True, checkCache=True, writeCache=True):
+    def __init__(self, data, cachePath, fetchSummary=True, fetchReports=True, fetchFullReports=True, checkCache=True, writeCache=True,
+                 workers=1, deferFullReports=False, manifest=None, lazy=False):
+        """
+        - workers - number of reports to fetch concurrently
+        - deferFullReports - fetch report list only; caller is responsible for fetch_finance_reports()
+        - manifest - ReportManifest for incremental runs (see models/manifest.py)
+        - lazy - fetch nothing up front. The report list, reports and totals (see LAZY_ATTRIBUTES) are
+          fetched on first access, or in bulk with prefetch()
+        """
         self.id = data['candidateId']
         self.name = data['candidateName']
         self.slug = self.name.strip().replace(' ', '-').replace(',', '')
         self.data = data
-        self.finance_reports = []
 
-        cachePath = os.path.join(cachePath, self.slug)
+        self.cachePath = os.path.join(cachePath, self.slug)
+        self.checkCache = checkCache
+        self.writeCache = writeCache
+        self.unchanged = False
+        self.failed_reports = []
+
+        self.lazy = lazy
+        self._lock = threading.RLock()
+        if lazy:
+            return
+
+        self.finance_reports = []
+        self.address_anomalies = pd.DataFrame(columns=ADDRESS_ANOMALY_COLUMNS)
 
         if fetchReports:
             self.raw_reports = self._fetch_candidate_finance_reports()
-        if (fetchReports and fetchFullReports):
-            print(
-                f'## Fetching {len(self.raw_reports)} finance reports for {self.name} ({self.id})')
-            self.finance_reports = [Report(r, cachePath=cachePath, checkCache=checkCache,
-                                           writeCache=writeCache, fetchFullReports=fetchFullReports) for r in self.raw_reports]
-            self.summary = self._get_summary()
-            self.contributions = self._get_contributions()
-            self.expenditures = self._get_expenditures()
-            # self.unitemized_contributions = self._get_unitemized_contributions()
-            self.summarized_reports = self._summarize_reports()
-            print(
-                f'Found {len(self.contributions)} contributions and {len(self.expenditures)} expenditures in {len(self.finance_reports)} reports')
-            self.export(cachePath)
-            print('\n')
+        if (fetchReports and fetchFullReports and not deferFullReports):
+            fetch_finance_reports([self], workers=workers, manifest=manifest)
+
+    def __getattr__(self, name):
+        # Only reached for attributes that aren't set - on a lazy Candidate, the ones not loaded yet
+        if self.__dict__.get('lazy') and name in LAZY_ATTRIBUTES:
+            with self._lock:
+                if name not in self.__dict__:
+                    setattr(self, name, getattr(self, LAZY_ATTRIBUTES[name])())
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def prefetch(self, summaryOnly=False, workers=1):
+        """Loads this candidate's reports up front instead of on first access (see prefetch_reports)"""
+        prefetch_reports([self], workers=workers, summaryOnly=summaryOnly)
+        return self
+
+    def totals_row(self):
+        """Whole-cycle totals for this candidate - the same figures as the export summary file"""
+        return {
+            'slug': self.slug,
+            'candidateId': self.id,
+            'candidateName': self.name,
+            'officeTitle': self.data['officeTitle'],
+            'partyDescr': self.data['partyDescr'],
+            'electionYear': self.data['electionYear'],
+            'periods': len(self.finance_reports),
+            'receipts': self.summary['contributions']['total'],
+            'expenditures': self.summary['expenditures']['total'],
+            'balance': self.summary['cash_on_hand']['total'],
+            **self.summary['report_counts'],
+        }
+
+    def _build_lazy_reports(self):
+        return [self._build_report(raw, lazy=True) for raw in self.raw_reports]
+
+    def _build_report(self, raw, source=None, lazy=False):
+        return Report(raw, cachePath=self.cachePath, checkCache=self.checkCache,
+                      writeCache=self.writeCache, fetchFullReports=True, source=source, lazy=lazy)
+
+    def load_finance_reports(self, reports):
+        """Compiles totals from fetched Report objects and writes candidate export"""
+        self.finance_reports = reports
+        self.summary = self._get_summary()
+        self.contributions = self._get_contributions()
+        self.expenditures = self._get_expenditures()
+        # self.unitemized_contributions = self._get_unitemized_contributions()
+        self.summarized_reports = self._summarize_reports()
+        self.address_anomalies = self._get_address_anomalies()
+        print(
+            f'Found {len(self.contributions)} contributions and {len(self.expenditures)} expenditures in {len(self.finance_reports)} reports')
+        self.export(self.cachePath)
+        print('\n')
+
+    def has_cached_export(self):
+        return all(os.path.isfile(path) for path in self._export_paths(self.cachePath))
+
+    def load_unchanged(self):
+        """Skips rebuilding a candidate with no new or amended reports; export() reuses the cached files"""
+        self.unchanged = True
+        self.contributions = pd.DataFrame()
+        self.expenditures = pd.DataFrame()
+        print(f'## No new or amended reports for {self.name} ({self.id}), keeping cached export')
+
+    def load_failed(self, failed_reports):
+        """Leaves a candidate with reports that couldn't be fetched out of this run; export() keeps any previous export"""
+        self.failed_reports = failed_reports
+        self.contributions = pd.DataFrame()
+        self.expenditures = pd.DataFrame()
+        print(f'!! {len(failed_reports)} of {len(self.raw_reports)} reports failed for {self.name} ({self.id}), skipping')
+
+    def _export_paths(self, write_dir):
+        summary_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-summary.json')
+        contributions_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-contributions-itemized.json')
+        expenditures_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-expenditures-itemized.json')
+        return summary_path, contributions_path, expenditures_path
 
     def _fetch_candidate_finance_reports(self, raw=False):
+        post_url, post_payload, get_url = self._report_list_request()
+
+        def fetch():
+            session = get_client().session()
+            session.post(post_url, post_payload)
+            return list(fetch_rows(session, get_url))
+        full = recorded_rows({'url': post_url, 'data': post_payload}, fetch)
+        if raw:
+            return full
+        return self._clean_report_list(full)
+
+    def _report_list_request(self):
+        """(post url, payload, list url template) for this candidate's report list"""
         post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/retrieveCampaignReports'
-        list_max = 1000
-        get_url = f"""
-        https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/listFinanceReports?sEcho=1&iColumns=6&sColumns=&iDisplayStart=0&iDisplayLength={list_max}&mDataProp_0=checked&mDataProp_1=fromDateStr&mDataProp_2=toDateStr&mDataProp_3=formTypeDescr&mDataProp_4=formTypeCode&mDataProp_5=statusDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=true&bSortable_5=true&_=1549557879524
+        get_url = """
+        https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/listFinanceReports?sEcho=1&iColumns=6&sColumns=&iDisplayStart={start}&iDisplayLength={length}&mDataProp_0=checked&mDataProp_1=fromDateStr&mDataProp_2=toDateStr&mDataProp_3=formTypeDescr&mDataProp_4=formTypeCode&mDataProp_5=statusDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=true&bSortable_5=true&_=1549557879524
         """
         post_payload = {
             'candidateId': self.id,
             'searchType': '',
             'searchPage': 'public',
         }
-        session = requests.Session()
-        session.post(post_url, post_payload)
-        r = session.get(get_url)
-        full = r.json()['aaData']
-        if raw:
-            return full
+        return post_url, post_payload, get_url
 
+    def _clean_report_list(self, full):
         cleaned = list(map(lambda d: {
             'reportId': d['reportId'],
             'fromDateStr': d['fromDateStr'],
@@ -220,12 +466,16 @@ class Candidate:
         # make folder if it doesn't exist
         if not os.path.exists(write_dir):
             os.makedirs(write_dir)
-        summary_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-summary.json')
-        contributions_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-contributions-itemized.json')
-        expenditures_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-expenditures-itemized.json')
+        summary_path, contributions_path, expenditures_path = self._export_paths(write_dir)
+        if len(self.failed_reports) > 0 and not self.has_cached_export():
+            print(f'!! {self.slug} not exported - reports failed and there is no previous export')
+            return
+        if self.unchanged or len(self.failed_reports) > 0:
+            # Nothing new since last run (or couldn't fetch what's new) - copy cached export instead of rebuilding it
+            for src, dst in zip(self._export_paths(self.cachePath), (summary_path, contributions_path, expenditures_path)):
+                if os.path.abspath(src) != os.path.abspath(dst):
+                    shutil.copyfile(src, dst)
+            return
         summary = {
             'slug': self.slug,
             'candidateName': self.name,
@@ -297,15 +547,15 @@ class Candidate:
         if len(self.finance_reports) == 0:
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for report in self.finance_reports:
             dfi = report.contributions.copy()
-            dfi.insert(0, 'Candidate', self.name)
+            dfi.insert(0, 'Candidate', label_column(self.name, len(dfi)))
             dfi.insert(1, 'Reporting Period',
-                       f'{report.start_date} to {report.end_date}')
-            dfi.insert(2, 'Report Type', report.type)
-            df = pd.concat([df, dfi])
-        return df
+                       label_column(f'{report.start_date} to {report.end_date}', len(dfi)))
+            dfi.insert(2, 'Report Type', label_column(report.type, len(dfi)))
+            frames.add(dfi)
+        return apply_schema(frames.result())
 
     def _get_expenditures(self):
         """
@@ -314,15 +564,23 @@ class Candidate:
         if len(self.finance_reports) == 0:
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for report in self.finance_reports:
             dfi = report.expenditures.copy()
-            dfi.insert(0, 'Candidate', self.name)
+            dfi.insert(0, 'Candidate', label_column(self.name, len(dfi)))
             dfi.insert(1, 'Reporting Period',
-                       f'{report.start_date} to {report.end_date}')
-            dfi.insert(2, 'Report Type', report.type)
-            df = pd.concat([df, dfi])
-        return df
+                       label_column(f'{report.start_date} to {report.end_date}', len(dfi)))
+            dfi.insert(2, 'Report Type', label_column(report.type, len(dfi)))
+            frames.add(dfi)
+        return apply_schema(frames.result())
+
+    def _get_address_anomalies(self):
+        """Address anomalies from this candidate's reports, tagged with the report they came from"""
+        frames = FrameAccumulator(columns=ADDRESS_ANOMALY_COLUMNS)
+        for report in self.finance_reports:
+            if len(report.address_anomalies) > 0:
+                frames.add(report.address_anomalies.assign(**{'Candidate': self.name, 'Report ID': report.id}))
+        return frames.result()
 
     def _summarize_reports(self):
         """
@@ -0,0 +1,145 @@
+"""
+Shared HTTP client for CERS requests
+
+Components
+- CersClient - Owns one keep-alive connection pool for cers-ext.mt.gov
+- get_client / set_client - Module-level shared client used by every model class
+- rebase - Points a CERS url at another host (e.g. the local stand-in in models/mock_cers.py)
+
+CERS keeps search and report state (e.g. which report financeRepDetailList refers to) in the
+server-side session, so each post-then-get flow needs its own cookie jar. CersClient.session()
+hands out a fresh requests.Session with an isolated cookie jar that is mounted on the shared
+transport adapter, so flows stay separate while TCP/TLS connections get reused.
+
+Every request made through those sessions goes through the client's RequestPolicy
+(per-endpoint timeouts, retries with backoff, circuit breaker - see models/request_policy.py),
+and each attempt draws from the client's RateLimiter (see models/rate_limit.py).
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from models.request_policy import RequestPolicy
+from models.rate_limit import RateLimiter
+
+# A reply taking more than this fraction of its endpoint's read timeout counts as slow
+SLOW_FRACTION = 0.25
+
+CERS_URL = 'https://cers-ext.mt.gov'
+
+
+def rebase(url, baseUrl):
+    """url with CERS_URL swapped for baseUrl. None leaves it alone"""
+    if baseUrl is None:
+        return url
+    url = url.strip()
+    if not url.startswith(CERS_URL):
+        return url
+    return baseUrl.rstrip('/') + url[len(CERS_URL):]
+
+
+class CersSession(requests.Session):
+    """requests.Session that sends every request through a RequestPolicy and RateLimiter"""
+
+    def __init__(self, policy, limiter, baseUrl=None):
+        super().__init__()
+        self.policy = policy
+        self.limiter = limiter
+        self.baseUrl = baseUrl
+
+    def request(self, method, url, **kwargs):
+        return self.policy.send(self._limited_request, method, rebase(url, self.baseUrl), **kwargs)
+
+    def _limited_request(self, method, url, **kwargs):
+        slowAfter = self.policy.timeout_for(url)[1] * SLOW_FRACTION
+        return self.limiter.call(super().request, method, url, slowAfter=slowAfter, **kwargs)
+
+
+# Should be at least as large as the number of fetch workers (see models/concurrency.py)
+DEFAULT_POOL_SIZE = 16
+
+
+class CersClient:
+    """Connection-pooling client for CERS
+    - poolSize - max number of keep-alive connections held open to CERS
+    - policy - RequestPolicy for timeouts and retries. Defaults to RequestPolicy()
+    - limiter - RateLimiter shared by every session. Defaults to RateLimiter()
+    - baseUrl - send requests for cers-ext.mt.gov here instead (e.g. a local MockCers). None (default) sends them to CERS
+    """
+
+    def __init__(self, poolSize=DEFAULT_POOL_SIZE, policy=None, limiter=None, baseUrl=None):
+        self.poolSize = poolSize
+        self.policy = policy or RequestPolicy()
+        self.limiter = limiter or RateLimiter()
+        self.baseUrl = baseUrl
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize)
+        self.sessions_issued = 0
+        self._lock = threading.Lock()
+
+    def session(self):
+        """Returns a requests.Session with its own cookie jar, routed through the shared pool and policy
+        Don't call close() on these - that would close the shared adapter
+        """
+        session = CersSession(self.policy, self.limiter, self.baseUrl)
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        with self._lock:
+            self.sessions_issued += 1
+        return session
+
+    def clone_session(self, session):
+        """Returns a new session carrying a copy of session's cookies - same server-side session, separate
+        requests.Session object, so it can be used from another thread
+        """
+        clone = self.session()
+        clone.cookies.update(session.cookies)
+        return clone
+
+    def stats(self):
+        """Connection reuse statistics for the shared pool"""
+        num_requests = 0
+        num_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_requests += pool.num_requests
+            num_connections += pool.num_connections
+        return {
+            'sessions': self.sessions_issued,
+            'requests': num_requests,
+            'connections_opened': num_connections,
+            'connections_reused': max(num_requests - num_connections, 0),
+            'reuse_rate': round(1 - num_connections / num_requests, 3) if num_requests > 0 else 0,
+        }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"CERS client: {stats['requests']} requests over {stats['connections_opened']} connections ({stats['reuse_rate']:.0%} reused) across {stats['sessions']} sessions")
+        self.limiter.print_stats()
+
+    def close(self):
+        self.adapter.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Returns the shared CersClient, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CersClient()
+        return _client
+
+
+def set_client(client):
+    """Replaces the shared CersClient (e.g. with a larger pool)"""
+    global _client
+    with _client_lock:
+        _client = client
@@ -8,6 +8,8 @@ Components
 
 Design philosiphy: Front-load all slow API calls in object initialization.
 Should provide more flexibility with avoiding duplicate scraping.
+With lazy=True, nothing is fetched until it's read (or prefetch() is called) - e.g. summary-only
+runs skip schedule downloads.
 
 Ref: https://blog.hartleybrody.com/web-scraping-cheat-sheet/
 
@@ -23,14 +25,56 @@ from dateutil.parser import parse
 
 import os
 import json
+import shutil
+import threading
 
 import re
 from bs4 import BeautifulSoup
 
+from models.cers_client import get_client
+from models.pagination import fetch_rows, DEFAULT_PAGE_SIZE
+from models.raw_store import recorded_rows
 from models.cers_report import Report
+from models.concurrency import run_concurrently, fetch_finance_reports, prefetch_reports
+from models.frames import FrameAccumulator
+from models.schema import apply_schema, label_column
+from models.manifest import get_manifest
+from models.addresses import ANOMALY_COLUMNS
+
+# Address anomalies table, with the committee and report each came from
+ADDRESS_ANOMALY_COLUMNS = ['Committee', 'Report ID'] + ANOMALY_COLUMNS
+
+# Whole-cycle totals table, one row per committee (see CommitteeList.totals)
+TOTALS_COLUMNS = ['slug', 'committeeId', 'committeeName', 'type', 'electionYear',
+                  'periods', 'receipts', 'expenditures', 'balance', 'C4', 'C6', 'C7', 'C7E']
+
+# Attributes a lazy Committee compiles on first access, and the method that compiles each
+LAZY_ATTRIBUTES = {
+    'raw_reports': '_fetch_committee_finance_reports',
+    'finance_reports': '_build_lazy_reports',
+    'summary': '_get_summary',
+    'contributions': '_get_contributions',
+    'expenditures': '_get_expenditures',
+    'summarized_reports': '_summarize_reports',
+    'address_anomalies': '_get_address_anomalies',
+}
 
 class CommitteeList:
-    """List of committees from specific search"""
+    """List of committees from specific search
+    - workers - number of concurrent CERS requests. 1 (default) fetches serially
+    - pageSize - rows per request when paging through the committee search results
+    - incremental - only rebuild committees with new, amended or removed reports since the last run.
+      Unchanged committees keep their cached exports and aren't included in list-level contributions/expenditures
+    - lazy - only run the search. Reports are fetched when a committee's summary, contributions, etc. are first read,
+      or in bulk with prefetch(). Can't be combined with incremental
+    - summaryOnly - lazy, then fetch just the report summaries (no schedule downloads, see Report.load_summary)
+      and compile the totals table. Contributions/expenditures are still fetched if read
+    """
+
+    SEARCH_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/searchResults/searchFinancials'
+    LIST_URL = """
+    https://cers-ext.mt.gov/CampaignTracker/public/searchResults/listFinancialCommitteeResults?sEcho=1&iColumns=4&sColumns=&iDisplayStart={start}&iDisplayLength={length}&mDataProp_0=checked&mDataProp_1=committeeName&mDataProp_2=electionYear&mDataProp_3=committeeTypeDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&_=1665677891038
+    """
 
     def __init__(self, search,
                  fetchReports=True, fetchFullReports=True,
@@ -39,49 +83,130 @@ class CommitteeList:
                  excludeCommittees=[],
                  cachePath='cache/committees',
                  checkCache=True, writeCache=True,
+                 workers=1,
+                 pageSize=DEFAULT_PAGE_SIZE,
+                 incremental=False,
+                 lazy=False,
+                 summaryOnly=False,
                  ):
-        committee_list = self._fetch_committee_list(search)
-        if callable(filterFunction):
-            committee_list = [c for c in committee_list if filterFunction(c)]
-
-        if filterStatuses:
-            committee_list = [
-                c for c in committee_list if c['committeeStatusDescr'] in filterStatuses]
-        if len(excludeCommittees) > 0:
-            committee_list = [
-                c for c in committee_list if c['committeeId'] not in excludeCommittees]
-        self.committees = [Committee(c,
-                                     fetchReports=fetchReports,
-                                     fetchFullReports=fetchFullReports,
-                                     cachePath=cachePath,
-                                     checkCache=checkCache,
-                                     writeCache=writeCache
-                                     ) for c in committee_list]
-        if fetchReports and fetchFullReports:
-            self.contributions = self._get_contributions()
-            self.expenditures = self._get_expenditures()
-            print(f'{len(self.committees)} committees compiled with {len(self.contributions)} contributions and {len(self.expenditures)} expenditures')
+        lazy = lazy or summaryOnly
+        if lazy and incremental:
+            raise ValueError('lazy lists load reports on demand, so they can\'t skip unchanged ones incrementally')
+        self.workers = workers
+        self.lazy = lazy
+        # Streamed page by page, so filtering and Committee construction start before the last page arrives
+        committee_list = self._filter_list(self._fetch_committee_list(
+            search, pageSize=pageSize, workers=workers), filterFunction, filterStatuses, excludeCommittees)
+        # With multiple workers, full reports for every committee are pulled through one shared pool
+        deferFullReports = workers > 1
+        manifest = get_manifest(cachePath) if incremental else None
+        self.committees = run_concurrently(lambda c: Committee(c,
+                                                               fetchReports=fetchReports,
+                                                               fetchFullReports=fetchFullReports,
+                                                               cachePath=cachePath,
+                                                               checkCache=checkCache,
+                                                               writeCache=writeCache,
+                                                               deferFullReports=deferFullReports,
+                                                               manifest=manifest,
+                                                               lazy=lazy
+                                                               ), committee_list, workers=workers)
+        if summaryOnly:
+            self.prefetch(summaryOnly=True)
+            self._compile_totals()
+        if fetchReports and fetchFullReports and not lazy:
+            if deferFullReports:
+                fetch_finance_reports(
+                    self.committees, workers=workers, manifest=manifest)
+            if manifest is not None:
+                manifest.save()
+            self._compile()
+
+    @classmethod
+    def from_committees(cls, committees, compile=True, summaryOnly=False):
+        """CommitteeList from Committee objects built elsewhere (e.g. by models/cers_async.py)
+        - compile - compile list-level contributions/expenditures (committees have full reports loaded)
+        - summaryOnly - compile the totals table instead (committees are lazy, with report summaries loaded)
+        """
+        committee_list = cls.__new__(cls)
+        committee_list.committees = committees
+        committee_list.workers = 1
+        committee_list.lazy = summaryOnly
+        if summaryOnly:
+            committee_list._compile_totals()
+        elif compile:
+            committee_list._compile()
+        return committee_list
+
+    def __getattr__(self, name):
+        # Lazy lists compile list-level contributions/expenditures/totals on first access
+        if self.__dict__.get('lazy') and name in ['contributions', 'expenditures', 'totals']:
+            value = getattr(self, '_get_' + name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def prefetch(self, summaryOnly=False):
+        """Loads every committee's reports up front, through one pool of the list's workers
+        - summaryOnly - just the report summaries, skipping schedule downloads where possible
+          (see Report.load_summary)
+        """
+        prefetch_reports(self.committees, workers=self.workers, summaryOnly=summaryOnly)
+        return self
+
+    def _compile_totals(self):
+        self.totals = self._get_totals()
+        print(f'{len(self.totals)} committees totaled from {sum(self.totals["periods"])} report summaries')
+        failed = self.failed_reports
+        if len(failed) > 0:
+            print(f'!! {len(failed)} finance reports failed to fetch:', ', '.join(str(r["reportId"]) for r in failed))
+
+    def _get_totals(self):
+        # Committees with reports that failed are left out, as in a full run
+        rows = [c.totals_row() for c in self.committees if len(c.failed_reports) == 0]
+        return pd.DataFrame(rows, columns=TOTALS_COLUMNS)
+
+    def export_totals(self, path):
+        """Writes the totals table (one row per committee) to a CSV file"""
+        folder = os.path.dirname(path)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        self.totals.to_csv(path, index=False)
+        print(f'{len(self.totals)} committee totals written to', path)
+
+    def _compile(self):
+        self.contributions = self._get_contributions()
+        self.expenditures = self._get_expenditures()
+        print(f'{len(self.committees)} committees compiled with {len(self.contributions)} contributions and {len(self.expenditures)} expenditures')
+        failed = self.failed_reports
+        if len(failed) > 0:
+            print(f'!! {len(failed)} finance reports failed to fetch:', ', '.join(str(r["reportId"]) for r in failed))
+        anomalies = self.address_anomalies
+        if len(anomalies) > 0:
+            print(f'-- {len(anomalies)} addresses didn\'t parse cleanly - see address_anomalies')
 
     def _fetch_committee_list(
-        self, search, raw=False, filterStatuses=False
+        self, search, raw=False, filterStatuses=False, pageSize=DEFAULT_PAGE_SIZE, workers=1
     ):
-        session = requests.Session()
-        committee_search_url = 'https://cers-ext.mt.gov/CampaignTracker/public/searchResults/searchFinancials'
-        max_committees = 1000
-        committee_list_url = f"""
-        https://cers-ext.mt.gov/CampaignTracker/public/searchResults/listFinancialCommitteeResults?sEcho=1&iColumns=4&sColumns=&iDisplayStart=0&iDisplayLength={max_committees}&mDataProp_0=checked&mDataProp_1=committeeName&mDataProp_2=electionYear&mDataProp_3=committeeTypeDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&_=1665677891038
-        """
-
-        session.post(committee_search_url, search)
-        r = session.get(committee_list_url)
-        full = r.json()['aaData']
+        """Returns generator of committees matching search, fetched page by page"""
+        def fetch():
+            session = get_client().session()
+            session.post(self.SEARCH_URL, search)
+            return fetch_rows(session, self.LIST_URL,
+                              pageSize=pageSize, workers=workers)
+        # Recorded to/replayed from the raw store, if one is set (see models/raw_store.py)
+        full = recorded_rows({'url': self.SEARCH_URL, 'data': search}, fetch)
 
         if raw:
             return full
 
         # print(json.dumps(full[0], indent=4))
 
-        cleaned = list(map(lambda d: {
+        cleaned = map(self._clean_committee_row, full)
+        return cleaned
+
+    @staticmethod
+    def _clean_committee_row(d):
+        return {
             'committeeId': d['committeeId'],
             'committeeName': d['committeeName'],
             'committeeAddress': d['committeeAddress'],
@@ -93,12 +218,42 @@ class CommitteeList:
 
             # Extra information
             'type': d['committeeTypeDescr'],
-        }, full))
-        return cleaned
+        }
+
+    @staticmethod
+    def _filter_list(committee_list, filterFunction=None, filterStatuses=False, excludeCommittees=[]):
+        if callable(filterFunction):
+            committee_list = (c for c in committee_list if filterFunction(c))
+
+        if filterStatuses:
+            committee_list = (
+                c for c in committee_list if c['committeeStatusDescr'] in filterStatuses)
+        if len(excludeCommittees) > 0:
+            committee_list = (
+                c for c in committee_list if c['committeeId'] not in excludeCommittees)
+        return committee_list
 
     def list_committees(self):
         return [c.data for c in self.committees]
 
+    @property
+    def changed(self):
+        """False if every committee was skipped as unchanged on an incremental run"""
+        return any(not c.unchanged and len(c.failed_reports) == 0 for c in self.committees)
+
+    @property
+    def failed_reports(self):
+        """Raw report records that couldn't be fetched, even after retrying"""
+        return [r for c in self.committees for r in c.failed_reports]
+
+    @property
+    def address_anomalies(self):
+        """C7/C7E addresses that didn't parse cleanly, across every committee (see models/addresses.py)"""
+        frames = FrameAccumulator(columns=ADDRESS_ANOMALY_COLUMNS)
+        for c in self.committees:
+            frames.add(c.address_anomalies)
+        return frames.result()
+
     def export(self, base_dir):
         for committee in self.committees:
             committee.export(base_dir)
@@ -108,20 +263,20 @@ class CommitteeList:
             # print(f'No committees on list')
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for committee in self.committees:
-            df = pd.concat([df, committee.contributions])
-        return df
+            frames.add(committee.contributions)
+        return apply_schema(frames.result())
 
     def _get_expenditures(self):
         if len(self.committees) == 0:
             # print(f'No committees on list')
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for committee in self.committees:
-            df = pd.concat([df, committee.expenditures])
-        return df
+            frames.add(committee.expenditures)
+        return apply_schema(frames.result())
 
 
 class Committee:
@@ -134,47 +289,144 @@ class Committee:
                  fetchReports=True,
                  fetchFullReports=True,
                  checkCache=True,
-                 writeCache=True
+                 writeCache=True,
+                 workers=1,
+                 deferFullReports=False,
+                 manifest=None,
+                 lazy=False,
                  ):
+        """
+        - workers - number of reports to fetch concurrently
+        - deferFullReports - fetch report list only; caller is responsible for fetch_finance_reports()
+        - manifest - ReportManifest for incremental runs (see models/manifest.py)
+        - lazy - fetch nothing up front. The report list, reports and totals (see LAZY_ATTRIBUTES) are
+          fetched on first access, or in bulk with prefetch()
+        """
         # print(data)
         self.id = data['committeeId']
         self.name = data['committeeName']
         self.slug = str(self.id) + '-' + \
             self.name.strip().replace(' ', '-').replace(',', '').replace('/','-')
         self.data = data
-        self.finance_reports = []
 
-        cachePath = os.path.join(cachePath, self.slug)
+        self.cachePath = os.path.join(cachePath, self.slug)
+        self.checkCache = checkCache
+        self.writeCache = writeCache
+        self.unchanged = False
+        self.failed_reports = []
+
+        self.lazy = lazy
+        self._lock = threading.RLock()
+        if lazy:
+            return
+
+        self.finance_reports = []
+        self.address_anomalies = pd.DataFrame(columns=ADDRESS_ANOMALY_COLUMNS)
 
         if fetchReports:
             self.raw_reports = self._fetch_committee_finance_reports()
-            # Filter to more recent than 2021
-            self.raw_reports = [r for r in self.raw_reports if parse(r['toDateStr'])
-                                >= datetime(2021, 1, 1)]
-
-        if (fetchReports and fetchFullReports):
-            print(
-                f'## Fetching {len(self.raw_reports)} finance reports for {self.name} ({self.id})')
-            self.finance_reports = [Report(r,
-                                           cachePath=cachePath,
-                                           checkCache=checkCache,
-                                           writeCache=writeCache, fetchFullReports=fetchFullReports
-                                           ) for r in self.raw_reports]
-            self.summary = self._get_summary()
-            self.contributions = self._get_contributions()
-            self.expenditures = self._get_expenditures()
-            # self.unitemized_contributions = self._get_unitemized_contributions()
-            self.summarized_reports = self._summarize_reports()
-            print(
-                f'Found {len(self.contributions)} contributions and {len(self.expenditures)} expenditures in {len(self.finance_reports)} reports')
-            self.export(cachePath)
-            print('\n')
+
+        if (fetchReports and fetchFullReports and not deferFullReports):
+            fetch_finance_reports([self], workers=workers, manifest=manifest)
+
+    def __getattr__(self, name):
+        # Only reached for attributes that aren't set - on a lazy Committee, the ones not loaded yet
+        if self.__dict__.get('lazy') and name in LAZY_ATTRIBUTES:
+            with self._lock:
+                if name not in self.__dict__:
+                    setattr(self, name, getattr(self, LAZY_ATTRIBUTES[name])())
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def prefetch(self, summaryOnly=False, workers=1):
+        """Loads this committee's reports up front instead of on first access (see prefetch_reports)"""
+        prefetch_reports([self], workers=workers, summaryOnly=summaryOnly)
+        return self
+
+    def totals_row(self):
+        """Whole-cycle totals for this committee - the same figures as the export summary file"""
+        return {
+            'slug': self.slug,
+            'committeeId': self.id,
+            'committeeName': self.name,
+            'type': self.data['type'],
+            'electionYear': self.data['electionYear'],
+            'periods': len(self.finance_reports),
+            'receipts': self.summary['contributions']['total'],
+            'expenditures': self.summary['expenditures']['total'],
+            'balance': self.summary['cash_on_hand']['total'],
+            **self.summary['report_counts'],
+        }
+
+    def _build_lazy_reports(self):
+        return [self._build_report(raw, lazy=True) for raw in self.raw_reports]
+
+    def _build_report(self, raw, source=None, lazy=False):
+        return Report(raw,
+                      cachePath=self.cachePath,
+                      checkCache=self.checkCache,
+                      writeCache=self.writeCache, fetchFullReports=True,
+                      source=source,
+                      lazy=lazy
+                      )
+
+    def load_finance_reports(self, reports):
+        """Compiles totals from fetched Report objects and writes committee export"""
+        self.finance_reports = reports
+        self.summary = self._get_summary()
+        self.contributions = self._get_contributions()
+        self.expenditures = self._get_expenditures()
+        # self.unitemized_contributions = self._get_unitemized_contributions()
+        self.summarized_reports = self._summarize_reports()
+        self.address_anomalies = self._get_address_anomalies()
+        print(
+            f'Found {len(self.contributions)} contributions and {len(self.expenditures)} expenditures in {len(self.finance_reports)} reports')
+        self.export(self.cachePath)
+        print('\n')
+
+    def has_cached_export(self):
+        return all(os.path.isfile(path) for path in self._export_paths(self.cachePath))
+
+    def load_unchanged(self):
+        """Skips rebuilding a committee with no new or amended reports; export() reuses the cached files"""
+        self.unchanged = True
+        self.contributions = pd.DataFrame()
+        self.expenditures = pd.DataFrame()
+        print(f'## No new or amended reports for {self.name} ({self.id}), keeping cached export')
+
+    def load_failed(self, failed_reports):
+        """Leaves a committee with reports that couldn't be fetched out of this run; export() keeps any previous export"""
+        self.failed_reports = failed_reports
+        self.contributions = pd.DataFrame()
+        self.expenditures = pd.DataFrame()
+        print(f'!! {len(failed_reports)} of {len(self.raw_reports)} reports failed for {self.name} ({self.id}), skipping')
+
+    def _export_paths(self, write_dir):
+        summary_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-summary.json')
+        contributions_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-contributions-itemized.json')
+        expenditures_path = os.path.join(
+            os.getcwd(), write_dir, self.slug + '-expenditures-itemized.json')
+        return summary_path, contributions_path, expenditures_path
 
     def _fetch_committee_finance_reports(self, raw=False):
+        post_url, post_payload, get_url = self._report_list_request()
+
+        def fetch():
+            session = get_client().session()
+            session.post(post_url, post_payload)
+            return list(fetch_rows(session, get_url))
+        full = recorded_rows({'url': post_url, 'data': post_payload}, fetch)
+        if raw:
+            return full
+        return self._clean_report_list(full)
+
+    def _report_list_request(self):
+        """(post url, payload, list url template) for this committee's report list"""
         post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/retrieveCommitteeReports'
-        list_max = 1000
-        get_url = f"""
-        https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/listFinanceReports?sEcho=1&iColumns=6&sColumns=&iDisplayStart=0&iDisplayLength={list_max}&mDataProp_0=checked&mDataProp_1=fromDateStr&mDataProp_2=toDateStr&mDataProp_3=formTypeDescr&mDataProp_4=formTypeCode&mDataProp_5=statusDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=true&bSortable_5=true&_=1549557879524
+        get_url = """
+        https://cers-ext.mt.gov/CampaignTracker/public/publicReportList/listFinanceReports?sEcho=1&iColumns=6&sColumns=&iDisplayStart={start}&iDisplayLength={length}&mDataProp_0=checked&mDataProp_1=fromDateStr&mDataProp_2=toDateStr&mDataProp_3=formTypeDescr&mDataProp_4=formTypeCode&mDataProp_5=statusDescr&sSearch=&bRegex=false&sSearch_0=&bRegex_0=false&bSearchable_0=true&sSearch_1=&bRegex_1=false&bSearchable_1=true&sSearch_2=&bRegex_2=false&bSearchable_2=true&sSearch_3=&bRegex_3=false&bSearchable_3=true&sSearch_4=&bRegex_4=false&bSearchable_4=true&sSearch_5=&bRegex_5=false&bSearchable_5=true&iSortCol_0=0&sSortDir_0=asc&iSortingCols=1&bSortable_0=false&bSortable_1=true&bSortable_2=true&bSortable_3=true&bSortable_4=true&bSortable_5=true&_=1549557879524
         """
         post_payload = {
             'committeeId': self.id,
@@ -182,14 +434,9 @@ class Committee:
             'searchPage': 'public',
             # 'searchType': 'Expenditures',
         }
+        return post_url, post_payload, get_url
 
-        session = requests.Session()
-        session.post(post_url, post_payload)
-        r = session.get(get_url)
-        full = r.json()['aaData']
-        if raw:
-            return full
-
+    def _clean_report_list(self, full):
         cleaned = list(map(lambda d: {
             'reportId': d['reportId'],
             'fromDateStr': d['fromDateStr'],
@@ -201,7 +448,8 @@ class Committee:
             'filingTypeDescr': d['filingTypeDescr'],
             "amendedDate": d['amendedDate']
         }, full))
-        return cleaned
+        # Filter to more recent than 2021
+        return [r for r in cleaned if parse(r['toDateStr']) >= datetime(2021, 1, 1)]
 
     def list_reports(self):
         return self.raw_reports
@@ -250,15 +498,15 @@ class Committee:
         if len(self.finance_reports) == 0:
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for report in self.finance_reports:
             dfi = report.contributions.copy()
-            dfi.insert(0, 'Committee', self.name)
+            dfi.insert(0, 'Committee', label_column(self.name, len(dfi)))
             dfi.insert(1, 'Reporting Period',
-                       f'{report.start_date} to {report.end_date}')
-            dfi.insert(2, 'Report Type', report.type)
-            df = pd.concat([df, dfi])
-        return df
+                       label_column(f'{report.start_date} to {report.end_date}', len(dfi)))
+            dfi.insert(2, 'Report Type', label_column(report.type, len(dfi)))
+            frames.add(dfi)
+        return apply_schema(frames.result())
 
     def _get_expenditures(self):
         """
@@ -267,15 +515,23 @@ class Committee:
         if len(self.finance_reports) == 0:
             return pd.DataFrame()
 
-        df = pd.DataFrame()
+        frames = FrameAccumulator()
         for report in self.finance_reports:
             dfi = report.expenditures.copy()
-            dfi.insert(0, 'Committee', self.name)
+            dfi.insert(0, 'Committee', label_column(self.name, len(dfi)))
             dfi.insert(1, 'Reporting Period',
-                       f'{report.start_date} to {report.end_date}')
-            dfi.insert(2, 'Report Type', report.type)
-            df = pd.concat([df, dfi])
-        return df
+                       label_column(f'{report.start_date} to {report.end_date}', len(dfi)))
+            dfi.insert(2, 'Report Type', label_column(report.type, len(dfi)))
+            frames.add(dfi)
+        return apply_schema(frames.result())
+
+    def _get_address_anomalies(self):
+        """Address anomalies from this committee's reports, tagged with the report they came from"""
+        frames = FrameAccumulator(columns=ADDRESS_ANOMALY_COLUMNS)
+        for report in self.finance_reports:
+            if len(report.address_anomalies) > 0:
+                frames.add(report.address_anomalies.assign(**{'Committee': self.name, 'Report ID': report.id}))
+        return frames.result()
 
     def _summarize_reports(self):
         """
@@ -299,12 +555,16 @@ class Committee:
         # make folder if it doesn't exist
         if not os.path.exists(write_dir):
             os.makedirs(write_dir)
-        summary_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-summary.json')
-        contributions_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-contributions-itemized.json')
-        expenditures_path = os.path.join(
-            os.getcwd(), write_dir, self.slug + '-expenditures-itemized.json')
+        summary_path, contributions_path, expenditures_path = self._export_paths(write_dir)
+        if len(self.failed_reports) > 0 and not self.has_cached_export():
+            print(f'!! {self.slug} not exported - reports failed and there is no previous export')
+            return
+        if self.unchanged or len(self.failed_reports) > 0:
+            # Nothing new since last run (or couldn't fetch what's new) - copy cached export instead of rebuilding it
+            for src, dst in zip(self._export_paths(self.cachePath), (summary_path, contributions_path, expenditures_path)):
+                if os.path.abspath(src) != os.path.abspath(dst):
+                    shutil.copyfile(src, dst)
+            return
         summary = {
             'slug': self.slug,
             'committeeName': self.name,
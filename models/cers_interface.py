@@ -3,10 +3,17 @@ Interface for fetching CERS data
 
 Components
 - Interface - List of queries (e.g. all statewide 2020 candidates)
+- AsyncInterface - Same recipes as coroutines, so several can run at once in one event loop
 """
 
 from models.cers_candidate import CandidateList
 from models.cers_committee import CommitteeList
+from models.cers_client import CersClient, get_client, set_client, DEFAULT_POOL_SIZE
+from models.cers_async import AsyncCersClient
+from models.rate_limit import RateLimiter, DEFAULT_RPS, DEFAULT_CONCURRENCY
+from models.report_cache import get_cache_backend, set_report_cache
+from models.report_source import ReplayReportSource, set_report_source
+from models.raw_store import RawStore, set_raw_store, DEFAULT_RAW_STORE_PATH
 
 CANDIDATE_SEARCH_DEFAULT = {
     'lastName': '',
@@ -43,15 +50,59 @@ ACTIVE_STATUSES = ['Active', 'Reopened', 'Amended']
 class Interface:
     """
     Interface for Montana COPP Campaign Electronic Reporting System
+    - workers - number of concurrent CERS requests used by the recipes below. 1 (default) fetches serially
+    - incremental - only rebuild candidates/committees with new or amended reports since the last run
+    - cacheFormat - 'json' (default), 'parquet' or 'arrow' for Report caches. Existing caches in other formats are still read
+    - requestsPerSecond, maxInFlight - global CERS request budget shared by every worker (see models/rate_limit.py)
+    - rawStore - folder to record raw CERS responses in (see models/raw_store.py). None (default) records nothing
+    - replay - rebuild from responses recorded in rawStore (default folder if not given) instead of CERS.
+      Report caches are ignored and incremental is off, so every report is re-parsed
     """
 
-    def get_candidates_by_race(self, election_year, office_code):
+    def __init__(self, workers=1, incremental=False, cacheFormat=None,
+                 requestsPerSecond=DEFAULT_RPS, maxInFlight=DEFAULT_CONCURRENCY,
+                 rawStore=None, replay=False):
+        self.workers = workers
+        self.incremental = incremental and not replay
+        self.replay = replay
+        if cacheFormat is not None:
+            set_report_cache(get_cache_backend(cacheFormat))
+        if rawStore is not None or replay:
+            store = RawStore(rawStore or DEFAULT_RAW_STORE_PATH, replay=replay)
+            set_raw_store(store)
+            if replay:
+                set_report_source(ReplayReportSource(store))
+        # Make sure the shared connection pool can hold a connection per worker
+        if workers > get_client().poolSize:
+            set_client(CersClient(poolSize=workers, policy=get_client().policy, baseUrl=get_client().baseUrl))
+        get_client().limiter = RateLimiter(
+            rps=requestsPerSecond, concurrency=maxInFlight)
+
+    def print_client_stats(self):
+        get_client().print_stats()
+
+    def _list_options(self, kwargs):
+        if self.replay:
+            kwargs['checkCache'] = False
+        return kwargs
+
+    def _candidate_list(self, search, **kwargs):
+        return CandidateList(search, **self._list_options(kwargs))
+
+    def _committee_list(self, search, **kwargs):
+        return CommitteeList(search, **self._list_options(kwargs))
+
+    def get_candidates_by_race(self, election_year, office_code, filterStatuses=ACTIVE_STATUSES, summaryOnly=False):
+        """summaryOnly - fetch just report summaries and compile the list's totals table (see CandidateList)"""
         search = CANDIDATE_SEARCH_DEFAULT.copy()
         search['electionYear'] = election_year
         search['officeCode'] = office_code
-        return CandidateList(search, 
+        return self._candidate_list(search, 
                              cachePath=f'cache/{election_year}/candidates',
-                             filterStatuses=ACTIVE_STATUSES)
+                             filterStatuses=filterStatuses,
+                             workers=self.workers,
+                             incremental=self.incremental and not summaryOnly,
+                             summaryOnly=summaryOnly)
     
     def list_candidates_by_race(self, election_year, office_code):
         search = CANDIDATE_SEARCH_DEFAULT.copy()
@@ -68,15 +119,19 @@ class Interface:
         search['electionYear'] = election_year
         search['lastName'] = last
         search['firstName'] = first
-        return CandidateList(search,
+        return self._candidate_list(search,
                              cachePath=f'cache/{election_year}/candidates',
-                             filterStatuses=filterStatuses)
+                             filterStatuses=filterStatuses,
+                             workers=self.workers,
+                             incremental=self.incremental)
 
     def get_committee_by_name(self, name, election_year, **kwargs):
         search = COMMITTEE_SEARCH_DEFAULT.copy()
         search['expendCommitteeName'] = name
-        return CommitteeList(search,
-                             cachePath=f'cache/{election_year}/committees')
+        return self._committee_list(search,
+                             cachePath=f'cache/{election_year}/committees',
+                             workers=self.workers,
+                             incremental=self.incremental)
 
     # Recipes
 
@@ -94,24 +149,30 @@ class Interface:
         print('Num:', len(committees.list_committees()))
         print(committees.list_committees())
 
-    def get_committees_with_spending(self, cycle, excludeCommittees=[1895]):
+    def get_committees_with_spending(self, cycle, excludeCommittees=[1895], summaryOnly=False):
         """Returns list of committees with reported spending in given election cycle
         cycle="2022" or "2024"
         excludeCommittees= list of commitees to exclude
             ActBlue (1895) is excluded by default because it's too big for the state system
+        summaryOnly= fetch just report summaries and compile the list's totals table (see CommitteeList)
         """
         search = COMMITTEE_SEARCH_DEFAULT.copy()
         search['electionYear'] = cycle
         print(f'Fetching committees for {cycle} cycle')
         print('Note: Unless otherwise specified, this skips ActBlue')
-        return CommitteeList(
+        return self._committee_list(
             search,
             cachePath=f'cache/{cycle}/committees',
-            excludeCommittees=excludeCommittees
+            excludeCommittees=excludeCommittees,
+            workers=self.workers,
+            incremental=self.incremental and not summaryOnly,
+            summaryOnly=summaryOnly
         )
     
-    def get_legislative_candidates(self, cycle, excludeCandidates=[], filterStatuses=ACTIVE_STATUSES):
-        """Returns data for legislative candidates running in given cycle"""
+    def get_legislative_candidates(self, cycle, excludeCandidates=[], filterStatuses=ACTIVE_STATUSES, summaryOnly=False):
+        """Returns data for legislative candidates running in given cycle
+        summaryOnly - fetch just report summaries and compile the list's totals table (see CandidateList)
+        """
 
         def office_is_legislative(candidate):
             return 'House District' in candidate['officeTitle'] or 'Senate District' in candidate['officeTitle']
@@ -119,13 +180,16 @@ class Interface:
         search = CANDIDATE_SEARCH_DEFAULT.copy()
         search['electionYear'] = cycle
         search['candidateTypeCode'] = 'SD' # State District in CERS shorthand
-        return CandidateList(
+        return self._candidate_list(
             search,
             cachePath=f'cache/{cycle}/candidates',
             filterStatuses=filterStatuses,
             filterFunction=office_is_legislative,
             # excludeCandidates=[18322]  # Fake Coffee J candidate for testing
-            excludeCandidates=excludeCandidates
+            excludeCandidates=excludeCandidates,
+            workers=self.workers,
+            incremental=self.incremental and not summaryOnly,
+            summaryOnly=summaryOnly
         )
     
 
@@ -268,3 +332,36 @@ class Interface:
                              )
 
     # TODO - interfaces here for single-candidate-by-id search
+
+
+class AsyncInterface(Interface):
+    """Interface whose get_* recipes return coroutines (see models/cers_async.py). Needs aiohttp
+    - workers - max reports fetched/built at once. Request concurrency is set by requestsPerSecond/maxInFlight
+
+    async with AsyncInterface(workers=8) as cers:
+        committees, leg = await asyncio.gather(
+            cers.get_committees_with_spending(cycle='2024'),
+            cers.get_legislative_candidates(cycle='2024'))
+    """
+
+    def __init__(self, workers=8, **kwargs):
+        super().__init__(workers=workers, **kwargs)
+        self.client = AsyncCersClient(poolSize=max(workers, DEFAULT_POOL_SIZE), workers=workers)
+
+    async def close(self):
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def print_client_stats(self):
+        self.client.print_stats()
+
+    def _candidate_list(self, search, **kwargs):
+        return self.client.candidate_list(search, **self._list_options(kwargs))
+
+    def _committee_list(self, search, **kwargs):
+        return self.client.committee_list(search, **self._list_options(kwargs))
@@ -1,23 +1,44 @@
 import requests
+import numpy as np
 import pandas as pd
 from io import StringIO
 
 from datetime import date
-from datetime import datetime
 from dateutil.parser import parse
 
 import os
 import json
 import csv
+import threading
 
-import re
-from bs4 import BeautifulSoup
+from models.report_cache import get_report_cache, find_cached
+from models.report_source import get_report_source, C7_DETAIL_LISTS, C7E_DETAIL_LISTS
+from models.report_summary import summary_rows, SUMMARY_LABELS
+from models.normalize import money_value, parse_epoch_dates, parse_flags, epoch_date, flag_value
+from models.addresses import parse_addresses, address_rows, ANOMALY_COLUMNS
+from models.schema import apply_schema
 
-from manual.config import MANUAL_CONTRIBUTION_CACHES
 from manual.config import MANUAL_SUMMARY_CACHES
 
+# Forms whose summary comes from the report page alone - C7/C7E summaries are totals of their detail lists
+SUMMARY_PAGE_FORMS = ['C4', 'C5', 'C6']
+
+# Detail lists shorter than this are built row by row - setting up columns costs more than it saves there.
+# Those frames skip apply_schema too; they're typed once combined into candidate/committee tables
+ROW_PARSE_LIMIT = 3000
+
+# Attributes a lazy Report loads on first access - summary with load_summary(), the rest with load()
+LAZY_ATTRIBUTES = ['summary', 'contributions', 'expenditures', 'unitemized_contributions', 'address_anomalies']
+
 class Report:
-    def __init__(self, data, cachePath, checkCache=True, writeCache=True, fetchFullReports=True):
+    def __init__(self, data, cachePath, checkCache=True, writeCache=True, fetchFullReports=True, cache=None, source=None,
+                 lazy=False):
+        """
+        - cache - cache backend to write with (see models/report_cache.py). Defaults to shared backend
+        - source - where raw CERS responses come from (see models/report_source.py). Defaults to shared source
+        - lazy - fetch nothing up front. Accessing summary loads just the summary where it can (see load_summary);
+          accessing anything else loads the whole report (see load)
+        """
         self.id = data['reportId']
         self.data = data
         self.type = data['formTypeCode']
@@ -25,25 +46,71 @@ class Report:
         self.end_date = data['toDateStr']
         self.label = f'{self.start_date} to {self.end_date}'
 
+        self.cachePath = cachePath
+        self.checkCache = checkCache
+        self.writeCache = writeCache
         self.fetchFullReports = fetchFullReports
 
+        self.cache = cache or get_report_cache()
+        self.source = source or get_report_source()
+
+        self.lazy = lazy
+        self._loaded = False
+        self._lock = threading.RLock()
+        if not lazy:
+            self.load()
+
+    def __getattr__(self, name):
+        # Only reached for attributes that aren't set - on a lazy Report, the ones not loaded yet
+        if self.__dict__.get('lazy') and name in LAZY_ATTRIBUTES:
+            if name == 'summary':
+                self.load_summary()
+            else:
+                self.load()
+            return object.__getattribute__(self, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def load_summary(self):
+        """Loads the summary without the itemized data where possible - from a current cache, or from the
+        report page for SUMMARY_PAGE_FORMS (no schedule downloads). Other forms load in full
+        """
+        with self._lock:
+            if 'summary' in self.__dict__:
+                return
+            cached = find_cached(self.cachePath, self.type, self.id) if self.checkCache else None
+            meta = cached.read_meta(self.cachePath, self.type, self.id) if cached is not None else {}
+            if ('data' in meta) and (meta['data']['amendedDate'] == self.data['amendedDate']):
+                self.summary = meta['summary']
+            elif self.type in SUMMARY_PAGE_FORMS:
+                print(f'Fetching {self.type} summary {self.start_date}-{self.end_date} ({self.id})')
+                self.summary = self._fetch_form_summary()
+            else:
+                self.load()
+
+    def load(self):
+        """Fetches (or reads from cache) and parses the whole report, then caches it. Only runs once"""
+        with self._lock:
+            if self._loaded:
+                return
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        cachePath = self.cachePath
         self.contributions = pd.DataFrame()
         self.expenditures = pd.DataFrame()
+        # C7/C7E addresses that didn't parse cleanly (see models/addresses.py)
+        self.address_anomalies = pd.DataFrame(columns=ANOMALY_COLUMNS)
 
-        filePath = os.path.join(cachePath, f'{self.type}-{self.id}.json')
+        cached = find_cached(cachePath, self.type, self.id) if self.checkCache else None
 
-        if checkCache and os.path.isfile(filePath):
-            self._get_cached_data(filePath)
+        if cached is not None:
+            self._get_cached_data(cached, cachePath)
             # This checks for updates and reroutes for newly amended forms
         elif (self.type == 'C4'):
             self._get_c4_data_from_scrape()
         elif (self.type == 'C5'):
-            if self.id in MANUAL_CONTRIBUTION_CACHES.keys():
-                # Files that are too big to reliably download from CERS
-                # Downloaded once separately and plugged into manual cache system as a workaround
-                self._get_c5_data_from_manual_cache()
-            else:
-                self._get_c5_data_from_scrape()
+            self._get_c5_data_from_scrape()
         elif (self.type == 'C7'):
             self._get_c7_data_from_scrape()
         elif (self.type == 'C7E'):
@@ -61,29 +128,26 @@ class Report:
             }
 
         # Add cache
-        if writeCache:
-            if not os.path.exists(cachePath):
-                os.makedirs(cachePath)
-            self.export(filePath)
+        if self.writeCache:
+            # exist_ok - sibling reports may be creating this folder concurrently
+            os.makedirs(cachePath, exist_ok=True)
+            self.export(cachePath)
 
-    def _get_cached_data(self, file_path):
+    def _get_cached_data(self, backend, cachePath):
         print(
             f'--- From cache, loading {self.type} {self.start_date}-{self.end_date} ({self.id})')
-        with open(file_path) as f:
-            cache = json.load(f)
+        cache = backend.read_meta(cachePath, self.type, self.id)
 
         if (('data' in cache) and (cache['data']['amendedDate'] == self.data['amendedDate'])):
             self.summary = cache['summary']
-            self.contributions = pd.read_json(cache['contributions'])
-            self.expenditures = pd.read_json(cache['expenditures'])
+            contributions, expenditures = backend.read_frames(
+                cachePath, self.type, self.id, cache)
+            self.contributions = apply_schema(contributions)
+            self.expenditures = apply_schema(expenditures)
             self.unitemized_contributions = self._calc_unitemized_contributions()
         else:
             print(f'----- Actually, amendment found on {self.id}')
-            if self.id in MANUAL_CONTRIBUTION_CACHES.keys():
-                if (self.type != 'C5'):
-                    print('Wrong report type')
-                self._get_c5_data_from_manual_cache()
-            elif self.type == 'C4':
+            if self.type == 'C4':
                 self._get_c4_data_from_scrape()
             elif self.type == 'C5':
                 self._get_c5_data_from_scrape()
@@ -97,33 +161,10 @@ class Report:
                 print('Bad cache on unhandled report type', self.type)
 
     def _get_c4_data_from_scrape(self):
-        # Same code as C6 — maybe refactor?
         print(f'Fetching C4 {self.start_date}-{self.end_date} ({self.id})')
-
-        post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
-        post_payload = {
-            'committeeId': self.data['committeeId'],
-            'reportId': self.id,
-            'searchPage': 'public'
-        }
-        session = requests.Session()
-        p = session.post(post_url, post_payload)
-        text = p.text
-
-        # Parse report
-        soup = BeautifulSoup(text, 'html.parser')
-        labels = [
-            'previous report',
-            'Receipts',
-            'Expenditures',
-            'Ending Balance',
-        ]
-        table = soup.find('div', id='summaryAccordionId').find('table')
-        parsed = {label: self._committee_parse_html_get_row(
-            table, label) for label in labels}
-        parsed['report_start_date'] = self.start_date
-        parsed['report_end_date'] = self.end_date
-        self.summary = parsed
+        # Summary is already there if a lazy Report loaded it first
+        if 'summary' not in self.__dict__:
+            self.summary = self._fetch_committee_report_summary()
 
         if self.fetchFullReports:
             self.contributions = self._fetch_form_schedule(
@@ -134,21 +175,10 @@ class Report:
             # Unnecessary for political committees?
             self.unitemized_contributions = self._calc_unitemized_contributions()
 
-    def _get_c5_data_from_manual_cache(self):
-        file = MANUAL_CONTRIBUTION_CACHES[self.id]
-        print(f'Fetching manual cache {file}')
-        self.summary = self._fetch_report_summary()
-        if self.fetchFullReports:
-            self.contributions = self._fetch_form_schedule(
-                'A', self.data['candidateName'])
-            self.expenditures = self._fetch_form_schedule(
-                'B', self.data['candidateName'])
-            # TODO - move this to cleaning step?
-            self.unitemized_contributions = self._calc_unitemized_contributions()
-
     def _get_c5_data_from_scrape(self):
         print(f'Fetching C5 {self.start_date}-{self.end_date} ({self.id})')
-        self.summary = self._fetch_report_summary()
+        if 'summary' not in self.__dict__:
+            self.summary = self._fetch_report_summary()
         if self.fetchFullReports:
             self.contributions = self._fetch_form_schedule(
                 'A', self.data['candidateName'])
@@ -161,53 +191,21 @@ class Report:
     def _get_c7_data_from_scrape(self):
         print(f'Fetching C7 {self.start_date}-{self.end_date} ({self.id})')
 
-        post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
-        if 'candidateId' in self.data:
-            post_payload = {
-                'candidateId': self.data['candidateId'],
-                'reportId': self.id,
-                'searchPage': 'public'
-            }
-        elif 'committeeId' in self.data:
-            post_payload = {
-                'committeeId': self.data['committeeId'],
-                'reportId': self.id,
-                'searchPage': 'public'
-            }
-        session = requests.Session()
-        session.post(post_url, post_payload)
-
-        # C7 reports contain a bunch of different tables - need to parse each individually
-        detail_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/financeRepDetailList'
-
-        individual_raw = session.post(detail_url, {'listName': "individual"})
-        individual = self._parse_c7_table(individual_raw)
-
-        committees_raw = session.post(detail_url, {'listName': "committee"})
-        committees = self._parse_c7_table(committees_raw)
-
-        loans_raw = session.post(detail_url, {'listName': "loan"})
-        loans = self._parse_c7_table(loans_raw)
+        # C7 reports contain a bunch of different tables - contributions come from the first three
+        lists = self.source.detail_lists(self, C7_DETAIL_LISTS)
+        contributions = self._parse_c7_table(
+            lists['individual'] + lists['committee'] + lists['loan'])
 
         # For time being, just check other categories are null
-        candidate_raw = session.post(detail_url, {'listName': "candidate"})
-        if (candidate_raw.json() != []):
+        if (lists['candidate'] != []):
             print('## Need to handle C7 candidate self contributions')
-
-        fundraisers_raw = session.post(detail_url, {'listName': "fundraisers"})
-        if (fundraisers_raw.json() != []):
+        if (lists['fundraisers'] != []):
             print('## Need to handle C7 fundraiers')
-
-        refunds_raw = session.post(detail_url, {'listName': "refunds"})
-        if (refunds_raw.json() != []):
+        if (lists['refunds'] != []):
             print('## Need to handle C7 refunds')
-
-        payments_raw = session.post(detail_url, {'listName': "payment"})
-        if (payments_raw.json() != []):
+        if (lists['payment'] != []):
             print('## Need to handle C7 payments')
 
-        # print('B',pd.DataFrame(individual).iloc[3])
-        contributions = pd.DataFrame(individual + committees + loans)
         expenditures = pd.DataFrame()  # Reported w/ C7E
 
         if (len(contributions) > 0):
@@ -243,49 +241,17 @@ class Report:
         print(f'Fetching C7E {self.start_date}-{self.end_date} ({self.id})')
         # print(self.data)
 
-        post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
-
-        if 'candidateId' in self.data:
-            post_payload = {
-                'candidateId': self.data['candidateId'],
-                'reportId': self.id,
-                'searchPage': 'public'
-            }
-        elif 'committeeId' in self.data:
-            post_payload = {
-                'committeeId': self.data['committeeId'],
-                'reportId': self.id,
-                'searchPage': 'public'
-            }
-
-        # post_payload = {
-        #     'candidateId': self.data['candidateId'],
-        #     'reportId': self.id,
-        #     'searchPage': 'public'
-        # }
-        session = requests.Session()
-        session.post(post_url, post_payload)
-
-        detail_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/financeRepDetailList'
-
-        expenditures_raw = session.post(
-            detail_url, {'listName': "expendOther"})
-        expenditures = self._parse_c7e_table(expenditures_raw)
+        lists = self.source.detail_lists(self, C7E_DETAIL_LISTS)
+        expenditures = self._parse_c7e_table(lists['expendOther'])
 
         # Unhandled for now
-        candidate_raw = session.post(detail_url, {'listName': "candidate"})
-        if (candidate_raw.json() != []):
+        if (lists['candidate'] != []):
             print('## Need to handle C7E candidate expenditures')
-
-        pettycash_raw = session.post(detail_url, {'listName': "pettyCash"})
-        if (pettycash_raw.json() != []):
+        if (lists['pettyCash'] != []):
             print('## Need to handle C7E petty cash')
-
-        debt_raw = session.post(detail_url, {'listName': "debtLoan"})
-        if (debt_raw.json() != []):
+        if (lists['debtLoan'] != []):
             print('## Need to handle debts --')
 
-        expenditures = pd.DataFrame(expenditures)
         self.expenditures = expenditures
         self.contributions = pd.DataFrame()
         self.unitemized_contributions = 0
@@ -319,31 +285,8 @@ class Report:
     def _get_c6_data_from_scrape(self):
         print(f'Fetching C6 {self.start_date}-{self.end_date} ({self.id})')
         # print(self.data)
-
-        post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
-        post_payload = {
-            'committeeId': self.data['committeeId'],
-            'reportId': self.id,
-            'searchPage': 'public'
-        }
-        session = requests.Session()
-        p = session.post(post_url, post_payload)
-        text = p.text
-
-        # Parse report
-        soup = BeautifulSoup(text, 'html.parser')
-        labels = [
-            'previous report',
-            'Receipts',
-            'Expenditures',
-            'Ending Balance',
-        ]
-        table = soup.find('div', id='summaryAccordionId').find('table')
-        parsed = {label: self._committee_parse_html_get_row(
-            table, label) for label in labels}
-        parsed['report_start_date'] = self.start_date
-        parsed['report_end_date'] = self.end_date
-        self.summary = parsed
+        if 'summary' not in self.__dict__:
+            self.summary = self._fetch_committee_report_summary()
 
         if self.fetchFullReports:
             self.contributions = self._fetch_form_schedule(
@@ -354,17 +297,16 @@ class Report:
             # Unnecessary for political committees?
             self.unitemized_contributions = self._calc_unitemized_contributions()
 
-    def export(self, filePath):
-        output = {
+    def export(self, cachePath):
+        meta = {
             'data': self.data,
             'summary': self.summary,
-            'contributions': self.contributions.to_json(orient='records'),
-            'expenditures': self.expenditures.to_json(orient='records'),
             'unitemized_contributions': self.unitemized_contributions,
         }
-        with open(filePath, 'w') as f:
-            json.dump(output, f, indent=4)
-        # print(f'Cached to {filePath}')
+        # Hash is recorded in the incremental update manifest (see models/manifest.py)
+        self.content_hash = self.cache.write(
+            cachePath, self.type, self.id, meta, self.contributions, self.expenditures)
+        # print(f'Cached to {cachePath}')
 
     def _fetch_report_summary(self):
         if self.id in MANUAL_SUMMARY_CACHES.keys():
@@ -373,31 +315,32 @@ class Report:
             with open(path, 'r') as f:
                 text = f.read()
         else:
-            post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
-            post_payload = {
-                'candidateId': self.data['candidateId'],
-                'reportId': self.id,
-                'searchPage': 'public'
-            }
-            session = requests.Session()
-            p = session.post(post_url, post_payload)
-            text = p.text
+            text = self.source.summary_page(self)
 
         # Parse report
-        soup = BeautifulSoup(text, 'html.parser')
-        labels = [
-            'previous report',
-            'Receipts',
-            'Expenditures',
-            'Ending Balance',
-        ]
-        table = soup.find('div', id='summaryAccordionId').find('table')
+        rows = summary_rows(text, SUMMARY_LABELS)
         parsed = {label: self._parse_html_get_row(
-            table, label) for label in labels}
+            rows[label]) for label in SUMMARY_LABELS}
         parsed['report_start_date'] = self.start_date
         parsed['report_end_date'] = self.end_date
         return parsed
 
+    def _fetch_committee_report_summary(self):
+        # C4/C6 summaries only have totals
+        text = self.source.summary_page(self)
+        rows = summary_rows(text, SUMMARY_LABELS)
+        parsed = {label: self._committee_parse_html_get_row(
+            rows[label]) for label in SUMMARY_LABELS}
+        parsed['report_start_date'] = self.start_date
+        parsed['report_end_date'] = self.end_date
+        return parsed
+
+    def _fetch_form_summary(self):
+        # Summary table for SUMMARY_PAGE_FORMS
+        if self.type == 'C5':
+            return self._fetch_report_summary()
+        return self._fetch_committee_report_summary()
+
     # def _fetch_contributions_schedule(self):
     #     return self._fetch_c5_schedule('A')
 
@@ -434,86 +377,96 @@ class Report:
     #     return parsed_text
 
     def _fetch_form_schedule(self, schedule, name):
-        # Fetches downloads for itemized contributions/expenditures of C5 and C6 forms
-        report_id = self.id
-        raw_text = ''
-
-        if (schedule == 'A' and self.id in MANUAL_CONTRIBUTION_CACHES.keys()):
-            print(f'--- Contributions from cache ({self.id})')
-            path = MANUAL_CONTRIBUTION_CACHES[self.id]
-            with open(path, 'r') as f:
-                raw_text = f.read()
-        else:
-            post_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/prepareDownloadFileFromSearch'
-            get_url = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/downloadFile'
-            post_payload = {
-                'reportId': report_id,  # This is from checkbox on candidate report page
-                'scheduleCode': schedule,  # A is contributions, # B is expenditures
-                'fname': name,  # Either candidate or committee name
-            }
-
-            session = requests.Session()
-            p = session.post(post_url, post_payload, timeout=480)
-            if 'fileName' in p.json():
-                r = session.get(get_url, params=p.json())
-                if r.text == '':
-                    print('Empty file. Report ID:', report_id)
-                raw_text = r.text
-            else:
-                print(
-                    f'No file for schedule {schedule}, {self.start_date}-{self.end_date}. Report ID:', report_id)
-
-        parsed_text = self._parse_schedule_text(raw_text)
-        return parsed_text
+        # Fetches downloads for itemized contributions/expenditures of C4, C5 and C6 forms
+        # name (candidate or committee name) is part of the request - see report_source.schedule_payload
+        return self.source.schedule(self, schedule)
 
-    def _parse_schedule_text(self, text):
-        if (text == ''):
-            return pd.DataFrame()
-        parsed = pd.read_csv(StringIO(
-            text), sep='|', on_bad_lines='warn', index_col=False, quoting=csv.QUOTE_NONE)
-        return parsed
-
-    def _parse_html_get_row(self, table, label):
+    def _parse_html_get_row(self, cells):
         # For candidates, where pri/general distinction matters
-        # label can be partial text or regex
-        row = table.find('td', text=re.compile(label)).parent
+        # cells - text of the row's cells, from summary_rows()
         # replaces remove "$" and "," from strings
-        pri = self._clean_value(row.find_all('td')[2].text)
-        gen = self._clean_value(row.find_all('td')[3].text)
+        pri = self._clean_value(cells[2])
+        gen = self._clean_value(cells[3])
         return {
             'primary': pri,
             'general': gen,
             'total': round(pri + gen, 2),
         }
 
-    def _committee_parse_html_get_row(self, table, label):
-        # label can be partial text or regex
-        row = table.find('td', text=re.compile(label)).parent
+    def _committee_parse_html_get_row(self, cells):
+        # cells - text of the row's cells, from summary_rows()
         # replaces remove "$" and "," from strings
-        total = self._clean_value(row.find_all('td')[2].text)
+        total = self._clean_value(cells[2])
         # Keeping extra hierarchy here to maintain parallelism w/ committee reports
         return {
             'total': total
         }
 
-    def _parse_c7_table(self, raw):
+    def _parse_c7_table(self, rows):
+        # Built column-wise from the detail list JSON, or row by row for small tables
+        if len(rows) == 0:
+            return pd.DataFrame()
+        if len(rows) < ROW_PARSE_LIMIT:
+            return self._parse_c7_rows(rows)
+        raw = pd.DataFrame(rows)
+        addresses, self.address_anomalies = parse_addresses(raw['entityAddress'])
+        cash = raw['cashAmt'] > 0
+        in_kind = raw['inKindAmt'] > 0
+        amount_type = pd.Series(np.select([cash & in_kind, cash, in_kind], ['Mixed', 'CA', 'IK'], default=''))
+        # Rows with neither take the previous row's type
+        amount_type = amount_type.where(amount_type != '').ffill()
+        return apply_schema(pd.DataFrame({
+            # 'Candidate': candidate, # added at Candidate object level
+            # 'Reporting Period': self.label, # added at Candidate object level
+            'Date Paid': parse_epoch_dates(raw['datePaid']),
+            'Entity Name': raw['entityName'],
+            'First Name': '',
+            'Middle Initial': '',
+            'Last Name': '',
+            'Addr Line1': addresses['Addr Line1'],
+            'City': addresses['City'],
+            'State': addresses['State'],
+            'Zip': addresses['Zip'],
+            'Zip4': addresses['Zip4'],
+            'Country': '',
+            'Occupation': raw['occupationDescr'],
+            'Employer': raw['employerDescr'],
+            'Contribution Type': raw['lineItemCompositeDescr'],
+            'Amount': raw['totalAmt'],
+            'Amount Type': amount_type,
+            'Purpose': raw['purposeDescr'],
+            'Election Type': raw['amountTypeDescr'],
+            'Total Primary': raw['totalToDatePrimary'],
+            'Total General': raw['totalToDateGeneral'],
+            'Refund Transaction Type': '',
+            'Refund Original Transaction Date': raw['refundOrigTransDate'],
+            'Refund Original Transaction Total': raw['refundOrigTransTotalVal'],
+            'Refund Original Transaction Descr': raw['refundOrigTransDesc'],
+            'Previous Transaction (Y/N)': parse_flags(raw['previousTransactionInd']),
+            'Fundraiser Name': raw['fundraiserName'],
+            'Fundraiser Location': raw['fundraiserLocation'],
+            'Fundraiser Attendees': raw['fundraiserAttendees'],
+            'Fundraiser Tickets Sold': raw['fundraiserTicketsSold'],
+        }))
+
+    def _parse_c7_rows(self, rows):
+        # Same frame as the column-wise path, except the schema is left for the combined tables
+        addresses, self.address_anomalies = address_rows([row.get('entityAddress') for row in rows])
         cleaned = []
-        if( raw.text == ""): return cleaned # null response
-        for row in raw.json():
-            addressLn1, city, state, zip_code = self._parse_address(
-                row['entityAddress'])
-            date = self._parse_date(row['datePaid'])
-            if (row['cashAmt'] > 0 and row['inKindAmt'] > 0):
+        amount_type = np.nan
+        for row, (addressLn1, city, state, zip_code, zip4) in zip(rows, addresses):
+            cash = (row.get('cashAmt') or 0) > 0
+            in_kind = (row.get('inKindAmt') or 0) > 0
+            # Rows with neither take the previous row's type
+            if cash and in_kind:
                 amount_type = 'Mixed'
-            elif (row['cashAmt'] > 0):
+            elif cash:
                 amount_type = 'CA'
-            elif (row['inKindAmt'] > 0):
+            elif in_kind:
                 amount_type = 'IK'
             cleaned.append({
-                # 'Candidate': candidate, # added at Candidate object level
-                # 'Reporting Period': self.label, # added at Candidate object level
-                'Date Paid': date,
-                'Entity Name': row['entityName'],
+                'Date Paid': epoch_date(row.get('datePaid')),
+                'Entity Name': row.get('entityName'),
                 'First Name': '',
                 'Middle Initial': '',
                 'Last Name': '',
@@ -521,94 +474,81 @@ class Report:
                 'City': city,
                 'State': state,
                 'Zip': zip_code,
-                'Zip4': '',
+                'Zip4': zip4,
                 'Country': '',
-                'Occupation': row['occupationDescr'],
-                'Employer': row['employerDescr'],
-                'Contribution Type': row['lineItemCompositeDescr'],
-                'Amount': row['totalAmt'],
+                'Occupation': row.get('occupationDescr'),
+                'Employer': row.get('employerDescr'),
+                'Contribution Type': row.get('lineItemCompositeDescr'),
+                'Amount': row.get('totalAmt'),
                 'Amount Type': amount_type,
-                'Purpose': row['purposeDescr'],
-                'Election Type': row['amountTypeDescr'],
-                'Total Primary': row['totalToDatePrimary'],
-                'Total General': row['totalToDateGeneral'],
+                'Purpose': row.get('purposeDescr'),
+                'Election Type': row.get('amountTypeDescr'),
+                'Total Primary': row.get('totalToDatePrimary'),
+                'Total General': row.get('totalToDateGeneral'),
                 'Refund Transaction Type': '',
-                'Refund Original Transaction Date': row['refundOrigTransDate'],
-                'Refund Original Transaction Total': row['refundOrigTransTotalVal'],
-                'Refund Original Transaction Descr': row['refundOrigTransDesc'],
-                'Previous Transaction (Y/N)': row['previousTransactionInd'],
-                'Fundraiser Name': row['fundraiserName'],
-                'Fundraiser Location': row['fundraiserLocation'],
-                'Fundraiser Attendees': row['fundraiserAttendees'],
-                'Fundraiser Tickets Sold': row['fundraiserTicketsSold'],
-            })
-        return cleaned
-
-    def _parse_c7e_table(self, raw):
-        cleaned = []
-        for row in raw.json():
-            addressLn1, city, state, zip_code = self._parse_address(
-                row['entityAddress'])
-            date = self._parse_date(row['datePaid'])
-            cleaned.append({
-                'Date Paid': date,
-                'Entity Name': row['entityName'],
-                'First Name': '',
-                'Middle Initial': '',
-                'Last Name': '',
-                'Addr Line1': addressLn1,
-                'City': city,
-                'State': state,
-                'Zip': zip_code,
-                'Zip4': '',
-                'Expenditure Type': row['lineItemCompositeDescr'],
-                'Amount': row['totalAmt'],
-                'Purpose': row['purposeDescr'],
-                'Election Type': row['amountTypeDescr'],
-                'Expenditure Paid Communications Platform': row['expenditurePaidCommPlatform'],
-                'Expenditure Paid Communications Quantity': row['expenditurePaidCommQuantity'],
-                'Expenditure Paid Communications Subject Matter': row['expenditurePaidCommSubMatter']
+                'Refund Original Transaction Date': row.get('refundOrigTransDate'),
+                'Refund Original Transaction Total': row.get('refundOrigTransTotalVal'),
+                'Refund Original Transaction Descr': row.get('refundOrigTransDesc'),
+                'Previous Transaction (Y/N)': flag_value(row.get('previousTransactionInd')),
+                'Fundraiser Name': row.get('fundraiserName'),
+                'Fundraiser Location': row.get('fundraiserLocation'),
+                'Fundraiser Attendees': row.get('fundraiserAttendees'),
+                'Fundraiser Tickets Sold': row.get('fundraiserTicketsSold'),
             })
-        return cleaned
-
-    # TODO: Dedupe with cers_committees
-    def _parse_address(self, raw):
-        if (raw == ''):
-            return '','','',''
-        # Assumes address format '1008 Prospect Ave, Helena, MT 59601'
-        # Edge cases will be a pain in the ass here
-        address = raw.replace(
-            'Washington, DC', 'Washington DC, DC').split(', ')
-        addressLn1 = (', ').join(address[0:len(address)-2])
-        city = address[-2].strip()
-        state_zip = address[-1].split(' ')
-        state = state_zip[0]
-        if (len(state_zip) > 1):
-            zip_code = state_zip[1]
-        else:
-            zip_code = ''
-
-        # hacky Testing
-        # if (len(address) != 3):
-        #     # print(f'Raw address string: "{raw}"')
-        #     print('Address parse warning, not len 3', address)
-        #     print([addressLn1,city,state,zip_code])
-        if (len(state_zip) != 2):
-            print('Address parse error, not len 2', state_zip)
-        if (len(state) != 2):
-            print("State parse error, not len 2", state)
-
-        return addressLn1, city, state, zip_code
+        return pd.DataFrame(cleaned)
 
-    def _parse_date(self, raw):
-        return datetime.fromtimestamp(raw / 1000).strftime('%m/%d/%y')
+    def _parse_c7e_table(self, rows):
+        if len(rows) == 0:
+            return pd.DataFrame()
+        if len(rows) < ROW_PARSE_LIMIT:
+            return self._parse_c7e_rows(rows)
+        raw = pd.DataFrame(rows)
+        addresses, self.address_anomalies = parse_addresses(raw['entityAddress'])
+        return apply_schema(pd.DataFrame({
+            'Date Paid': parse_epoch_dates(raw['datePaid']),
+            'Entity Name': raw['entityName'],
+            'First Name': '',
+            'Middle Initial': '',
+            'Last Name': '',
+            'Addr Line1': addresses['Addr Line1'],
+            'City': addresses['City'],
+            'State': addresses['State'],
+            'Zip': addresses['Zip'],
+            'Zip4': addresses['Zip4'],
+            'Expenditure Type': raw['lineItemCompositeDescr'],
+            'Amount': raw['totalAmt'],
+            'Purpose': raw['purposeDescr'],
+            'Election Type': raw['amountTypeDescr'],
+            'Expenditure Paid Communications Platform': raw['expenditurePaidCommPlatform'],
+            'Expenditure Paid Communications Quantity': raw['expenditurePaidCommQuantity'],
+            'Expenditure Paid Communications Subject Matter': raw['expenditurePaidCommSubMatter']
+        }))
+
+    def _parse_c7e_rows(self, rows):
+        addresses, self.address_anomalies = address_rows([row.get('entityAddress') for row in rows])
+        return pd.DataFrame([{
+            'Date Paid': epoch_date(row.get('datePaid')),
+            'Entity Name': row.get('entityName'),
+            'First Name': '',
+            'Middle Initial': '',
+            'Last Name': '',
+            'Addr Line1': addressLn1,
+            'City': city,
+            'State': state,
+            'Zip': zip_code,
+            'Zip4': zip4,
+            'Expenditure Type': row.get('lineItemCompositeDescr'),
+            'Amount': row.get('totalAmt'),
+            'Purpose': row.get('purposeDescr'),
+            'Election Type': row.get('amountTypeDescr'),
+            'Expenditure Paid Communications Platform': row.get('expenditurePaidCommPlatform'),
+            'Expenditure Paid Communications Quantity': row.get('expenditurePaidCommQuantity'),
+            'Expenditure Paid Communications Subject Matter': row.get('expenditurePaidCommSubMatter')
+        } for row, (addressLn1, city, state, zip_code, zip4) in zip(rows, addresses)])
 
     def _clean_value(self, val):
-        if re.compile(r'\(*\)').search(val):
-            # check for negative numbers indicated by parenthesis
-            return -1 * float(val.replace('$', '').replace(',', '').replace(',', '').replace(')', '').replace('(', ''))
-        else:
-            return float(val.replace('$', '').replace(',', '').replace(',', ''))
+        # "$" and "," removed, negative numbers indicated by parenthesis
+        return money_value(val)
 
     def _calc_unitemized_contributions(self):
         totalSum = self.summary['Receipts']['total']
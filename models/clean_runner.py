@@ -0,0 +1,78 @@
+"""
+Runs cleaning jobs for many races/years in parallel
+
+Components
+- CleanJob - One (raw_directory, out_path, cleaner type) cleaning job
+- clean_all - Runs CleanJobs on a process pool and reports timing for each
+
+Cleaning is CPU-bound (JSON parsing, CSV writing) and every job writes to its own out_path,
+so jobs are independent and produce the same files as running them one after another.
+"""
+
+import os
+import time
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from models.cleaners import CandidateCleaner, CommitteeCleaner
+
+CLEANERS = {
+    'candidate': CandidateCleaner,
+    'committee': CommitteeCleaner,
+}
+
+CleanJob = namedtuple('CleanJob', ['raw_directory', 'out_path', 'cleaner'])
+
+
+def run_clean_job(job, streaming=False):
+    """Runs a single CleanJob, returns its timing record"""
+    raw_directory, out_path, cleaner = job
+    start = time.perf_counter()
+    CLEANERS[cleaner]().clean(out_path=out_path,
+                              raw_directory=raw_directory,
+                              streaming=streaming)
+    return {
+        'raw_directory': raw_directory,
+        'out_path': out_path,
+        'cleaner': cleaner,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def _run_clean_job(args):
+    return run_clean_job(*args)
+
+
+def _pool_context():
+    # Fork where available so worker processes don't re-run the calling update script on import
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def clean_all(jobs, workers=None, streaming=False):
+    """Runs CleanJobs (or (raw_directory, out_path, cleaner) tuples) on a process pool
+    - workers - number of processes. Defaults to CPU count; 1 runs sequentially in this process
+    - streaming - passed through to cleaner.clean()
+    Returns list of per-job timing records in job order
+    """
+    jobs = [CleanJob(*job) for job in jobs]
+    if len(jobs) == 0:
+        return []
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if workers <= 1 or len(jobs) == 1:
+        timings = [run_clean_job(job, streaming) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=_pool_context()) as executor:
+            timings = list(executor.map(
+                _run_clean_job, [(job, streaming) for job in jobs]))
+    elapsed = time.perf_counter() - start
+
+    for timing in timings:
+        print(f"Cleaned {timing['out_path']} ({timing['cleaner']}) in {timing['seconds']:.1f}s")
+    print(f'{len(jobs)} cleaning jobs done in {elapsed:.1f}s')
+    return timings
@@ -3,6 +3,8 @@ import json
 import glob
 import os
 
+from models.frames import FrameAccumulator
+
 CONTRIBUTION_TYPE = {
     1: 'Personal contributions',
     2: 'Unitemized contributions',
@@ -15,18 +17,86 @@ CONTRIBUTION_TYPE = {
     9: 'Individual contributions',
 }
 
+# Schedule codes are read as text ('9'), and read_json only turns them back into numbers when a
+# whole column is numeric - C-7 rows carry descriptions instead - so codes are matched as text
+CONTRIBUTION_TYPE_KEYS = {str(code): label for code, label in CONTRIBUTION_TYPE.items()}
+
+def contribution_types(values):
+    """'type' labels for Contribution Type codes, whether they're 9, 9.0 or '9'. Other values are kept as they are"""
+    keys = values.astype(str).str.replace(r'\.0$', '', regex=True)
+    labels = keys.map(CONTRIBUTION_TYPE_KEYS)
+    return labels.where(labels.notna(), values)
+
 def open_json(path):
     with open(path) as f:
         return json.load(f)
 
+RECORD_READ_SIZE = 64 * 1024  # characters
+
+def record_columns(path, readSize=RECORD_READ_SIZE):
+    """Returns column names of a records-oriented JSON export by decoding only its first record
+    Reads readSize characters at a time until that record is complete, not the whole file
+    """
+    decoder = json.JSONDecoder()
+    text = ''
+    start = -1
+    with open(path) as f:
+        while True:
+            chunk = f.read(readSize)
+            text += chunk
+            if start == -1:
+                start = text.find('{')
+            if start != -1:
+                try:
+                    first, _ = decoder.raw_decode(text, start)
+                    return list(first.keys())
+                except json.JSONDecodeError:
+                    # Record cut off mid-chunk - read more, unless the file's done
+                    if chunk == '':
+                        raise
+            elif chunk == '':
+                return []  # empty export
+
+def stream_clean(paths, out_file, name_column, mapTypes=False):
+    """Cleans itemized exports one file at a time, appending each to out_file
+    Peak memory is one raw file rather than the whole directory.
+    Column schema is resolved up front from the first record of each file (same column order as
+    concatenating everything), so every appended chunk lines up under a single header.
+    - name_column - 'Candidate' or 'Committee', whitespace-stripped
+    - mapTypes - add 'type' column from CONTRIBUTION_TYPE (see contribution_types)
+    """
+    columns = []
+    for file in paths:
+        columns += [c for c in record_columns(file) if c not in columns]
+    if len(columns) == 0:
+        pd.DataFrame().to_csv(out_file, index=False)
+        return
+    if mapTypes:
+        columns.append('type')
+
+    with open(out_file, 'w', newline='') as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+        for file in paths:
+            dfi = pd.read_json(file, orient='records')
+            if len(dfi) == 0:
+                continue
+            dfi[name_column] = dfi[name_column].str.strip()
+            if mapTypes:
+                dfi['type'] = contribution_types(dfi['Contribution Type'])
+            dfi.reindex(columns=columns).to_csv(f, index=False, header=False)
+
 class CommitteeCleaner:
     def __init__(self):
         return
         
     def clean(self,
                out_path=os.path.join('clean', 'committees'), 
-               raw_directory=os.path.join('raw', 'committees')
+               raw_directory=os.path.join('raw', 'committees'),
+               streaming=False,
             ):
+        """
+        - streaming - write CSVs one raw file at a time (see stream_clean) instead of loading the whole directory
+        """
         summary_paths = glob.glob(os.path.join(
             raw_directory, '*-summary.json'))
         contribution_paths = glob.glob(os.path.join(
@@ -40,29 +110,40 @@ class CommitteeCleaner:
             summary['committeeName'] = summary['committeeName'].strip()
             summaries.append(dict(summary))
 
-        contributions = pd.DataFrame()
+        if not os.path.exists(out_path):
+            os.makedirs(out_path)
+
+        if streaming:
+            stream_clean(contribution_paths, os.path.join(
+                out_path, 'contributions.csv'), 'Committee', mapTypes=True)
+            stream_clean(expenditure_paths, os.path.join(
+                out_path, 'expenditures.csv'), 'Committee')
+            self._write_summaries(summaries, out_path)
+            return
+
+        frames = FrameAccumulator()
         for file in contribution_paths:
-            dfi = pd.read_json(file, orient='records')
-            contributions = pd.concat([contributions, dfi])
+            frames.add(pd.read_json(file, orient='records'))
+        contributions = frames.result()
 
         contributions['Committee'] = contributions['Committee'].str.strip()
-        contributions['type'] = contributions['Contribution Type'].replace(
-            CONTRIBUTION_TYPE)
+        contributions['type'] = contribution_types(contributions['Contribution Type'])
 
-        expenditures = pd.DataFrame()
+        frames = FrameAccumulator()
         for file in expenditure_paths:
-            dfi = pd.read_json(file, orient='records')
-            expenditures = pd.concat([expenditures, dfi])
+            frames.add(pd.read_json(file, orient='records'))
+        expenditures = frames.result()
 
         expenditures['Committee'] = expenditures['Committee'].str.strip()
 
         # Write out
-        if not os.path.exists(out_path):
-            os.makedirs(out_path)
         contributions.to_csv(os.path.join(
             out_path, 'contributions.csv'), index=False)
         expenditures.to_csv(os.path.join(
             out_path, 'expenditures.csv'), index=False)
+        self._write_summaries(summaries, out_path)
+
+    def _write_summaries(self, summaries, out_path):
         with open(os.path.join(out_path, 'summary.json'), 'w') as f:
             f.write(json.dumps(summaries))
             print(f'Cleaned data written to {out_path}')
@@ -73,8 +154,12 @@ class CandidateCleaner:
         
     def clean(self,
                out_path=os.path.join('clean', 'committees'), 
-               raw_directory=os.path.join('raw', 'committees')
+               raw_directory=os.path.join('raw', 'committees'),
+               streaming=False,
             ):
+        """
+        - streaming - write CSVs one raw file at a time (see stream_clean) instead of loading the whole directory
+        """
         summary_paths = glob.glob(os.path.join(
             raw_directory, '*-summary.json'))
         contribution_paths = glob.glob(os.path.join(
@@ -88,31 +173,42 @@ class CandidateCleaner:
             summary['candidateName'] = summary['candidateName'].strip()
             summaries.append(dict(summary))
 
-        contributions = pd.DataFrame()
+        if not os.path.exists(out_path):
+            os.makedirs(out_path)
+
+        if streaming:
+            stream_clean(contribution_paths, os.path.join(
+                out_path, 'contributions.csv'), 'Candidate', mapTypes=True)
+            stream_clean(expenditure_paths, os.path.join(
+                out_path, 'expenditures.csv'), 'Candidate')
+            self._write_summaries(summaries, out_path)
+            return
+
+        frames = FrameAccumulator()
         for file in contribution_paths:
-            dfi = pd.read_json(file, orient='records')
-            contributions = pd.concat([contributions, dfi])
+            frames.add(pd.read_json(file, orient='records'))
+        contributions = frames.result()
 
         if len(contributions) > 0:
             contributions['Candidate'] = contributions['Candidate'].str.strip()
-            contributions['type'] = contributions['Contribution Type'].replace(
-                CONTRIBUTION_TYPE)
+            contributions['type'] = contribution_types(contributions['Contribution Type'])
 
-        expenditures = pd.DataFrame()
+        frames = FrameAccumulator()
         for file in expenditure_paths:
-            dfi = pd.read_json(file, orient='records')
-            expenditures = pd.concat([expenditures, dfi])
+            frames.add(pd.read_json(file, orient='records'))
+        expenditures = frames.result()
 
         if len(expenditures) > 0:
            expenditures['Candidate'] = expenditures['Candidate'].str.strip()
 
         # Write out
-        if not os.path.exists(out_path):
-            os.makedirs(out_path)
         contributions.to_csv(os.path.join(
             out_path, 'contributions.csv'), index=False)
         expenditures.to_csv(os.path.join(
             out_path, 'expenditures.csv'), index=False)
+        self._write_summaries(summaries, out_path)
+
+    def _write_summaries(self, summaries, out_path):
         with open(os.path.join(out_path, 'summary.json'), 'w') as f:
             f.write(json.dumps(summaries))
             print(f'Cleaned data written to {out_path}')
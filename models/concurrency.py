@@ -0,0 +1,172 @@
+"""
+Helpers for running slow CERS calls concurrently
+
+Components
+- run_concurrently - Bounded thread pool map that preserves input order
+- fetch_finance_reports - Builds Report objects for many candidates/committees in one shared pool
+- skip_unchanged / load_fetched_reports / try_build_report - The steps of fetch_finance_reports,
+  shared with the async builders in models/cers_async.py
+- prefetch_reports - Warms lazy Candidate/Committee objects (lazy=True) in one shared pool
+- load_summaries / try_build_summary - Summary-only steps for the async builders
+
+Fetching is I/O bound (waiting on CERS round-trips), so threads are enough here.
+Each Report still reads/writes its own cache file, so cache output matches the serial path.
+
+Reports that still fail after the request policy's retries (see models/request_policy.py) go on a
+retry queue instead of aborting the whole list. The queue gets one more pass at the end; entities
+with reports that fail again are left out of the run (their previous exports are kept).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from models.cers_client import get_client
+from models.manifest import has_changes
+
+DEFAULT_WORKERS = 8
+
+
+def run_concurrently(func, items, workers=1):
+    """Returns [func(item) for item in items], running up to `workers` calls at once
+    - Results come back in input order regardless of completion order
+    - workers=1 runs serially in the calling thread (original behavior)
+    - Exceptions raised by func propagate to the caller, as in the serial path
+    - items can be a generator; work on early items starts before later ones are produced
+    """
+    if workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def fetch_finance_reports(entities, workers=1, manifest=None):
+    """Fetches full finance reports for a list of Candidate or Committee objects
+    Reports for every entity are pulled through a single pool so total concurrency stays at `workers`,
+    then each entity compiles and exports its own totals once its reports are in.
+    - manifest - ReportManifest for incremental runs. Entities with no new, amended or removed reports
+      (and an existing cached export) are skipped entirely
+    """
+    entities = skip_unchanged(entities, manifest)
+    jobs = [(entity, raw) for entity in entities for raw in entity.raw_reports]
+    reports = run_concurrently(try_build_report, jobs, workers=workers)
+
+    retry_queue = [i for i, report in enumerate(reports) if report is None]
+    if len(retry_queue) > 0:
+        print(f'## Retrying {len(retry_queue)} failed finance reports')
+        get_client().policy.breaker.wait()
+        retried = run_concurrently(
+            try_build_report, [jobs[i] for i in retry_queue], workers=workers)
+        for i, report in zip(retry_queue, retried):
+            reports[i] = report
+
+    load_fetched_reports(entities, reports, manifest)
+
+
+def skip_unchanged(entities, manifest=None):
+    """Marks entities with nothing new since the last run as unchanged, returns the rest
+    Also logs what's about to be fetched
+    """
+    if manifest is not None:
+        unchanged = []
+        for entity in entities:
+            changes = manifest.diff(entity.slug, entity.raw_reports)
+            if not has_changes(changes) and entity.has_cached_export():
+                entity.load_unchanged()
+                unchanged.append(entity)
+        entities = [e for e in entities if e not in unchanged]
+
+    for entity in entities:
+        print(
+            f'## Fetching {len(entity.raw_reports)} finance reports for {entity.name} ({entity.id})')
+    return entities
+
+
+def load_fetched_reports(entities, reports, manifest=None):
+    """Hands each entity its slice of reports (flattened in entity, raw_reports order)
+    None marks a report that failed; entities with any failed reports are left out of the run
+    """
+    start = 0
+    for entity in entities:
+        end = start + len(entity.raw_reports)
+        entity_reports = reports[start:end]
+        start = end
+        failed = [raw for raw, report in zip(entity.raw_reports, entity_reports) if report is None]
+        if len(failed) > 0:
+            entity.load_failed(failed)
+            continue
+        entity.load_finance_reports(entity_reports)
+
+    if manifest is not None:
+        # Caller saves the manifest once the whole list is done
+        # Failed entities aren't recorded, so the next incremental run picks them up again
+        for entity in entities:
+            if len(entity.failed_reports) == 0:
+                manifest.record(entity.slug, entity.finance_reports)
+
+
+def try_build_report(job, source=None):
+    """Builds one Report for an (entity, raw report) job, returning None (after logging) if it fails"""
+    entity, raw = job
+    try:
+        return entity._build_report(raw, source=source)
+    except Exception as e:
+        print(f"!! Failed to fetch {raw['formTypeCode']} report {raw['reportId']} for {entity.name}: {e!r}")
+        return None
+
+
+def prefetch_reports(entities, workers=1, summaryOnly=False):
+    """Loads report lists, then reports, for lazy Candidate or Committee objects in one pool of `workers`
+    - summaryOnly - load just each report's summary where possible (see Report.load_summary)
+    Reports that fail get the same second pass as fetch_finance_reports; entities with reports that
+    fail again list them in failed_reports (reading those reports later tries again and raises)
+    """
+    run_concurrently(lambda entity: entity.raw_reports, entities, workers=workers)
+    reports = [report for entity in entities for report in entity.finance_reports]
+    loaded = run_concurrently(lambda report: try_load_report(report, summaryOnly), reports, workers=workers)
+
+    retry_queue = [report for report, ok in zip(reports, loaded) if not ok]
+    if len(retry_queue) > 0:
+        print(f'## Retrying {len(retry_queue)} failed finance reports')
+        get_client().policy.breaker.wait()
+        retried = run_concurrently(lambda report: try_load_report(report, summaryOnly), retry_queue, workers=workers)
+        failed = set(report for report, ok in zip(retry_queue, retried) if not ok)
+        for entity in entities:
+            entity.failed_reports = [report.data for report in entity.finance_reports if report in failed]
+
+
+def load_summaries(entities, reports):
+    """Hands each lazy entity its slice of summary-loaded reports (flattened in entity, raw_reports order)
+    None marks a report that failed, listed in the entity's failed_reports
+    """
+    start = 0
+    for entity in entities:
+        end = start + len(entity.raw_reports)
+        entity_reports = reports[start:end]
+        start = end
+        entity.failed_reports = [raw for raw, report in zip(entity.raw_reports, entity_reports) if report is None]
+        if len(entity.failed_reports) == 0:
+            entity.finance_reports = entity_reports
+
+
+def try_load_report(report, summaryOnly=False):
+    """Loads one lazy Report, returning False (after logging) if it fails"""
+    try:
+        if summaryOnly:
+            report.load_summary()
+        else:
+            report.load()
+        return True
+    except Exception as e:
+        print(f"!! Failed to fetch {report.type} report {report.id}: {e!r}")
+        return False
+
+
+def try_build_summary(job, source=None):
+    """try_build_report() for a lazy Report with just its summary loaded"""
+    entity, raw = job
+    try:
+        report = entity._build_report(raw, source=source, lazy=True)
+        report.load_summary()
+        return report
+    except Exception as e:
+        print(f"!! Failed to fetch {raw['formTypeCode']} report {raw['reportId']} for {entity.name}: {e!r}")
+        return None
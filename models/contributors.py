@@ -0,0 +1,210 @@
+"""
+Contributor entity resolution across races and cycles
+
+Components
+- normalize_names - Upper-cased name tokens in first-last order, without punctuation, initials or honorifics
+- zip5 - First five digits of ZIP codes, as text
+- ContributorIndex - Persistent table of (name, ZIP) keys to contributor IDs, linking spelling variants
+- DEFAULT_INDEX_PATH - Where the ID table is kept
+
+Matching two names means comparing them, so doing it across every pair of contributors is O(n^2).
+Instead, keys are blocked by ZIP and name token: only keys that share a ZIP and at least one exact
+name token are compared, and blocks larger than MAX_BLOCK (very common tokens) are skipped. A pair
+links if the names have the same number of tokens, the same first token (given name) and every other
+token has a close counterpart in the same position - same first letter and a difflib ratio of at least
+TOKEN_SIMILARITY - so 'JOHN SMYTH' joins 'JOHN SMITH'. Given names aren't matched loosely, since
+'FRANCIS'/'FRANCES' or 'ERIC'/'ERICA' at one ZIP are usually two people in one household, and
+generational suffixes (JR, SR, II, ...) have to match exactly, so a parent and child stay apart.
+
+IDs are stable: keys already in the table keep their IDs, and each run only blocks and compares
+the keys it hasn't seen before, so resolving a new cycle doesn't redo earlier ones.
+"""
+
+import os
+import re
+import difflib
+from functools import lru_cache
+
+import pandas as pd
+
+DEFAULT_INDEX_PATH = 'cleaned/contributor-ids.csv'
+
+INDEX_COLUMNS = ['Name Key', 'Zip', 'Contributor ID']
+
+# Dropped from names
+HONORIFICS = {'MR', 'MRS', 'MS', 'DR'}
+
+# Kept, at the end of the name - they tell a parent from a child at the same address
+GENERATIONS = {'JR', 'SR', 'II', 'III', 'IV'}
+
+# 'Smith, John' is read as 'John Smith', but not 'Acme, Inc.'
+ORGANIZATION_WORDS = {'INC', 'LLC', 'LLP', 'LTD', 'CO', 'CORP', 'PAC', 'PC', 'PLLC'}
+
+# Abbreviations spelled out, so 'MONTANA EDUCATION ASSN' matches 'MONTANA EDUCATION ASSOCIATION'
+ABBREVIATIONS = {
+    'ASSN': 'ASSOCIATION',
+    'ASSOC': 'ASSOCIATION',
+    'CORP': 'CORPORATION',
+    'CO': 'COMPANY',
+    'DEPT': 'DEPARTMENT',
+    'INTL': 'INTERNATIONAL',
+    'MT': 'MONTANA',
+}
+
+TOKEN_SIMILARITY = 0.8
+
+# Blocks (ZIP, token) with more keys than this are too common to say anything - e.g. 'LLC', or
+# 'SMITH' in a big ZIP. Keys still meet in the blocks of their other tokens
+MAX_BLOCK = 200
+
+
+def _tokens(text):
+    return re.sub(r'[^A-Z0-9]+', ' ', text.replace("'", '')).split()
+
+
+def _clean_name(name):
+    head, comma, tail = name.partition(',')
+    tokens = _tokens(head)
+    if comma != '':
+        rest = _tokens(tail)
+        # A single word before the comma is a surname: 'SMITH, JOHN Q JR' -> 'JOHN Q JR SMITH'
+        if len(tokens) == 1 and ORGANIZATION_WORDS.isdisjoint(rest):
+            tokens = rest + tokens
+        else:
+            tokens = tokens + rest
+    tokens = [ABBREVIATIONS.get(t, t) for t in tokens if len(t) > 1 and t not in HONORIFICS]
+    return ' '.join([t for t in tokens if t not in GENERATIONS] + [t for t in tokens if t in GENERATIONS])
+
+
+def normalize_names(values):
+    """'Smith, John Q. Jr.' -> 'JOHN SMITH JR' - upper case, first-last order, punctuation dropped, initials
+    and honorifics removed, abbreviations spelled out, generational suffixes last. Missing names give ''
+    """
+    text = pd.Series(values, dtype=object).fillna('').astype(str).str.upper()
+    # Many rows share a name - clean each distinct one once
+    codes, uniques = pd.factorize(text)
+    cleaned = pd.Series([_clean_name(name) for name in uniques], dtype=object)
+    return pd.Series(cleaned.to_numpy()[codes] if len(uniques) > 0 else [], index=text.index, dtype=object)
+
+
+def zip5(values):
+    """First five digits of ZIP codes as text ('59601-1234' and 59601.0 -> '59601'). '' if missing"""
+    text = pd.Series(values, dtype=object).fillna('').astype(str).str.strip()
+    digits = text.str.extract(r'^(\d{1,5})(?:\.0+)?(?:\D|$)', expand=False).fillna('')
+    # Numeric columns lose leading zeros
+    return digits.where(digits == '', digits.str.zfill(5))
+
+
+@lru_cache(maxsize=200000)
+def _token_similarity(a, b):
+    # Typos rarely hit the first letter, while different names often share the rest
+    if a[0] != b[0] or a in GENERATIONS or b in GENERATIONS:
+        return 1 if a == b else 0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def names_match(a, b):
+    """True if two normalized names have the same number of tokens, the same first token, and each later token
+    is close to the one in the same position (same first letter, difflib ratio of at least TOKEN_SIMILARITY;
+    generational suffixes exactly)
+    """
+    if a == b:
+        return True
+    tokens_a, tokens_b = a.split(), b.split()
+    if len(tokens_a) != len(tokens_b) or len(tokens_a) == 0 or tokens_a[0] != tokens_b[0]:
+        return False
+    return all(_token_similarity(t, u) >= TOKEN_SIMILARITY for t, u in zip(tokens_a[1:], tokens_b[1:]))
+
+
+class _Components:
+    """Union-find over key positions"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+class ContributorIndex:
+    """Contributor IDs for (normalized name, ZIP) keys, kept in a CSV table between runs
+    - path - ID table. Starts empty if it doesn't exist
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        if os.path.isfile(path):
+            self.table = pd.read_csv(path, dtype={'Name Key': str, 'Zip': str}, keep_default_na=False)
+        else:
+            self.table = pd.DataFrame(columns=INDEX_COLUMNS)
+        self.table['Contributor ID'] = self.table['Contributor ID'].astype('int64')
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        self.table.to_csv(self.path, index=False)
+
+    def _link_new(self, keys):
+        """Assigns IDs to keys not in the table yet, linking them to known or other new keys they match"""
+        known = self.table[['Name Key', 'Zip']]
+        nodes = pd.concat([known, keys], ignore_index=True)
+        first_new = len(known)
+
+        # Blocks: one row per (key, name token), grouped by (ZIP, token)
+        tokens = nodes.assign(Token=nodes['Name Key'].str.split()).explode('Token').dropna(subset=['Token'])
+        tokens = tokens.reset_index().rename(columns={'index': 'Node'})[['Node', 'Zip', 'Token']]
+        sizes = tokens.groupby(['Zip', 'Token'])['Node'].transform('size')
+        tokens = tokens[sizes <= MAX_BLOCK]
+
+        # Only pairs involving a new key - known keys were compared when they were new
+        pairs = tokens[tokens['Node'] >= first_new].merge(tokens, on=['Zip', 'Token'])
+        pairs = pairs[pairs['Node_x'] != pairs['Node_y']]
+        pairs = set(zip(pairs[['Node_x', 'Node_y']].min(axis=1), pairs[['Node_x', 'Node_y']].max(axis=1)))
+
+        names = nodes['Name Key'].tolist()
+        components = _Components(len(nodes))
+        for i, j in pairs:
+            if names_match(names[i], names[j]):
+                components.union(i, j)
+
+        # Each new key takes the smallest known ID in its component, or a fresh one shared by the component
+        known_ids = self.table['Contributor ID'].tolist()
+        component_ids = {}
+        for i in range(first_new):
+            root = components.find(i)
+            component_ids[root] = min(component_ids.get(root, known_ids[i]), known_ids[i])
+        next_id = max(known_ids, default=0) + 1
+        new_ids = []
+        for i in range(first_new, len(nodes)):
+            root = components.find(i)
+            if root not in component_ids:
+                component_ids[root] = next_id
+                next_id += 1
+            new_ids.append(component_ids[root])
+        return keys.assign(**{'Contributor ID': new_ids})
+
+    def resolve(self, names, zips):
+        """Contributor IDs for raw contributor names and ZIPs (aligned Series), adding unseen keys to the table
+        Blank names get no ID (pd.NA)
+        """
+        keys = pd.DataFrame({'Name Key': normalize_names(names).to_numpy(), 'Zip': zip5(zips).to_numpy()},
+                            index=pd.Series(names).index)
+        unique = keys[keys['Name Key'] != ''].drop_duplicates()
+        new = unique.merge(self.table[['Name Key', 'Zip']], how='left', indicator=True)
+        new = new[new['_merge'] == 'left_only'][['Name Key', 'Zip']].reset_index(drop=True)
+        if len(new) > 0:
+            linked = self._link_new(new)
+            print(f'Contributor index: {len(new)} new name/ZIP keys, '
+                  f'{linked["Contributor ID"].isin(self.table["Contributor ID"]).sum()} linked to known contributors')
+            self.table = pd.concat([self.table, linked], ignore_index=True)
+        ids = keys.merge(self.table, how='left', on=['Name Key', 'Zip'])['Contributor ID']
+        return pd.Series(ids.to_numpy(), index=keys.index).astype('Int64')
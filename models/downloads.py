@@ -0,0 +1,80 @@
+"""
+Streaming download and chunked parsing for CERS schedule files
+
+Components
+- download_file - Streams a response to disk, resuming interrupted downloads
+- read_schedule - Parses a pipe-delimited schedule file in chunks with a fixed dtype map
+
+Big schedules (e.g. C5 Schedule A for statewide races) can run to hundreds of MB. Streaming them to
+disk and parsing in chunks keeps only one chunk of text in memory at a time, instead of the full
+response body, its decoded text and a StringIO copy.
+"""
+
+import os
+import csv
+
+import pandas as pd
+import requests
+
+from models.frames import FrameAccumulator
+from models.normalize import parse_money
+from models.schema import apply_schema, MONEY_COLUMNS
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes - anything short of a full chunk is lost if the connection drops
+PARSE_CHUNK_SIZE = 50000  # rows
+
+# Numeric columns in CERS schedule downloads. Everything else is read as text, so each chunk gets
+# the same dtypes (and zip codes, IDs etc. keep leading zeros), then typed by models/schema.py
+SCHEDULE_DTYPES = {col: 'float64' for col in MONEY_COLUMNS}
+
+# Connection drops mid-body come through as ChunkedEncodingError (or ConnectionError/Timeout)
+INTERRUPTED = (requests.ConnectionError, requests.Timeout,
+               requests.exceptions.ChunkedEncodingError)
+
+
+def download_file(session, url, path, params=None, retries=3, chunkSize=DOWNLOAD_CHUNK_SIZE):
+    """Streams GET url to path, returns path
+    - Writes to path + '.part' and renames once complete
+    - If the connection drops, resumes from the bytes already on disk with a Range request
+      (starting over only if the server ignores Range), up to `retries` times
+    """
+    part = path + '.part'
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+        try:
+            with session.get(url, params=params, headers=headers, stream=True) as r:
+                if offset > 0 and r.status_code == 416:
+                    # Nothing left to fetch
+                    break
+                r.raise_for_status()
+                if r.status_code != 206:
+                    offset = 0
+                with open(part, 'ab' if offset > 0 else 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=chunkSize):
+                        f.write(chunk)
+            break
+        except INTERRUPTED as e:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            print(f'--- Download interrupted after {os.path.getsize(part) if os.path.exists(part) else 0} bytes ({e!r}), resuming ({attempt}/{retries})')
+    os.replace(part, path)
+    return path
+
+
+def read_schedule(path, chunkSize=PARSE_CHUNK_SIZE):
+    """Parses a pipe-delimited CERS schedule file into a DataFrame, chunkSize rows at a time"""
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    frames = FrameAccumulator()
+    reader = pd.read_csv(path, sep='|', on_bad_lines='warn', index_col=False, quoting=csv.QUOTE_NONE,
+                         dtype=str, encoding_errors='replace', chunksize=chunkSize)
+    for chunk in reader:
+        for col, dtype in SCHEDULE_DTYPES.items():
+            if col in chunk.columns:
+                # Also takes '$1,234.00' / '($5.00)' formatted amounts
+                chunk[col] = parse_money(chunk[col]).astype(dtype)
+        frames.add(chunk)
+    return apply_schema(frames.result())
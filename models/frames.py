@@ -0,0 +1,55 @@
+"""
+DataFrame assembly helpers
+
+Components
+- FrameAccumulator - Collects DataFrame parts and concatenates them once
+
+Growing a frame with df = pd.concat([df, dfi]) inside a loop copies everything collected so far
+on every pass, which is quadratic in the number of reports. Collecting the parts and
+concatenating once is linear. See benchmarks/frame-assembly.py
+
+Categorical columns (see models/schema.py) stay categorical across parts with different categories.
+"""
+
+import pandas as pd
+
+
+def _unify_categories(parts):
+    """Gives columns that are categorical in every part the same categories, so concat keeps them categorical
+    (it falls back to object columns when categories differ)
+    """
+    categorical = None
+    for df in parts:
+        columns = {col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)}
+        categorical = columns if categorical is None else categorical & columns
+    if not categorical or len(parts) < 2:
+        return parts
+    categories = {col: parts[0][col].cat.categories.append([df[col].cat.categories for df in parts[1:]]).unique()
+                  for col in categorical}
+    return [df.assign(**{col: df[col].cat.set_categories(categories[col]) for col in categorical}) for df in parts]
+
+
+class FrameAccumulator:
+    """Collects DataFrame parts for a single concat
+    - columns - optional fixed column schema. Parts are reindexed to it (missing columns filled with NaN)
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.parts = []
+
+    def add(self, df):
+        self.parts.append(df)
+
+    def __len__(self):
+        return sum(len(df) for df in self.parts)
+
+    def result(self):
+        """Returns all parts as one DataFrame; empty DataFrame if nothing was added"""
+        if len(self.parts) == 0:
+            return pd.DataFrame(columns=self.columns)
+        # Schema is resolved once across all parts by the single concat
+        df = pd.concat(_unify_categories(self.parts))
+        if self.columns is not None:
+            df = df.reindex(columns=self.columns)
+        return df
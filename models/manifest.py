@@ -0,0 +1,91 @@
+"""
+Report manifest for incremental updates
+
+Components
+- ReportManifest - Compact record of reportId -> (amendedDate, form type, content hash) for a cache folder
+- get_manifest - Shared ReportManifest per cache folder
+
+Lets incremental runs decide which candidates/committees have new, amended or removed reports
+from the report lists alone, without opening every Report cache file.
+"""
+
+import os
+import json
+import threading
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+class ReportManifest:
+    """Manifest stored at {cachePath}/manifest.json
+    Entries are keyed by str(reportId): {'entity', 'amendedDate', 'formTypeCode', 'hash'}
+    """
+
+    def __init__(self, cachePath):
+        self.path = os.path.join(cachePath, MANIFEST_FILENAME)
+        self.reports = {}
+        self._lock = threading.Lock()
+        if os.path.isfile(self.path):
+            with open(self.path) as f:
+                self.reports = json.load(f)['reports']
+
+    def diff(self, entity, raw_reports):
+        """Compares freshly listed reports for an entity (candidate/committee slug) against the manifest
+        Returns dict of report id lists: new, amended, unchanged, removed
+        """
+        changes = {'new': [], 'amended': [], 'unchanged': [], 'removed': []}
+        listed = set()
+        with self._lock:
+            for r in raw_reports:
+                key = str(r['reportId'])
+                listed.add(key)
+                entry = self.reports.get(key)
+                if entry is None:
+                    changes['new'].append(r['reportId'])
+                elif entry['amendedDate'] != r['amendedDate']:
+                    changes['amended'].append(r['reportId'])
+                else:
+                    changes['unchanged'].append(r['reportId'])
+            changes['removed'] = [
+                int(key) for key, entry in self.reports.items()
+                if entry['entity'] == entity and key not in listed]
+        return changes
+
+    def record(self, entity, reports):
+        """Replaces manifest entries for an entity with its freshly built Report objects"""
+        with self._lock:
+            self.reports = {key: entry for key, entry in self.reports.items()
+                            if entry['entity'] != entity}
+            for report in reports:
+                self.reports[str(report.id)] = {
+                    'entity': entity,
+                    'amendedDate': report.data['amendedDate'],
+                    'formTypeCode': report.type,
+                    'hash': getattr(report, 'content_hash', None),
+                }
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Write-then-rename so an interrupted run can't leave a half-written manifest
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'reports': self.reports}, f)
+            os.replace(tmp_path, self.path)
+
+
+def has_changes(changes):
+    return len(changes['new']) + len(changes['amended']) + len(changes['removed']) > 0
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(cachePath):
+    """Returns the shared ReportManifest for a cache folder, loading it on first use"""
+    key = os.path.normpath(cachePath)
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = ReportManifest(cachePath)
+        return _manifests[key]
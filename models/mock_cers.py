@@ -0,0 +1,337 @@
+"""
+Local stand-in for the CERS site, for offline runs and benchmarks
+
+Components
+- MockCers - Threaded HTTP server for the CERS endpoints the models use, with configurable latency
+  and failure injection
+- SyntheticFixtures - Generated candidates, committees and reports (default)
+- RecordedFixtures - Responses recorded in a RawStore (see models/raw_store.py)
+
+Point the models at a running server with CersClient(baseUrl=server.url) (see models/cers_client.py).
+Like CERS, the server keeps search and report state per JSESSIONID cookie: paged list requests
+return rows for the session's last search or report list, and financeRepDetailList answers for the
+report the session last opened.
+
+Fixtures answer requests shaped like raw store keys - {'url': CERS url, 'data': form/query} plus
+'report' (the open report's retrieveReport form) for detail lists - with a body, None for CERS having
+nothing to serve (no schedule file), or KeyError for unknown requests (served as 404).
+"""
+
+import json
+import time
+import uuid
+import random
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models.cers_client import CERS_URL
+from models.raw_store import fingerprint
+from models.request_policy import endpoint_name
+
+# Posts that set up a paged list, and the list endpoints that page through it
+LIST_SETUPS = ['searchCandidates', 'searchFinancials', 'retrieveCampaignReports', 'retrieveCommitteeReports']
+LIST_PAGES = ['listCandidateResults', 'listFinancialCommitteeResults', 'listFinanceReports']
+
+SCHEDULE_HEADER = ['Date Paid', 'Entity Name', 'First Name', 'Middle Initial', 'Last Name', 'Addr Line1', 'City',
+                   'State', 'Zip', 'Zip4', 'Country', 'Occupation', 'Employer', 'Contribution Type', 'Amount',
+                   'Amount Type', 'Purpose', 'Election Type', 'Total Primary', 'Total General']
+CITIES = [('Helena', '59601'), ('Butte', '59701'), ('Great Falls', '59401'), ('Missoula', '59801'), ('Billings', '59101')]
+
+
+class SyntheticFixtures:
+    """Generated CERS data, the same every time for a given seed
+    - candidates, committees - rows returned by every candidate/committee search
+    - reports - reports per candidate/committee. Candidates file C5, C7 and C7E, committees C4 and C6
+    - rows - itemized rows per schedule file and per C7/C7E detail list
+    """
+
+    CANDIDATE_FORMS = ['C5', 'C7', 'C7E', 'C5']
+    COMMITTEE_FORMS = ['C4', 'C6', 'C4']
+    CANDIDATE_IDS = 10000
+    COMMITTEE_IDS = 50000
+
+    def __init__(self, candidates=20, committees=10, reports=4, rows=50, seed=0):
+        self.candidates = candidates
+        self.committees = committees
+        self.reports = reports
+        self.rows = rows
+        self.seed = seed
+
+    def respond(self, request):
+        endpoint = endpoint_name(request['url'])
+        data = request['data']
+        if endpoint == 'searchCandidates':
+            return json.dumps([self._candidate(self.CANDIDATE_IDS + i, data.get('electionYear') or '2024')
+                               for i in range(self.candidates)])
+        if endpoint == 'searchFinancials':
+            return json.dumps([self._committee(self.COMMITTEE_IDS + i, data.get('electionYear') or '2024')
+                               for i in range(self.committees)])
+        if endpoint in ['retrieveCampaignReports', 'retrieveCommitteeReports']:
+            return json.dumps(self._report_list(data))
+        if endpoint == 'retrieveReport':
+            return self._summary(int(data['reportId']))
+        if endpoint == 'financeRepDetailList':
+            return json.dumps(self._detail_list(int(request['report']['reportId']), data['listName']))
+        if endpoint == 'downloadFile':
+            return self._schedule(int(data['reportId']), data['scheduleCode'])
+        raise KeyError(endpoint)
+
+    def _rng(self, *key):
+        return random.Random(f'{self.seed}-{key}')
+
+    def _candidate(self, id, year):
+        i = id - self.CANDIDATE_IDS
+        chamber = 'House' if i % 2 == 0 else 'Senate'
+        return {
+            'candidateId': id, 'candidateName': f'Candidate{i}, Test', 'personDTO': {'lastName': f'Candidate{i}'},
+            'partyDescr': ['Democrat', 'Republican', 'Libertarian'][i % 3], 'electionYear': year,
+            'resCountyDescr': 'Lewis And Clark', 'officeTitle': f'{chamber} District {i + 1}',
+            'candidateStatusDescr': 'Active', 'candidateAddress': '1 Main St, Helena, MT 59601',
+            'candidateTypeDescr': 'State District', 'c3FiledInd': 'Y',
+        }
+
+    def _committee(self, id, year):
+        i = id - self.COMMITTEE_IDS
+        return {
+            'committeeId': id, 'committeeName': f'Committee {i} For Montana', 'committeeAddress': '1 Main St, Helena, MT 59601',
+            'electionYear': year, 'committeeStatusDescr': 'Active', 'createdDate': 1672560000000,
+            'committeeTypeDescr': 'Political Action Committee',
+        }
+
+    def _report_list(self, data):
+        if 'candidateId' in data:
+            id = int(data['candidateId'])
+            forms = self.CANDIDATE_FORMS
+            owner = {'candidateDTO': {'candidateId': id, 'candidateName': f'Candidate{id - self.CANDIDATE_IDS}, Test',
+                                      'officeTitle': self._candidate(id, '2024')['officeTitle'], 'electionYear': '2024'}}
+        else:
+            id = int(data['committeeId'])
+            forms = self.COMMITTEE_FORMS
+            owner = {'committeeDTO': {'committeeId': id, 'committeeName': f'Committee {id - self.COMMITTEE_IDS} For Montana'}}
+        reports = []
+        for k in range(self.reports):
+            form = forms[k % len(forms)]
+            month = k % 12 + 1
+            reports.append({
+                'reportId': id * 100 + k, 'fromDateStr': f'{month:02}/01/2024', 'toDateStr': f'{month:02}/28/2024',
+                'formTypeCode': form, 'formTypeDescr': f'{form} report', 'statusDescr': 'Filed',
+                'filingTypeDescr': 'Original', 'amendedDate': 1704067200000 + id * 1000 + k, **owner,
+            })
+        return reports
+
+    def _summary(self, reportId):
+        rng = self._rng('summary', reportId)
+        cells = {label: (rng.randint(0, 50000) * 1.0, rng.randint(0, 5000) * 1.0)
+                 for label in ['Balance from previous report', 'Receipts', 'Expenditures', 'Ending Balance']}
+        rows = ''.join(f'<tr><td>{label}</td><td></td><td>${pri:,.2f}</td><td>${gen:,.2f}</td></tr>'
+                       for label, (pri, gen) in cells.items())
+        return f'<html><body><div id="summaryAccordionId"><table>{rows}</table></div></body></html>'
+
+    def _address(self, rng):
+        city, zip_code = rng.choice(CITIES)
+        return f'{rng.randint(1, 3000)} {rng.choice(["Main St", "Last Chance Gulch", "Prospect Ave"])}', city, zip_code
+
+    def _detail_list(self, reportId, listName):
+        if listName not in ['individual', 'committee', 'expendOther']:
+            return []
+        rng = self._rng('details', reportId, listName)
+        rows = []
+        for i in range(self.rows):
+            street, city, zip_code = self._address(rng)
+            cash = rng.choice([0, 25.0, 100.0, 250.0])
+            rows.append({
+                'entityAddress': f'{street}, {city}, MT {zip_code}', 'datePaid': 1704067200000 + rng.randint(0, 300) * 86400000,
+                'cashAmt': cash, 'inKindAmt': 0 if cash else 50.0, 'totalAmt': cash or 50.0,
+                'entityName': f'Contributor {rng.randint(0, 5 * self.rows)}', 'occupationDescr': 'Retired',
+                'employerDescr': None, 'lineItemCompositeDescr': 'Individual', 'purposeDescr': None,
+                'amountTypeDescr': rng.choice(['Primary', 'General']), 'totalToDatePrimary': cash,
+                'totalToDateGeneral': 0, 'refundOrigTransDate': None, 'refundOrigTransTotalVal': None,
+                'refundOrigTransDesc': None, 'previousTransactionInd': rng.choice(['Y', 'N']),
+                'fundraiserName': None, 'fundraiserLocation': None, 'fundraiserAttendees': None,
+                'fundraiserTicketsSold': None, 'expenditurePaidCommPlatform': None,
+                'expenditurePaidCommQuantity': None, 'expenditurePaidCommSubMatter': None,
+            })
+        return rows
+
+    def _schedule(self, reportId, code):
+        rng = self._rng('schedule', reportId, code)
+        lines = ['|'.join(SCHEDULE_HEADER)]
+        for i in range(self.rows):
+            street, city, zip_code = self._address(rng)
+            amount = rng.choice([10, 25, 100, 250, 1000])
+            lines.append('|'.join([
+                f'{rng.randint(1, 12):02}/{rng.randint(1, 28):02}/2024', '', f'First{i}', '', f'Last{rng.randint(0, 5 * self.rows)}',
+                street, city, 'MT', zip_code, '', '', 'Retired', '', 'Individual', f'{amount:.2f}',
+                rng.choice(['CA', 'CA', 'IK']), '', rng.choice(['PM', 'GN']), f'{amount:.2f}', '0.00',
+            ]))
+        return '\n'.join(lines) + '\n'
+
+
+class RecordedFixtures:
+    """Responses recorded in a RawStore - the latest recording of each request is served
+    Loads the store's refs up front; bodies are read as requested
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.index = {fingerprint(ref['request']): ref['sha'] for ref in store.refs()}
+
+    def respond(self, request):
+        # Search and report list posts were recorded as the rows their paged lists returned
+        return self.store.body(self.index[fingerprint(request)])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.mock._handle(self, {})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        # Blank fields are part of the request too (e.g. search forms)
+        self.server.mock._handle(self, dict(urllib.parse.parse_qsl(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)))
+
+
+class MockCers:
+    """Local CERS stand-in
+    - fixtures - SyntheticFixtures (default), RecordedFixtures or anything with respond(request)
+    - latency - seconds added to every response, plus up to `jitter` more at random
+    - failureRate - fraction of requests answered with failureStatus (default 503) instead
+    - port - 0 (default) picks a free port
+
+    with MockCers(latency=0.05) as server:
+        set_client(CersClient(baseUrl=server.url))
+    """
+
+    def __init__(self, fixtures=None, latency=0, jitter=0, failureRate=0, failureStatus=503, seed=0, port=0):
+        self.fixtures = fixtures or SyntheticFixtures()
+        self.latency = latency
+        self.jitter = jitter
+        self.failureRate = failureRate
+        self.failureStatus = failureStatus
+        self.port = port
+        self._random = random.Random(seed)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self.reset_stats()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.failures = {}
+            self.bytes_sent = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': sum(self.requests.values()),
+                'failures': sum(self.failures.values()),
+                'bytes': self.bytes_sent,
+                'by_endpoint': dict(self.requests),
+            }
+
+    # Requests
+
+    def _handle(self, handler, form):
+        url = urllib.parse.urlparse(handler.path)
+        endpoint = endpoint_name(url.path)
+        cookie = handler.headers.get('Cookie', '')
+        sid = next((part.strip()[len('JSESSIONID='):] for part in cookie.split(';')
+                    if part.strip().startswith('JSESSIONID=')), None)
+        newSession = sid is None
+        if newSession:
+            sid = uuid.uuid4().hex
+
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failureRate
+            if fail:
+                self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+            session = self._sessions.setdefault(sid, {})
+        time.sleep(delay)
+        if fail:
+            return self._reply(handler, self.failureStatus, '', sid, newSession)
+
+        try:
+            body, contentType = self._respond(session, CERS_URL + url.path, endpoint,
+                                              form, dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True)))
+        except KeyError as e:
+            # Clients don't check every status (e.g. search posts), so say so here
+            print(f'!! MockCers: no fixture for {endpoint} {form or url.query}')
+            return self._reply(handler, 404, f'No fixture for {endpoint} ({e})', sid, newSession)
+        except ValueError as e:
+            return self._reply(handler, 400, str(e), sid, newSession)
+        self._reply(handler, 200, body, sid, newSession, contentType)
+
+    def _respond(self, session, url, endpoint, form, query):
+        """(body, content type) for a request, updating the session's state"""
+        if endpoint in LIST_SETUPS:
+            session['rows'] = json.loads(self.fixtures.respond({'url': url, 'data': form}))
+            return '{}', 'application/json'
+        if endpoint in LIST_PAGES:
+            rows = session.get('rows', [])
+            start, length = int(query.get('iDisplayStart', 0)), int(query.get('iDisplayLength', len(rows)))
+            return json.dumps({'sEcho': query.get('sEcho'), 'iTotalRecords': len(rows), 'iTotalDisplayRecords': len(rows),
+                               'aaData': rows[start:start + length]}), 'application/json'
+        if endpoint == 'retrieveReport':
+            session['report'] = form
+            return self.fixtures.respond({'url': url, 'data': form}), 'text/html'
+        if endpoint == 'financeRepDetailList':
+            if 'report' not in session:
+                raise ValueError('No report open in this session')
+            return self.fixtures.respond({'url': url, 'data': form, 'report': session['report']}), 'application/json'
+        if endpoint == 'prepareDownloadFileFromSearch':
+            # The reply is passed back as downloadFile's query string
+            body = self.fixtures.respond({'url': url.replace(endpoint, 'downloadFile'), 'data': form})
+            if body is None:
+                return '{}', 'application/json'
+            return json.dumps({**form, 'fileName': f"{form['reportId']}-{form['scheduleCode']}.txt"}), 'application/json'
+        if endpoint == 'downloadFile':
+            data = {k: v for k, v in query.items() if k != 'fileName'}
+            body = self.fixtures.respond({'url': url, 'data': data})
+            if body is None:
+                raise KeyError('no file')
+            return body, 'text/plain'
+        raise KeyError(endpoint)
+
+    def _reply(self, handler, status, body, sid, newSession, contentType='text/plain'):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        handler.send_response(status)
+        if newSession:
+            handler.send_header('Set-Cookie', f'JSESSIONID={sid}; Path=/')
+        handler.send_header('Content-Type', contentType)
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+        with self._lock:
+            self.bytes_sent += len(data)
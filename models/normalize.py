@@ -0,0 +1,129 @@
+"""
+Column-at-a-time normalization of CERS values
+
+Components
+- parse_money - Currency strings ('$1,234.00', '($10.00)' for negatives) or numbers to float64
+- money_value - parse_money for a single value (report summary cells)
+- parse_epoch_dates - Epoch-millisecond timestamps to local date strings
+- epoch_date - parse_epoch_dates for a single value
+- parse_text_dates - 'mm/dd/yyyy' or 'mm/dd/yy' date strings to datetime64
+- parse_flags - Y/N indicator columns to 'Y'/'N'
+- flag_value - parse_flags for a single value
+
+The parse_ functions take whole columns (pandas Series or lists) and use pandas/NumPy vector operations
+instead of converting cell by cell, with the same results as the per-cell code they replace in
+models/cers_report.py. The single-value ones are for tables small enough that setting up columns
+costs more than converting cell by cell.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_string_dtype
+from dateutil import tz
+
+MONEY_CHARS = re.compile(r'[$,()\s]')
+# Values in parentheses are negative - any closing parenthesis counts, as in the original Report._clean_value
+NEGATIVE = ')'
+
+# C7/C7E dates, as shown on CERS
+DATE_FORMAT = '%m/%d/%y'
+
+# C5/C6 schedules have four-digit years, C7/C7E detail lists two
+TEXT_DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y']
+
+# Zone-file timezone where possible - pandas converts these in bulk, but tzlocal() one value at a time
+LOCAL_TZ = tz.gettz()
+
+FLAG_VALUES = {
+    'Y': 'Y', 'YES': 'Y', 'TRUE': 'Y', '1': 'Y',
+    'N': 'N', 'NO': 'N', 'FALSE': 'N', '0': 'N',
+}
+
+
+def money_value(val):
+    """'$1,234.56' -> 1234.56, '($10.00)' -> -10.0. Raises ValueError on anything else"""
+    number = float(MONEY_CHARS.sub('', val))
+    return -number if NEGATIVE in val else number
+
+
+def parse_money(values):
+    """Vector money_value() - returns a float64 Series, NaN where a value isn't money
+    Numbers pass through unchanged
+    """
+    values = pd.Series(values)
+    numbers = pd.to_numeric(values, errors='coerce').astype('float64')
+    # Text is object, or on pandas 3 the str dtype
+    if not is_string_dtype(values.dtype):
+        return numbers
+    # Only formatted values need cleaning up - most columns are plain numbers already
+    formatted = numbers.isna() & values.notna()
+    if formatted.any():
+        text = values[formatted].astype(str)
+        cleaned = pd.to_numeric(text.str.replace(MONEY_CHARS, '', regex=True), errors='coerce')
+        negative = text.str.contains(NEGATIVE, regex=False)
+        numbers[formatted] = cleaned.where(~negative, -cleaned)
+    return numbers
+
+
+def parse_epoch_dates(values, format=DATE_FORMAT):
+    """Epoch milliseconds -> local date strings, like datetime.fromtimestamp(ms / 1000).strftime(format)
+    Missing values stay missing
+    """
+    values = pd.Series(values)
+    ms = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64')
+    # Timezone conversion and strftime are the slow parts - do them once per distinct timestamp, then per day
+    stamps, stamp_of = np.unique(ms, return_inverse=True)
+    local = pd.to_datetime(stamps, unit='ms', utc=True).tz_convert(LOCAL_TZ).tz_localize(None).floor('D')
+    # Distinct days from the index itself - its integer values are in whatever unit pandas picked
+    day_of, days = pd.factorize(local, use_na_sentinel=False)
+    formatted = days.strftime(format).to_numpy(dtype=object)
+    dates = formatted[day_of][stamp_of.reshape(-1)]
+    return pd.Series(dates, index=values.index, dtype=object).where(~np.isnan(ms))
+
+
+# Converting through the zone file is slow, and the same few dates repeat across rows
+@lru_cache(maxsize=4096)
+def epoch_date(ms, format=DATE_FORMAT):
+    """One epoch-millisecond timestamp -> local date string, NaN if it's missing or not a number"""
+    try:
+        ms = float(ms)
+    except (TypeError, ValueError):
+        return np.nan
+    if np.isnan(ms):
+        return np.nan
+    return datetime.fromtimestamp(ms / 1000, LOCAL_TZ).strftime(format)
+
+
+def parse_text_dates(values, formats=TEXT_DATE_FORMATS):
+    """Date strings in any of formats -> datetime64[ns] Series
+    NaT where missing, unparseable or outside datetime64[ns]'s range (mistyped years like 2410)
+    """
+    values = pd.Series(values, dtype=object)
+    dates = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for format in formats:
+        # Parsed in whatever unit pandas picks, so one out-of-range date can't fail the column
+        parsed = pd.to_datetime(values, format=format, errors='coerce')
+        parsed = parsed.where((parsed >= pd.Timestamp.min) & (parsed <= pd.Timestamp.max)).dt.as_unit('ns')
+        dates = dates.where(dates.notna(), parsed)
+    return dates
+
+
+def _flag(value):
+    return FLAG_VALUES.get(str(value).strip().upper(), value)
+
+
+def flag_value(value):
+    """'yes' -> 'Y' etc. Missing values stay missing"""
+    return value if pd.isna(value) else _flag(value)
+
+
+def parse_flags(values):
+    """Y/N indicators ('Y', 'yes', True, 1, ...) -> 'Y'/'N'
+    Missing values stay missing; anything unrecognized is kept as is
+    """
+    values = pd.Series(values)
+    return values.map(_flag).where(values.notna(), values)
@@ -0,0 +1,47 @@
+"""
+Paginated fetching for CERS DataTables list endpoints
+
+CERS list endpoints (listCandidateResults, listFinancialCommitteeResults, listFinanceReports)
+are DataTables server-side sources: they return one page of rows in 'aaData' plus the
+total row count for the search. fetch_rows() reads the total off the first page and
+pulls the rest in pages of `pageSize`, yielding rows as they arrive.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def fetch_rows(session, list_url, pageSize=DEFAULT_PAGE_SIZE, workers=1):
+    """Generator over rows from a DataTables list endpoint
+    - session - session that has already posted the search/report-list request
+    - list_url - url template with {start} and {length} placeholders for iDisplayStart/iDisplayLength
+    - workers - number of pages to request at once after the first. Rows are still yielded in order
+    """
+    first = session.get(list_url.format(start=0, length=pageSize)).json()
+    rows = first['aaData']
+    yield from rows
+
+    # iTotalDisplayRecords is the count after server-side filtering, which is what pages are cut from
+    total = first.get('iTotalDisplayRecords', first.get('iTotalRecords'))
+    if total is None:
+        # No count reported - keep paging until a short page comes back
+        start = pageSize
+        while len(rows) == pageSize:
+            rows = session.get(list_url.format(start=start, length=pageSize)).json()['aaData']
+            yield from rows
+            start += pageSize
+        return
+
+    starts = range(pageSize, int(total), pageSize)
+
+    def fetch_page(start):
+        return session.get(list_url.format(start=start, length=pageSize)).json()['aaData']
+
+    if workers <= 1 or len(starts) <= 1:
+        for start in starts:
+            yield from fetch_page(start)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+            for page in executor.map(fetch_page, starts):
+                yield from page
@@ -0,0 +1,210 @@
+"""
+Global request budget for CERS
+
+Components
+- RateLimiter - Token bucket (requests per second) plus a cap on requests in flight
+
+One RateLimiter is shared by every session from models/cers_client.py, so CandidateList, CommitteeList
+and Report requests all draw from the same budget however many fetch workers are running.
+The rate adapts: it's halved when CERS answers 429/503, times out or replies slowly, and creeps
+back up toward the cap while replies stay healthy.
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+
+DEFAULT_RPS = 5
+DEFAULT_CONCURRENCY = 8
+
+# Statuses that mean CERS wants us to slow down
+THROTTLE_STATUSES = [429, 503]
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    """Token-bucket request scheduler
+    - rps - max requests per second (the rate never climbs above this)
+    - concurrency - max requests in flight at once
+    - minRps - floor for the adaptive rate
+    - recovery - requests/second added back after each healthy reply
+    """
+
+    def __init__(self, rps=DEFAULT_RPS, concurrency=DEFAULT_CONCURRENCY, minRps=0.5, recovery=0.1):
+        self.maxRps = rps
+        self.minRps = min(minRps, rps)
+        self.recovery = recovery
+        self.concurrency = concurrency
+        self.rate = rps
+        self.tokens = 1
+        self.updated = time.monotonic()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        # (loop, future) for coroutines waiting on a slot - release() wakes one
+        self._waiters = deque()
+
+        self.requests = 0
+        self.throttled = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0
+        self.max_wait = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        # Burst of at most one second's worth of requests
+        self.tokens = min(max(self.rate, 1), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _enqueue(self):
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        return time.monotonic()
+
+    def _take_token(self):
+        # Returns 0 if a token was taken, otherwise seconds until the next one
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def _dequeue(self, start):
+        wait = time.monotonic() - start
+        with self._lock:
+            self.queue_depth -= 1
+            self.requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def acquire(self):
+        """Blocks until there's both a free slot and a token"""
+        start = self._enqueue()
+        self._slots.acquire()
+        while True:
+            delay = self._take_token()
+            if delay == 0:
+                break
+            time.sleep(delay)
+        self._dequeue(start)
+
+    async def acquire_async(self):
+        """acquire() for coroutines - waits without blocking the event loop
+        Slots are shared with blocking callers, so the in-flight cap covers both
+        """
+        start = self._enqueue()
+        await self._wait_for_slot()
+        while True:
+            delay = self._take_token()
+            if delay == 0:
+                break
+            await asyncio.sleep(delay)
+        self._dequeue(start)
+
+    async def _wait_for_slot(self):
+        # Waits on a future release() resolves from whichever thread frees a slot, so waiting
+        # coroutines cost nothing until one is free. Blocking callers can still take it first
+        loop = asyncio.get_running_loop()
+        while not self._slots.acquire(blocking=False):
+            waiter = (loop, loop.create_future())
+            with self._lock:
+                self._waiters.append(waiter)
+            try:
+                # A slot freed before the waiter was registered wouldn't wake it
+                if self._slots.acquire(blocking=False):
+                    self._drop_waiter(waiter)
+                    return
+                await waiter[1]
+            except BaseException:
+                self._drop_waiter(waiter)
+                raise
+
+    def _drop_waiter(self, waiter):
+        # A waiter that's already been woken passes the wake-up on, so a free slot isn't missed
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return
+        self._wake_one()
+
+    def _wake_one(self):
+        while True:
+            with self._lock:
+                if len(self._waiters) == 0:
+                    return
+                loop, future = self._waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+                return
+            except RuntimeError:
+                # That waiter's loop has closed
+                continue
+
+    def release(self, throttle):
+        """Frees a slot; throttle=True backs the rate off, otherwise it recovers toward the cap"""
+        self._slots.release()
+        self._wake_one()
+        with self._lock:
+            if throttle:
+                self.throttled += 1
+                rate = max(self.minRps, self.rate / 2)
+                if rate < self.rate:
+                    print(f'--- Slowing CERS requests to {rate:.2f}/s')
+                self.rate = rate
+            else:
+                self.rate = min(self.maxRps, self.rate + self.recovery)
+
+    def call(self, send, method, url, slowAfter=None, **kwargs):
+        """Runs send(method, url, **kwargs) within the budget
+        - slowAfter - seconds after which a reply counts as slow (and backs the rate off)
+        """
+        self.acquire()
+        start = time.monotonic()
+        try:
+            response = send(method, url, **kwargs)
+        except Exception:
+            self.release(throttle=True)
+            raise
+        elapsed = time.monotonic() - start
+        slow = slowAfter is not None and elapsed > slowAfter
+        self.release(throttle=slow or response.status_code in THROTTLE_STATUSES)
+        return response
+
+    async def call_async(self, send, method, url, slowAfter=None, **kwargs):
+        """call() for coroutines - awaits send(method, url, **kwargs)"""
+        await self.acquire_async()
+        start = time.monotonic()
+        try:
+            response = await send(method, url, **kwargs)
+        except BaseException:
+            # Includes cancellation, which would otherwise leak the slot
+            self.release(throttle=True)
+            raise
+        elapsed = time.monotonic() - start
+        slow = slowAfter is not None and elapsed > slowAfter
+        self.release(throttle=slow or response.status_code in THROTTLE_STATUSES)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'rate': round(self.rate, 2),
+                'throttled': self.throttled,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'total_wait': round(self.total_wait, 3),
+                'mean_wait': round(self.total_wait / self.requests, 3) if self.requests > 0 else 0,
+                'max_wait': round(self.max_wait, 3),
+            }
+
+    def print_stats(self):
+        stats = self.stats()
+        print(f"CERS rate limit: {stats['requests']} requests, {stats['mean_wait']:.2f}s mean / {stats['max_wait']:.2f}s max wait, max queue {stats['max_queue_depth']}, throttled {stats['throttled']}x, now {stats['rate']:.2f}/s")
@@ -0,0 +1,210 @@
+"""
+Content-addressed store of raw CERS responses
+
+Components
+- RawStore - Compressed response bodies on disk, named by content hash, with refs keyed by request
+  fingerprint and amendedDate
+- fingerprint - Stable hash of a request (url plus payload)
+- record / record_file / recorded_rows - Save responses to the module-level store while fetching,
+  or serve them from it when replaying
+- get_raw_store / set_raw_store - Module-level store. None (default) records nothing
+
+Layout under root:
+- objects/ab/abcd....gz - gzipped bodies, named by the sha256 of the uncompressed body, so identical
+  responses (e.g. unchanged reports across runs) are stored once
+- refs/12/1234....json - {request, amendedDate, sha, size} for one request at one amendedDate.
+  sha is None when CERS had nothing to serve (e.g. no schedule file)
+
+Report responses are keyed by amendedDate, so an amended report gets new refs alongside the old ones.
+Search results and report lists have no amendedDate and keep only the latest response.
+With replay=True, models read from the store instead of CERS (see ReplayReportSource in
+models/report_source.py), so rebuilding caches and exports needs no network.
+"""
+
+import os
+import glob
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+DEFAULT_RAW_STORE_PATH = 'cache/raw'
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def _as_sent(value):
+    # Form values go over the wire as text, so reportId 123 and '123' are the same request
+    if isinstance(value, dict):
+        return {str(k): _as_sent(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_sent(v) for v in value]
+    return value if value is None else str(value)
+
+
+def fingerprint(request):
+    """sha256 of a request dict's canonical JSON - same request as sent, same fingerprint"""
+    return hashlib.sha256(json.dumps(_as_sent(request), sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class RawStore:
+    """Raw CERS responses on disk
+    - root - store folder
+    - replay - serve responses from the store instead of fetching them
+    """
+
+    def __init__(self, root=DEFAULT_RAW_STORE_PATH, replay=False):
+        self.root = root
+        self.replay = replay
+
+    def _ref_path(self, request, amendedDate):
+        key = hashlib.sha256(f'{fingerprint(request)}\0{amendedDate}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.root, 'refs', key[:2], key + '.json')
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, 'objects', sha[:2], sha + '.gz')
+
+    def _write_atomic(self, path, write):
+        # Write to a temp file next to path and rename, so readers never see a partial file and
+        # concurrent writers of the same content just replace each other
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _write_ref(self, request, amendedDate, sha, size):
+        ref = {'request': request, 'amendedDate': amendedDate, 'sha': sha, 'size': size}
+        self._write_atomic(self._ref_path(request, amendedDate),
+                           lambda f: f.write(json.dumps(ref, default=str).encode('utf-8')))
+
+    def _write_object(self, sha, write):
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            # mtime=0 - same body, same bytes on disk
+            self._write_atomic(path, lambda f: write(gzip.GzipFile(fileobj=f, mode='wb', mtime=0)))
+
+    def put(self, request, body, amendedDate=None):
+        """Stores a response body (str or bytes, None for no response), returns its sha"""
+        if body is None:
+            self._write_ref(request, amendedDate, None, 0)
+            return None
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        sha = hashlib.sha256(body).hexdigest()
+
+        def write(gz):
+            with gz:
+                gz.write(body)
+        self._write_object(sha, write)
+        self._write_ref(request, amendedDate, sha, len(body))
+        return sha
+
+    def put_file(self, request, path, amendedDate=None):
+        """Stores a downloaded file without reading it into memory, returns its sha"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        sha = digest.hexdigest()
+
+        def write(gz):
+            with gz, open(path, 'rb') as f:
+                shutil.copyfileobj(f, gz, COPY_CHUNK_SIZE)
+        self._write_object(sha, write)
+        self._write_ref(request, amendedDate, sha, os.path.getsize(path))
+        return sha
+
+    def put_json(self, request, value, amendedDate=None):
+        return self.put(request, json.dumps(value), amendedDate)
+
+    def ref(self, request, amendedDate=None):
+        """{request, amendedDate, sha, size} for a stored response. Raises KeyError if it wasn't recorded"""
+        try:
+            with open(self._ref_path(request, amendedDate), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f'No recorded response for {request} (amendedDate {amendedDate})') from None
+
+    def has(self, request, amendedDate=None):
+        return os.path.isfile(self._ref_path(request, amendedDate))
+
+    def path(self, request, amendedDate=None):
+        """Path of the gzipped body, or None if CERS had no response"""
+        sha = self.ref(request, amendedDate)['sha']
+        return None if sha is None else self._object_path(sha)
+
+    def get(self, request, amendedDate=None):
+        """Response body as bytes, or None if CERS had no response"""
+        return self.body(self.ref(request, amendedDate)['sha'])
+
+    def body(self, sha):
+        """Stored body by sha, or None for a None sha"""
+        if sha is None:
+            return None
+        with gzip.open(self._object_path(sha), 'rb') as f:
+            return f.read()
+
+    def refs(self):
+        """Every stored ref, in the order they were recorded"""
+        paths = glob.glob(os.path.join(self.root, 'refs', '*', '*.json'))
+        for path in sorted(paths, key=os.path.getmtime):
+            with open(path, 'r') as f:
+                yield json.load(f)
+
+    def get_text(self, request, amendedDate=None):
+        body = self.get(request, amendedDate)
+        return None if body is None else body.decode('utf-8')
+
+    def get_json(self, request, amendedDate=None):
+        return json.loads(self.get(request, amendedDate))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_raw_store():
+    with _store_lock:
+        return _store
+
+
+def set_raw_store(store):
+    """Replaces the store responses are recorded to (or replayed from). None stops recording"""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def record(request, body, amendedDate=None):
+    """Saves a response to the module-level store, if recording"""
+    store = get_raw_store()
+    if store is not None and not store.replay:
+        store.put(request, body, amendedDate)
+
+
+def record_file(request, path, amendedDate=None):
+    """record() for a downloaded file"""
+    store = get_raw_store()
+    if store is not None and not store.replay:
+        store.put_file(request, path, amendedDate)
+
+
+def recorded_rows(request, fetch):
+    """List rows for request - fetch() without a store, fetch() saved to the store when recording,
+    the stored rows when replaying
+    """
+    store = get_raw_store()
+    if store is None:
+        return fetch()
+    if store.replay:
+        return store.get_json(request)
+    rows = list(fetch())
+    store.put_json(request, rows)
+    return rows
@@ -0,0 +1,213 @@
+"""
+Cache backends for Report data
+
+Components
+- JsonReportCache - Original format: one {type}-{id}.json document with contributions/expenditures as embedded JSON strings
+- ParquetReportCache - {type}-{id}.meta.json metadata record + typed Parquet files for contributions/expenditures
+- ArrowReportCache - Same layout as Parquet, using uncompressed Arrow IPC (Feather) files
+- get_report_cache / set_report_cache - Shared backend used by Report
+
+Metadata records hold 'data' (the report list entry, incl. amendedDate), 'summary' and
+'unitemized_contributions', so checking a cached report for amendments doesn't touch the
+itemized tables. Parquet/Arrow backends need pyarrow installed.
+
+Migrate existing cache folders with migrate-cache.py
+"""
+
+import os
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from io import StringIO, BytesIO
+
+import pandas as pd
+
+
+class JsonReportCache:
+    """Original single-document JSON cache"""
+    name = 'json'
+
+    def _path(self, cachePath, form, id):
+        return os.path.join(cachePath, f'{form}-{id}.json')
+
+    def paths(self, cachePath, form, id):
+        return [self._path(cachePath, form, id)]
+
+    def exists(self, cachePath, form, id):
+        return os.path.isfile(self._path(cachePath, form, id))
+
+    def read_meta(self, cachePath, form, id):
+        with open(self._path(cachePath, form, id)) as f:
+            return json.load(f)
+
+    def read_frames(self, cachePath, form, id, meta):
+        # dtype=False keeps values as written - inference would turn ZIP and code columns back into numbers
+        contributions = pd.read_json(StringIO(meta['contributions']), dtype=False)
+        expenditures = pd.read_json(StringIO(meta['expenditures']), dtype=False)
+        return contributions, expenditures
+
+    def write(self, cachePath, form, id, meta, contributions, expenditures):
+        """Writes cache files, returns md5 content hash"""
+        output = {
+            'data': meta['data'],
+            'summary': meta['summary'],
+            'contributions': contributions.to_json(orient='records'),
+            'expenditures': expenditures.to_json(orient='records'),
+            'unitemized_contributions': meta['unitemized_contributions'],
+        }
+        text = json.dumps(output, indent=4)
+        with open(self._path(cachePath, form, id), 'w') as f:
+            f.write(text)
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+class ColumnarReportCache(ABC):
+    """Small JSON metadata record next to one columnar file per itemized table
+    Subclasses set name and extension and implement _write_frame / _read_frame for their file format
+    """
+    name = None
+    extension = None
+
+    def _meta_path(self, cachePath, form, id):
+        return os.path.join(cachePath, f'{form}-{id}.meta.json')
+
+    def _frame_path(self, cachePath, form, id, table):
+        return os.path.join(cachePath, f'{form}-{id}-{table}.{self.extension}')
+
+    def paths(self, cachePath, form, id):
+        return [
+            self._meta_path(cachePath, form, id),
+            self._frame_path(cachePath, form, id, 'contributions'),
+            self._frame_path(cachePath, form, id, 'expenditures'),
+        ]
+
+    def exists(self, cachePath, form, id):
+        return all(os.path.isfile(path) for path in self.paths(cachePath, form, id))
+
+    def read_meta(self, cachePath, form, id):
+        with open(self._meta_path(cachePath, form, id)) as f:
+            return json.load(f)
+
+    def read_frames(self, cachePath, form, id, meta):
+        contributions = self._read_frame(
+            self._frame_path(cachePath, form, id, 'contributions'))
+        expenditures = self._read_frame(
+            self._frame_path(cachePath, form, id, 'expenditures'))
+        return contributions, expenditures
+
+    def write(self, cachePath, form, id, meta, contributions, expenditures):
+        """Writes cache files, returns md5 content hash"""
+        digest = hashlib.md5()
+        text = json.dumps({
+            'data': meta['data'],
+            'summary': meta['summary'],
+            'unitemized_contributions': meta['unitemized_contributions'],
+        })
+        digest.update(text.encode('utf-8'))
+        for table, df in [('contributions', contributions), ('expenditures', expenditures)]:
+            body = self._frame_bytes(df)
+            digest.update(body)
+            with open(self._frame_path(cachePath, form, id, table), 'wb') as f:
+                f.write(body)
+        # Metadata goes last so a half-written entry never looks complete
+        with open(self._meta_path(cachePath, form, id), 'w') as f:
+            f.write(text)
+        return digest.hexdigest()
+
+    def _frame_bytes(self, df):
+        import pyarrow
+        df = df.reset_index(drop=True)
+        buffer = BytesIO()
+        try:
+            self._write_frame(df, buffer)
+        except (pyarrow.ArrowTypeError, pyarrow.ArrowInvalid):
+            # Mixed-type object columns (e.g. numeric and text zip codes) can't be typed - store as text
+            buffer = BytesIO()
+            self._write_frame(_stringify_mixed_columns(df), buffer)
+        return buffer.getvalue()
+
+    @abstractmethod
+    def _write_frame(self, df, buffer):
+        """Writes df to the binary buffer"""
+
+    @abstractmethod
+    def _read_frame(self, path):
+        """Reads a file written by _write_frame back into a DataFrame"""
+
+
+class ParquetReportCache(ColumnarReportCache):
+    name = 'parquet'
+    extension = 'parquet'
+
+    def _write_frame(self, df, buffer):
+        df.to_parquet(buffer, index=False)
+
+    def _read_frame(self, path):
+        return pd.read_parquet(path)
+
+
+class ArrowReportCache(ColumnarReportCache):
+    name = 'arrow'
+    extension = 'arrow'
+
+    def _write_frame(self, df, buffer):
+        df.to_feather(buffer, compression='uncompressed')
+
+    def _read_frame(self, path):
+        return pd.read_feather(path)
+
+
+def _stringify_mixed_columns(df):
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].map(lambda v: v if v is None or isinstance(
+            v, str) or pd.isna(v) else str(v))
+    return df
+
+
+CACHE_BACKENDS = {
+    'json': JsonReportCache,
+    'parquet': ParquetReportCache,
+    'arrow': ArrowReportCache,
+}
+
+
+def get_cache_backend(name):
+    if name not in CACHE_BACKENDS:
+        raise ValueError(
+            f'Unknown cache format {name}, expected one of {list(CACHE_BACKENDS)}')
+    return CACHE_BACKENDS[name]()
+
+
+_report_cache = JsonReportCache()
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    """Returns the shared cache backend new Report caches are written with"""
+    with _report_cache_lock:
+        return _report_cache
+
+
+def set_report_cache(backend):
+    """Sets the shared cache backend, e.g. set_report_cache(get_cache_backend('parquet'))"""
+    global _report_cache
+    with _report_cache_lock:
+        _report_cache = backend
+
+
+def find_cached(cachePath, form, id):
+    """Returns backend holding a cached report, checking the shared backend first
+    Lets a switch to a new format read existing caches until they're rewritten
+    """
+    preferred = get_report_cache()
+    if preferred.exists(cachePath, form, id):
+        return preferred
+    for backend_class in CACHE_BACKENDS.values():
+        if isinstance(preferred, backend_class):
+            continue
+        backend = backend_class()
+        if backend.exists(cachePath, form, id):
+            return backend
+    return None
@@ -0,0 +1,250 @@
+"""
+Where Report objects get their raw CERS responses
+
+Components
+- CersReportSource - Fetches from CERS through the shared client (default). C7/C7E detail lists are
+  fetched in parallel
+- PrefetchedReportSource - Serves responses fetched ahead of time (e.g. by models/cers_async.py)
+- ReplayReportSource - Serves responses recorded in a RawStore (see models/raw_store.py), no network
+- report_requests - Which responses a Report of a given form type needs
+- summary_request / schedule_request / detail_request - Raw store keys for each response
+- get_report_source / set_report_source - Module-level source used by Report
+
+Report handles parsing and caching; a source only fetches. That split lets the same Report code
+run on responses from the blocking client, the async client or anywhere else.
+"""
+
+import os
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from models.cers_client import get_client
+from models.downloads import download_file, read_schedule
+from models.raw_store import get_raw_store, record, record_file
+
+RETRIEVE_REPORT_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/retrieveReport'
+DETAIL_LIST_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/financeRepDetailList'
+PREPARE_DOWNLOAD_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/prepareDownloadFileFromSearch'
+DOWNLOAD_URL = 'https://cers-ext.mt.gov/CampaignTracker/public/viewFinanceReport/downloadFile'
+
+# C7/C7E reports are split across several detail tables, read one by one after opening the report
+C7_DETAIL_LISTS = ['individual', 'committee', 'loan',
+                   'candidate', 'fundraisers', 'refunds', 'payment']
+C7E_DETAIL_LISTS = ['expendOther', 'candidate', 'pettyCash', 'debtLoan']
+
+# How parallel detail-list requests get a session with the report open:
+# - 'clone' - open the report once, then copy that session's cookies to each request (one server session)
+# - 'reprime' - each request gets a fresh session and opens the report itself (one extra request per list)
+# - 'serial' - one session, lists fetched in order (original behavior)
+DETAIL_SESSION_MODES = ['clone', 'reprime', 'serial']
+DETAIL_WORKERS = len(C7_DETAIL_LISTS)
+
+# Itemized schedule downloads by form type - (contributions, expenditures)
+SCHEDULES = {
+    'C4': ('C4A', 'C4B'),
+    'C5': ('A', 'B'),
+    'C6': ('C6A', 'C6B'),
+}
+
+
+def report_payload(data):
+    """retrieveReport payload - opens a report in the session for summary/detail requests"""
+    if 'candidateId' in data:
+        return {
+            'candidateId': data['candidateId'],
+            'reportId': data['reportId'],
+            'searchPage': 'public'
+        }
+    return {
+        'committeeId': data['committeeId'],
+        'reportId': data['reportId'],
+        'searchPage': 'public'
+    }
+
+
+def schedule_payload(data, schedule):
+    return {
+        'reportId': data['reportId'],  # This is from checkbox on candidate report page
+        'scheduleCode': schedule,  # A is contributions, # B is expenditures
+        'fname': data['candidateName'] if 'candidateName' in data else data['committeeName'],
+    }
+
+
+def summary_request(data):
+    return {'url': RETRIEVE_REPORT_URL, 'data': report_payload(data)}
+
+
+def schedule_request(data, schedule):
+    return {'url': DOWNLOAD_URL, 'data': schedule_payload(data, schedule)}
+
+
+def detail_request(data, listName):
+    # Detail list payloads only name the list - the report comes from the session
+    return {'url': DETAIL_LIST_URL, 'data': {'listName': listName}, 'report': report_payload(data)}
+
+
+def detail_rows(text, json):
+    # Empty body means an empty table
+    return [] if text == '' else json()
+
+
+def report_requests(data, fetchFullReports=True, skipSummary=False):
+    """Keys of the responses a Report needs for a report list record:
+    ('summary',), ('schedule', code) and ('details', listNames)
+    """
+    form = data['formTypeCode']
+    if form == 'C7':
+        return [('details', tuple(C7_DETAIL_LISTS))]
+    if form == 'C7E':
+        return [('details', tuple(C7E_DETAIL_LISTS))]
+    if form not in SCHEDULES:
+        return []
+    needed = [] if skipSummary else [('summary',)]
+    if fetchFullReports:
+        needed += [('schedule', code) for code in SCHEDULES[form]]
+    return needed
+
+
+class CersReportSource:
+    """Fetches report responses from CERS with the shared client
+    - detailSessions - one of DETAIL_SESSION_MODES
+    - detailWorkers - max detail lists fetched at once for one report
+    """
+
+    def __init__(self, detailSessions='clone', detailWorkers=DETAIL_WORKERS):
+        if detailSessions not in DETAIL_SESSION_MODES:
+            raise ValueError(f'detailSessions must be one of {DETAIL_SESSION_MODES}')
+        self.detailSessions = detailSessions
+        self.detailWorkers = detailWorkers
+
+    def summary_page(self, report):
+        session = get_client().session()
+        text = session.post(RETRIEVE_REPORT_URL, report_payload(report.data)).text
+        record(summary_request(report.data), text, report.data['amendedDate'])
+        return text
+
+    def schedule(self, report, schedule):
+        # Streamed to a temp file and parsed in chunks, so big schedules aren't held in memory as text
+        session = get_client().session()
+        # Timeout comes from the client's RequestPolicy (see models/request_policy.py)
+        p = session.post(PREPARE_DOWNLOAD_URL,
+                         schedule_payload(report.data, schedule))
+        if 'fileName' not in p.json():
+            print(
+                f'No file for schedule {schedule}, {report.start_date}-{report.end_date}. Report ID:', report.id)
+            record(schedule_request(report.data, schedule), None, report.data['amendedDate'])
+            return pd.DataFrame()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = download_file(session, DOWNLOAD_URL, os.path.join(
+                tmp, f'{report.type}-{report.id}-{schedule}.txt'), params=p.json())
+            record_file(schedule_request(report.data, schedule), path, report.data['amendedDate'])
+            if os.path.getsize(path) == 0:
+                print('Empty file. Report ID:', report.id)
+            return read_schedule(path)
+
+    def detail_lists(self, report, listNames):
+        """Returns {listName: rows} for C7/C7E detail tables
+        CERS serves these for whichever report the session last opened, so every request needs a
+        session with this report open - see DETAIL_SESSION_MODES
+        """
+        client = get_client()
+        payload = report_payload(report.data)
+
+        def open_report(session):
+            record(summary_request(report.data), session.post(RETRIEVE_REPORT_URL, payload).text,
+                   report.data['amendedDate'])
+
+        if self.detailSessions == 'reprime':
+            session = None
+        else:
+            session = client.session()
+            open_report(session)
+
+        def fetch(name):
+            if self.detailSessions == 'clone':
+                s = client.clone_session(session)
+            elif self.detailSessions == 'reprime':
+                s = client.session()
+                open_report(s)
+            else:
+                s = session
+            r = s.post(DETAIL_LIST_URL, {'listName': name})
+            record(detail_request(report.data, name), r.text, report.data['amendedDate'])
+            return detail_rows(r.text, r.json)
+
+        if self.detailSessions == 'serial' or self.detailWorkers <= 1:
+            rows = [fetch(name) for name in listNames]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.detailWorkers, len(listNames))) as executor:
+                rows = list(executor.map(fetch, listNames))
+        return dict(zip(listNames, rows))
+
+
+class PrefetchedReportSource:
+    """Serves responses keyed as in report_requests()"""
+
+    def __init__(self, responses):
+        self.responses = responses
+
+    def summary_page(self, report):
+        return self.responses[('summary',)]
+
+    def schedule(self, report, schedule):
+        return self.responses[('schedule', schedule)]
+
+    def detail_lists(self, report, listNames):
+        return self.responses[('details', tuple(listNames))]
+
+
+class ReplayReportSource:
+    """Serves responses recorded in a RawStore for the report's amendedDate
+    Raises KeyError for responses that weren't recorded
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+
+    def _store(self):
+        return self.store or get_raw_store()
+
+    def summary_page(self, report):
+        return self._store().get_text(summary_request(report.data), report.data['amendedDate'])
+
+    def schedule(self, report, schedule):
+        request = schedule_request(report.data, schedule)
+        ref = self._store().ref(request, report.data['amendedDate'])
+        if ref['sha'] is None:
+            print(
+                f'No file for schedule {schedule}, {report.start_date}-{report.end_date}. Report ID:', report.id)
+            return pd.DataFrame()
+        if ref['size'] == 0:
+            print('Empty file. Report ID:', report.id)
+            return pd.DataFrame()
+        # Parsed straight from the gzipped object - pandas decompresses .gz paths
+        return read_schedule(self._store().path(request, report.data['amendedDate']))
+
+    def detail_lists(self, report, listNames):
+        store = self._store()
+        texts = [store.get_text(detail_request(report.data, name), report.data['amendedDate']) for name in listNames]
+        return {name: detail_rows(text, lambda: json.loads(text)) for name, text in zip(listNames, texts)}
+
+
+_source = CersReportSource()
+_source_lock = threading.Lock()
+
+
+def get_report_source():
+    with _source_lock:
+        return _source
+
+
+def set_report_source(source):
+    """Replaces the source new Reports fetch from by default"""
+    global _source
+    with _source_lock:
+        _source = source
@@ -0,0 +1,106 @@
+"""
+Summary table extraction for CERS report pages
+
+Components
+- summary_rows - Cell text for each labeled row of a report's summaryAccordionId table
+- SUMMARY_LABELS - Rows read for C4/C5/C6 summaries
+
+Report pages run to over a megabyte, but the summary is one small table near the top. summary_rows
+slices that table out of the page text and parses just the fragment with lxml. If lxml isn't
+installed or the fragment doesn't have every label, it falls back to parsing the whole page with
+BeautifulSoup's html.parser (the original path), so results are the same either way.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+# Partial text or regex, matched against the first cell of a row
+SUMMARY_LABELS = [
+    'previous report',
+    'Receipts',
+    'Expenditures',
+    'Ending Balance',
+]
+
+_LABEL_PATTERNS = {}
+
+SUMMARY_DIV = re.compile(r'<div[^>]*\bid\s*=\s*["\']?summaryAccordionId\b', re.IGNORECASE)
+TABLE_TAG = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+
+
+def _pattern(label):
+    if label not in _LABEL_PATTERNS:
+        _LABEL_PATTERNS[label] = re.compile(label)
+    return _LABEL_PATTERNS[label]
+
+
+def summary_fragment(text):
+    """Returns the markup of the first table inside the summaryAccordionId div, or None"""
+    div = SUMMARY_DIV.search(text)
+    if div is None:
+        return None
+    depth = 0
+    start = None
+    for tag in TABLE_TAG.finditer(text, div.end()):
+        if tag.group(1) == '':
+            if depth == 0:
+                start = tag.start()
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                return text[start:tag.end()]
+    return None
+
+
+def _own_string(el):
+    # lxml version of BeautifulSoup's Tag.string - the text of an element with a single child node, else None
+    children = list(el)
+    if len(children) == 0:
+        return el.text
+    if len(children) == 1 and not el.text and not children[0].tail:
+        return _own_string(children[0])
+    return None
+
+
+def _rows_lxml(fragment, labels):
+    from lxml import etree, html
+    try:
+        table = html.fragment_fromstring(fragment)
+    except etree.ParserError:
+        return None
+    cells = list(table.iter('td'))
+    rows = {}
+    for label in labels:
+        pattern = _pattern(label)
+        td = next((td for td in cells if (s := _own_string(td)) is not None and pattern.search(s)), None)
+        if td is None:
+            return None
+        rows[label] = [c.text_content() for c in td.getparent().iter('td')]
+    return rows
+
+
+def _rows_soup(text, labels):
+    soup = BeautifulSoup(text, 'html.parser')
+    table = soup.find('div', id='summaryAccordionId').find('table')
+    rows = {}
+    for label in labels:
+        row = table.find('td', text=_pattern(label)).parent
+        rows[label] = [td.text for td in row.find_all('td')]
+    return rows
+
+
+def summary_rows(text, labels=SUMMARY_LABELS):
+    """Returns {label: [cell text, ...]} for the first summary table row matching each label
+    Raises like the original BeautifulSoup lookups if the page has no summary table or a label is missing
+    """
+    fragment = summary_fragment(text)
+    if fragment is not None:
+        try:
+            rows = _rows_lxml(fragment, labels)
+        except ImportError:
+            rows = None
+        if rows is not None:
+            return rows
+    return _rows_soup(text, labels)
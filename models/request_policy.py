@@ -0,0 +1,166 @@
+"""
+Timeout, retry and circuit-breaker policy for CERS requests
+
+Components
+- RequestPolicy - Per-endpoint timeouts plus retries with exponential backoff and jitter
+- CircuitBreaker - Fails fast after repeated consecutive failures, until a cooldown passes
+- CircuitOpenError - Raised for requests made while the breaker is open
+
+Applied to every request made through sessions from models/cers_client.py
+"""
+
+import time
+import random
+import asyncio
+import threading
+
+import requests
+
+# (connect, read) timeouts in seconds, keyed by the last path segment of the CERS url
+ENDPOINT_TIMEOUTS = {
+    'searchCandidates': (10, 60),
+    'listCandidateResults': (10, 120),
+    'searchFinancials': (10, 60),
+    'listFinancialCommitteeResults': (10, 120),
+    'retrieveCampaignReports': (10, 60),
+    'retrieveCommitteeReports': (10, 60),
+    'listFinanceReports': (10, 60),
+    'retrieveReport': (10, 120),
+    'financeRepDetailList': (10, 60),
+    # CERS builds schedule files on request - big C5/C6 schedules are slow
+    'prepareDownloadFileFromSearch': (10, 480),
+    'downloadFile': (10, 480),
+}
+DEFAULT_TIMEOUT = (10, 60)
+
+# Statuses worth retrying - rate limiting and transient server trouble
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+class CircuitOpenError(requests.RequestException):
+    """Request refused because CERS has failed repeatedly"""
+
+
+def endpoint_name(url):
+    return url.strip().split('?')[0].rstrip('/').rsplit('/', 1)[-1]
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; stays open for `cooldown` seconds,
+    then lets requests through again (closing on the first success)
+    """
+
+    def __init__(self, threshold=10, cooldown=120):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f'CERS circuit open after {self.failures} consecutive failures, retry in {remaining:.0f}s')
+
+    def wait(self):
+        """Blocks until an open breaker's cooldown has passed"""
+        with self._lock:
+            remaining = 0 if self.opened_at is None else self.opened_at + \
+                self.cooldown - time.monotonic()
+        if remaining > 0:
+            print(f'Waiting {remaining:.0f}s for CERS circuit breaker cooldown')
+            time.sleep(remaining)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown:
+                    print(f'!! CERS circuit breaker open after {self.failures} consecutive failures')
+                self.opened_at = time.monotonic()
+
+
+class RequestPolicy:
+    """Timeouts and retries for CERS requests
+    - retries - extra attempts after the first for connection errors, timeouts and RETRY_STATUSES
+    - backoff - base delay in seconds; attempt n waits up to backoff * 2^n (full jitter), capped at maxBackoff
+    - timeouts - overrides for ENDPOINT_TIMEOUTS
+    """
+
+    def __init__(self, retries=4, backoff=2, maxBackoff=60, timeouts={}, breaker=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.timeouts = {**ENDPOINT_TIMEOUTS, **timeouts}
+        self.breaker = breaker or CircuitBreaker()
+
+    def timeout_for(self, url):
+        return self.timeouts.get(endpoint_name(url), DEFAULT_TIMEOUT)
+
+    def delay(self, attempt, response=None):
+        delay = random.uniform(0, min(self.maxBackoff, self.backoff * 2 ** attempt))
+        # Respect CERS asking us to slow down
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            delay = max(delay, int(response.headers['Retry-After']))
+        return delay
+
+    def _check_status(self, response, url):
+        if response.status_code in RETRY_STATUSES:
+            raise requests.HTTPError(
+                f'{response.status_code} from {endpoint_name(url)}', response=response)
+
+    def _retry_delay(self, e, attempt, response, url):
+        # Returns seconds to wait before retrying, or re-raises once retries are used up
+        self.breaker.record_failure()
+        if attempt >= self.retries:
+            raise e
+        delay = self.delay(attempt, response)
+        print(f'--- {endpoint_name(url)} failed ({e}), retry {attempt + 1}/{self.retries} in {delay:.1f}s')
+        return delay
+
+    def send(self, send, method, url, **kwargs):
+        """Calls send(method, url, **kwargs) with a default timeout, retrying transient failures"""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout_for(url)
+        attempt = 0
+        while True:
+            self.breaker.check()
+            response = None
+            try:
+                response = send(method, url, **kwargs)
+                self._check_status(response, url)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                time.sleep(self._retry_delay(e, attempt, response, url))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
+
+    async def send_async(self, send, method, url, **kwargs):
+        """send() for coroutines - awaits send(method, url, **kwargs)
+        send should raise requests' ConnectionError/Timeout for transport failures
+        """
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout_for(url)
+        attempt = 0
+        while True:
+            self.breaker.check()
+            response = None
+            try:
+                response = await send(method, url, **kwargs)
+                self._check_status(response, url)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, response, url))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return response
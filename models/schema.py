@@ -0,0 +1,135 @@
+"""
+Declared column types for itemized contributions and expenditures
+
+Components
+- ITEMIZED_SCHEMA - {column: kind} for schedule, C7/C7E and Candidate/Committee-level columns
+- MONEY_COLUMNS - Amount columns, parsed to float64 (see models/downloads.py)
+- apply_schema - Converts a frame's text columns to their declared kinds
+- label_column - A categorical column repeating one value, e.g. the candidate name on every row
+- paid_dates - 'Date Paid' as datetime64, for date arithmetic
+
+Kinds:
+- 'label' - few distinct values repeated across rows (report type, period, city, ...) -> category
+- 'date' - text dates ('05/24/2024', or '05/24/24' from C7/C7E), which repeat just as much -> category
+- 'text' - everything else that's text -> nullable string, Arrow-backed if pyarrow is installed
+- 'money' - float64, set when the schedule or detail list is parsed
+
+Only columns whose values are all text (or missing) are converted, and dates stay as their original
+text, so cache and export files are byte-for-byte the same as with plain object columns. A
+categorical date costs a code per row instead of a datetime64's eight bytes; paid_dates() converts
+each distinct date once when actual dates are needed.
+
+Text columns may be object or, on pandas 3, the default str dtype (what read_schedule's dtype=str
+gives). Frames shorter than MIN_CATEGORY_ROWS (most single C7/C7E tables) keep their label and date
+columns as plain text - building categories takes longer than parsing the table, for a few kilobytes.
+Their text columns are still converted, and they get categories once combined into a candidate,
+committee or list table.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, infer_dtype, is_string_dtype
+
+from models.normalize import parse_text_dates
+
+ITEMIZED_SCHEMA = {
+    # Added at Candidate/Committee level
+    'Candidate': 'label',
+    'Committee': 'label',
+    'Reporting Period': 'label',
+    'Report Type': 'label',
+
+    'Date Paid': 'date',
+    'Entity Name': 'text',
+    'First Name': 'text',
+    'Middle Initial': 'text',
+    'Last Name': 'text',
+    'Addr Line1': 'text',
+    'City': 'label',
+    'State': 'label',
+    'Zip': 'text',
+    'Zip4': 'text',
+    'Country': 'label',
+    'Occupation': 'label',
+    'Employer': 'label',
+    'Contribution Type': 'label',
+    'Expenditure Type': 'label',
+    'Amount': 'money',
+    'Amount Type': 'label',
+    'Purpose': 'text',
+    'Election Type': 'label',
+    'Total Primary': 'money',
+    'Total General': 'money',
+    'Refund Transaction Type': 'label',
+    'Refund Original Transaction Date': 'date',
+    'Refund Original Transaction Total': 'money',
+    'Refund Original Transaction Descr': 'text',
+    'Previous Transaction (Y/N)': 'label',
+    'Fundraiser Name': 'text',
+    'Fundraiser Location': 'text',
+    'Expenditure Platform': 'label',
+    'Expenditure Specific Services': 'text',
+    'Expenditure Paid Communications Platform': 'label',
+    'Expenditure Paid Communications Subject Matter': 'text',
+    'Attachment': 'text',
+}
+
+MONEY_COLUMNS = [col for col, kind in ITEMIZED_SCHEMA.items() if kind == 'money']
+
+MIN_CATEGORY_ROWS = 500
+
+
+def _text_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return pd.StringDtype('python')
+    return pd.StringDtype('pyarrow')
+
+
+TEXT_DTYPE = _text_dtype()
+
+
+def _all_text(values):
+    # Mixed columns (e.g. numeric zip codes from one report, text from another) are left as they are,
+    # so their values - and the files they're written to - don't change
+    return infer_dtype(values, skipna=True) in ('string', 'empty')
+
+
+def apply_schema(df, schema=ITEMIZED_SCHEMA, minCategoryRows=MIN_CATEGORY_ROWS):
+    """Returns df with its text columns converted to their declared kinds. Undeclared columns are left alone
+    - minCategoryRows - frames with fewer rows keep label and date columns as they are
+    """
+    categories = len(df) >= minCategoryRows
+    converted = {}
+    for col in df.columns:
+        kind = schema.get(col)
+        if kind is None or kind == 'money' or (kind in ('label', 'date') and not categories):
+            continue
+        dtype = df[col].dtype
+        # object or str columns only - not ones that are already converted or numeric
+        if dtype == TEXT_DTYPE or not is_string_dtype(dtype) or not _all_text(df[col]):
+            continue
+        converted[col] = df[col].astype('category' if kind in ('label', 'date') else TEXT_DTYPE)
+    if len(converted) == 0:
+        return df
+    return df.assign(**converted)
+
+
+def label_column(value, length):
+    """Categorical column of `length` rows all holding value - one code per row instead of a string"""
+    return pd.Categorical.from_codes(np.zeros(length, dtype='int8'), dtype=CategoricalDtype([value]))
+
+
+def paid_dates(df, column='Date Paid'):
+    """datetime64 Series of a text date column (NaT where missing, unparseable or out of range - see
+    parse_text_dates), parsing each distinct value once
+    """
+    values = df[column]
+    if not isinstance(values.dtype, CategoricalDtype):
+        values = values.astype('category')
+    parsed = parse_text_dates(values.cat.categories.astype(str))
+    codes = values.cat.codes.to_numpy()
+    dates = parsed.to_numpy()[codes]
+    dates[codes == -1] = np.datetime64('NaT')
+    return pd.Series(dates, index=df.index)
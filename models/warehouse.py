@@ -0,0 +1,208 @@
+"""
+Embedded SQLite warehouse of report-level data across races and cycles
+
+Components
+- Warehouse - One database file with reports, contributions and expenditures tables.
+  load_cache ingests Report cache folders (see models/report_cache.py), load_report a single Report
+- CACHE_FILE - Report cache file names, for finding reports in a cache folder
+
+Each report is upserted by reportId: a report already loaded at the same amendedDate is skipped
+without reading its itemized tables, and an amended one replaces its earlier rows. Itemized rows
+keep their report's full record as JSON (query it with json_extract) next to indexed candidate,
+committee, name, date and report ID columns.
+"""
+
+import os
+import re
+import json
+import sqlite3
+
+import pandas as pd
+
+from models.aggregation import add_keys
+from models.normalize import parse_money, parse_text_dates
+from models.report_cache import find_cached
+
+DEFAULT_WAREHOUSE_PATH = 'cache/warehouse.db'
+
+# {form}-{id}.json (JSON cache) or {form}-{id}.meta.json (Parquet/Arrow cache)
+CACHE_FILE = re.compile(r'^([A-Z][A-Z0-9]*)-(\d+)(?:\.meta)?\.json$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id INTEGER PRIMARY KEY,
+    amended_date,
+    cycle TEXT,
+    form_type TEXT,
+    candidate TEXT,
+    committee TEXT,
+    entity_id INTEGER,
+    start_date TEXT,
+    end_date TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS contributions (
+    report_id INTEGER NOT NULL,
+    cycle TEXT,
+    candidate TEXT,
+    committee TEXT,
+    contributor TEXT,
+    date TEXT,
+    amount REAL,
+    record TEXT
+);
+CREATE TABLE IF NOT EXISTS expenditures (
+    report_id INTEGER NOT NULL,
+    cycle TEXT,
+    candidate TEXT,
+    committee TEXT,
+    payee TEXT,
+    date TEXT,
+    amount REAL,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS reports_candidate ON reports (candidate);
+CREATE INDEX IF NOT EXISTS reports_committee ON reports (committee);
+CREATE INDEX IF NOT EXISTS reports_cycle ON reports (cycle);
+CREATE INDEX IF NOT EXISTS contributions_report ON contributions (report_id);
+CREATE INDEX IF NOT EXISTS contributions_candidate ON contributions (candidate);
+CREATE INDEX IF NOT EXISTS contributions_committee ON contributions (committee);
+CREATE INDEX IF NOT EXISTS contributions_contributor ON contributions (contributor);
+CREATE INDEX IF NOT EXISTS contributions_date ON contributions (date);
+CREATE INDEX IF NOT EXISTS expenditures_report ON expenditures (report_id);
+CREATE INDEX IF NOT EXISTS expenditures_candidate ON expenditures (candidate);
+CREATE INDEX IF NOT EXISTS expenditures_committee ON expenditures (committee);
+CREATE INDEX IF NOT EXISTS expenditures_payee ON expenditures (payee);
+CREATE INDEX IF NOT EXISTS expenditures_date ON expenditures (date);
+"""
+
+
+def _iso_dates(values):
+    # '09/30/2024' or '09/30/24' -> '2024-09-30', so dates sort and range-query as text.
+    # Unparseable and out-of-range dates (see parse_text_dates) are NULL
+    dates = parse_text_dates(values)
+    return dates.dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), None)
+
+
+def _item_rows(df, report_id, cycle, candidate, committee):
+    """(report_id, cycle, candidate, committee, name, date, amount, record) tuples for an itemized table"""
+    if len(df) == 0:
+        return []
+    df = df.reset_index(drop=True)
+    names = add_keys(df)['Contributor'].where(lambda s: s != '', None)
+    dates = _iso_dates(df['Date Paid']) if 'Date Paid' in df.columns else [None] * len(df)
+    amounts = parse_money(df['Amount']) if 'Amount' in df.columns else pd.Series(float('nan'), index=df.index)
+    records = df.to_json(orient='records', lines=True).splitlines()
+    return [(report_id, cycle, candidate, committee, name, date, None if pd.isna(amount) else float(amount), record)
+            for name, date, amount, record in zip(names, dates, amounts, records)]
+
+
+class Warehouse:
+    """SQLite database of reports, contributions and expenditures
+    - path - database file. Created (with its tables and indexes) if it doesn't exist
+    """
+
+    def __init__(self, path=DEFAULT_WAREHOUSE_PATH):
+        folder = os.path.dirname(path)
+        if folder != '':
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def amended_date(self, report_id):
+        """amendedDate of a loaded report. Raises KeyError if it isn't loaded"""
+        row = self.connection.execute(
+            'SELECT amended_date FROM reports WHERE report_id = ?', (report_id,)).fetchone()
+        if row is None:
+            raise KeyError(report_id)
+        return row[0]
+
+    def is_current(self, data):
+        """True if a report list record is already loaded at its amendedDate"""
+        try:
+            return self.amended_date(data['reportId']) == data['amendedDate']
+        except KeyError:
+            return False
+
+    def upsert(self, data, summary, contributions, expenditures, cycle):
+        """Loads one report's records, replacing any earlier version of it
+        - data - report list record (reportId, amendedDate, formTypeCode, candidateName or committeeName, ...)
+        - summary - report summary dict
+        - contributions / expenditures - itemized DataFrames, as on Report
+        Returns False (and writes nothing) if the report is already loaded at this amendedDate
+        """
+        if self.is_current(data):
+            return False
+        report_id = int(data['reportId'])
+        candidate = data.get('candidateName')
+        committee = data.get('committeeName')
+        with self.connection:
+            self.connection.execute('DELETE FROM contributions WHERE report_id = ?', (report_id,))
+            self.connection.execute('DELETE FROM expenditures WHERE report_id = ?', (report_id,))
+            self.connection.execute(
+                'INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (report_id, data['amendedDate'], cycle, data['formTypeCode'], candidate, committee,
+                 data.get('candidateId', data.get('committeeId')), data['fromDateStr'], data['toDateStr'],
+                 json.dumps(summary, default=str)))
+            self.connection.executemany('INSERT INTO contributions VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                        _item_rows(contributions, report_id, cycle, candidate, committee))
+            self.connection.executemany('INSERT INTO expenditures VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                        _item_rows(expenditures, report_id, cycle, candidate, committee))
+        return True
+
+    def load_report(self, report, cycle):
+        """upsert() for a loaded Report object"""
+        return self.upsert(report.data, report.summary, report.contributions, report.expenditures, cycle)
+
+    def load_cache(self, cachePath, cycle):
+        """Upserts every cached report under cachePath (e.g. cache/2024), in any cache format
+        Reports already loaded at their cached amendedDate are skipped after reading just their metadata.
+        Returns (loaded, skipped) counts
+        """
+        loaded = 0
+        skipped = 0
+        for directory, _, files in os.walk(cachePath):
+            seen = set()
+            for file in sorted(files):
+                match = CACHE_FILE.match(file)
+                if match is None or match.groups() in seen:
+                    continue
+                seen.add(match.groups())
+                form, id = match.group(1), int(match.group(2))
+                backend = find_cached(directory, form, id)
+                if backend is None:
+                    continue
+                meta = backend.read_meta(directory, form, id)
+                if 'data' not in meta or self.is_current(meta['data']):
+                    skipped += 1
+                    continue
+                contributions, expenditures = backend.read_frames(directory, form, id, meta)
+                self.upsert(meta['data'], meta['summary'], contributions, expenditures, cycle)
+                loaded += 1
+        print(f'Warehouse: {loaded} reports loaded from {cachePath}, {skipped} unchanged')
+        return loaded, skipped
+
+    def query(self, sql, params=()):
+        """Runs a query, returns the results as a DataFrame"""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def contributor_totals(self, cycle=None):
+        """Total contributions by contributor name (as in models/aggregation.py), across cycles unless one is given"""
+        where = '' if cycle is None else 'WHERE cycle = ?'
+        params = () if cycle is None else (str(cycle),)
+        return self.query(f"""
+            SELECT contributor AS Contributor, SUM(amount) AS Amount FROM contributions {where}
+            GROUP BY contributor ORDER BY Amount DESC
+        """, params).set_index('Contributor')
@@ -1,73 +1,46 @@
-import json
-from datetime import datetime
+from models.batch import BatchRunner
+from cycles import CYCLES
 
-from models.cers_interface import Interface
-from models.cleaners import CommitteeCleaner
-from models.cleaners import CandidateCleaner
+# Fetch, export and clean every 2024 race (listed in cycles.py), then load the warehouse. Stages run in
+# parallel as their inputs are ready, and clean/warehouse stages whose inputs haven't changed since the
+# last run are skipped (see models/batch.py). Per-stage timings are written to logs.json
 
-cers = Interface()
-committee_cleaner = CommitteeCleaner()
-candidate_cleaner = CandidateCleaner()
+# Number of concurrent CERS requests per race. Set WORKERS and RACE_WORKERS to 1 for the original serial fetch
+WORKERS = 8
 
-YEAR = '2024'
+# Number of races fetched at once
+RACE_WORKERS = 4
 
-STATEWIDE_RACE_CODES = {
-    # Manually from CERS
-    'gov': '81',
-    'sos': '193',
-    'ag': '2',
-    'opi': '245',
-    'auditor': '244',
-    'supcoClerk': '10',
-}
+# Global CERS request budget, shared by every worker - requests per second and requests in flight
+REQUESTS_PER_SECOND = 5
+MAX_IN_FLIGHT = 8
 
-STATE_DISTRICT_RACE_CODES = {
-    'supcoChief': '246',
-    'supco3': '249',
-    'psc2': '188',
-    'psc3': '189',
-    'psc4': '190',
-}
+# Only re-scrape candidates/committees with new or amended reports
+INCREMENTAL = True
 
-# PACS
-committees = cers.get_committees_with_spending(cycle=YEAR)
-committees.export(f'raw/{YEAR}/committees')
-committee_cleaner.clean(
-    raw_directory=f'raw/{YEAR}/committees',
-    out_path=f'cleaned/{YEAR}/committees', 
-)
+# Fetch every race at once on one asyncio event loop (needs aiohttp). False fetches races on threads
+ASYNC_FETCH = False
 
-# Legislative candidates
-legislative = cers.get_legislative_candidates(cycle=YEAR)
-legislative.export(f'raw/{YEAR}/leg')
-candidate_cleaner.clean(
-    raw_directory=f'raw/{YEAR}/leg',
-    out_path=f'cleaned/{YEAR}/leg', 
-)
+# Report cache format - 'json', or 'parquet'/'arrow' (faster warm-cache runs, needs pyarrow)
+CACHE_FORMAT = 'json'
 
-# Statewide races
-for key in STATEWIDE_RACE_CODES:
-    code = STATEWIDE_RACE_CODES[key]
-    candidates = cers.get_candidates_by_race(YEAR, code)
-    candidates.export(f'raw/{YEAR}/{key}')
-    candidate_cleaner.clean(
-        raw_directory=f'raw/{YEAR}/{key}',
-        out_path=f'cleaned/{YEAR}/{key}',
-    )
-    
-# State districts
-for key in STATE_DISTRICT_RACE_CODES:
-    code = STATE_DISTRICT_RACE_CODES[key]
-    candidates = cers.get_candidates_by_race({YEAR}, code)
-    candidates.export(f'raw/{YEAR}/{key}')
-    candidate_cleaner.clean(
-        raw_directory=f'raw/{YEAR}/{key}',
-        out_path=f'cleaned/{YEAR}/{key}',
-    )
+# Raw CERS responses are recorded here (see models/raw_store.py). REPLAY rebuilds every report and
+# export from those recordings instead of CERS - no network, e.g. after changing parsing/cleaning code
+RAW_STORE = 'cache/raw'
+REPLAY = False
 
-# Log completion time
-with open('logs.json','w') as f:
-    json.dump({
-    'lastUpdateTime': str(datetime.now())
-}, f)
-print("Done")
\ No newline at end of file
+# SQLite warehouse new and amended reports are loaded into after fetching (see models/warehouse.py).
+# None skips it
+WAREHOUSE = 'cache/warehouse.db'
+
+# Number of processes for cleaning. None uses every CPU
+CLEAN_WORKERS = None
+
+# Re-run clean and warehouse stages even if their inputs haven't changed, e.g. after changing cleaning code
+FORCE = False
+
+BatchRunner(CYCLES, raceWorkers=RACE_WORKERS, workers=WORKERS, incremental=INCREMENTAL,
+            cacheFormat=CACHE_FORMAT, requestsPerSecond=REQUESTS_PER_SECOND, maxInFlight=MAX_IN_FLIGHT,
+            rawStore=RAW_STORE, replay=REPLAY, asyncFetch=ASYNC_FETCH, cleanWorkers=CLEAN_WORKERS,
+            warehouse=WAREHOUSE, force=FORCE).run()
+print("Done")
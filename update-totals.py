@@ -0,0 +1,25 @@
+from models.batch import BatchRunner
+from cycles import CYCLES
+
+# Whole-cycle totals for every race in cycles.py, from report summaries only - no itemized schedules are
+# downloaded, so this runs in a fraction of update-2024.py's time. Writes cleaned/{cycle}/candidate-totals.csv
+# and cleaned/{cycle}/committee-totals.csv (summary and totals stages, see models/batch.py)
+
+# Number of concurrent CERS requests per race
+WORKERS = 8
+
+# Number of races fetched at once
+RACE_WORKERS = 4
+
+# Global CERS request budget, shared by every worker - requests per second and requests in flight
+REQUESTS_PER_SECOND = 5
+MAX_IN_FLIGHT = 8
+
+# Fetch every race at once on one asyncio event loop (needs aiohttp). False fetches races on threads
+ASYNC_FETCH = False
+
+# Totals runs don't replace the full update's logs.json
+BatchRunner(CYCLES, summaryOnly=True, raceWorkers=RACE_WORKERS, workers=WORKERS,
+            requestsPerSecond=REQUESTS_PER_SECOND, maxInFlight=MAX_IN_FLIGHT, asyncFetch=ASYNC_FETCH,
+            logPath=None).run()
+print("Done")